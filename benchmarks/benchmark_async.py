@@ -0,0 +1,101 @@
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from context import src
+from benchmark_database import create_benchmark_database
+from src.async_habit_manager import AsyncHabitManager
+from src.habit_manager import HabitManager
+
+
+def get_percentile(latencies, percentile):
+    """
+    Returns a percentile of latencies.
+
+    Args:
+        latencies (list): The latencies in seconds.
+        percentile (float): The percentile between 0 and 100.
+
+    Returns:
+        float: The latency in seconds.
+    """
+
+    sorted_latencies = sorted(latencies)
+    index = min(len(sorted_latencies) - 1, int(len(sorted_latencies) * percentile / 100))
+
+    return sorted_latencies[index]
+
+
+async def request_check_offs(check_off, number_of_requests, number_of_habits):
+    """
+    Sends concurrent check off requests and measures the latency of each request from the moment all requests were sent.
+
+    Args:
+        check_off (function): Checks off a habit. Gets the habit_id and the datetimes as arguments and returns an awaitable.
+        number_of_requests (int): The number of concurrent requests.
+        number_of_habits (int): The number of habits the requests are distributed over.
+
+    Returns:
+        list: The latencies in seconds.
+    """
+
+    start_time = time.perf_counter()
+    start_datetime = datetime(year=2024, month=1, day=1)
+
+    async def request(i):
+        await check_off(i % number_of_habits, 
+                        [start_datetime + timedelta(days=i // number_of_habits)])
+        return time.perf_counter() - start_time
+
+    return await asyncio.gather(*[request(i) for i in range(number_of_requests)])
+
+
+def benchmark_async(number_of_requests, number_of_habits=100, database_name="benchmark_habit.db"):
+    """
+    Measures the latencies of concurrent check off requests with the synchronous HabitManager called from the event loop and with AsyncHabitManager.
+
+    Args:
+        number_of_requests (int): The number of concurrent requests.
+        number_of_habits (int): The number of habits in the database.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        list: The latencies of the synchronous requests in seconds.
+        list: The latencies of the asynchronous requests in seconds.
+    """
+
+    create_benchmark_database(database_name, 0, number_of_habits)
+    habit_manager = HabitManager(database_name)
+
+    async def check_off(habit_id, datetimes):
+        habit_manager.check_off(habit_id, datetimes)
+
+    sync_latencies = asyncio.run(
+        request_check_offs(check_off, number_of_requests, number_of_habits))
+    del habit_manager
+
+    create_benchmark_database(database_name, 0, number_of_habits)
+
+    async def run():
+        async with AsyncHabitManager(database_name) as async_habit_manager:
+            await async_habit_manager.get_all_habits()
+            return await request_check_offs(
+                async_habit_manager.check_off, number_of_requests, number_of_habits)
+
+    async_latencies = asyncio.run(run())
+
+    return sync_latencies, async_latencies
+
+
+if __name__ == "__main__":
+    sizes = ([int(argument) for argument in sys.argv[1:]] 
+             if len(sys.argv) > 1 
+             else [1000])
+
+    for number_of_requests in sizes:
+        sync_latencies, async_latencies = benchmark_async(number_of_requests)
+        for api, latencies in [("HabitManager", sync_latencies), 
+                               ("AsyncHabitManager", async_latencies)]:
+            print(f"{number_of_requests} concurrent check offs, {api}: "
+                  f"p50 {get_percentile(latencies, 50) * 1000:.1f} ms, "
+                  f"p99 {get_percentile(latencies, 99) * 1000:.1f} ms")
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from context import src
+from src.habit import Habit, Periodicity, DatabaseTable
+from src.database_manager import DatabaseManager
+from src.check_off_history import to_microseconds
+
+
+def create_benchmark_database(database_name, number_of_check_offs, number_of_habits=1000, start_datetime=datetime(year=2000, month=1, day=1, hour=12)):
+    """
+    Creates a database for benchmarks with daily habits and consecutive daily check offs, distributed evenly over the habits. An existing database with the same name gets replaced.
+
+    Args:
+        database_name (str): The name of the database to create.
+        number_of_check_offs (int): The total number of check offs.
+        number_of_habits (int): The number of habits.
+        start_datetime (datetime.datetime): The creation datetime of the habits and their first check off.
+    """
+
+    # Also remove the write-ahead log of an earlier benchmark
+    for file_name in [database_name, database_name + "-wal", database_name + "-shm"]:
+        if os.path.exists(file_name):
+            os.remove(file_name)
+
+    database_manager = DatabaseManager(database_name)
+    Habit.initialize_database(database_manager)
+    database_manager.close()
+
+    check_offs_per_habit = number_of_check_offs // number_of_habits
+
+    with sqlite3.connect(database_name) as connection:
+        connection.executemany(
+            f"INSERT INTO {DatabaseTable.HABIT.name.lower()} VALUES (?, ?, ?, ?, ?)", 
+            [(habit_id, 
+              f"habit {habit_id}", 
+              f"description {habit_id}", 
+              Periodicity.DAILY.value, 
+              to_microseconds(start_datetime)) 
+             for habit_id in range(number_of_habits)])
+
+        for habit_id in range(number_of_habits):
+            connection.executemany(
+                f"INSERT INTO {DatabaseTable.CHECK_OFF_DATETIME.name.lower()} (habit_id, check_off_datetime) VALUES (?, ?)", 
+                ((habit_id, to_microseconds(start_datetime + timedelta(days=day))) 
+                 for day in range(check_offs_per_habit)))
+
+        connection.commit()
+
+    # Summarize the inserted check offs in the habit_stats table
+    with DatabaseManager(database_name) as database_manager:
+        Habit.rebuild_stats(database_manager)
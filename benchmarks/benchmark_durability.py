@@ -0,0 +1,65 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, DurabilityProfile, StreakType
+from src.database_manager import DatabaseManager
+from src.habit import DatabaseTable
+
+
+def benchmark_durability(durability_profile, number_of_check_offs, database_name="benchmark_habit.db"):
+    """
+    Measures the throughput of check offs that get saved one by one while another thread keeps reading the check offs of a habit, like a streak dashboard.
+
+    Args:
+        durability_profile (DurabilityProfile): The durability profile of the writer and the reader. None for the SQLite defaults.
+        number_of_check_offs (int): The number of check offs.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The number of check offs per second.
+        float: The number of reads per second.
+    """
+
+    create_benchmark_database(database_name, 100_000, number_of_habits=100)
+    habit_manager = HabitManager(database_name, durability_profile=durability_profile)
+    reader = DatabaseManager(database_name, durability_profile=durability_profile)
+    start_datetime = datetime(year=2010, month=1, day=1)
+    is_writing = True
+    number_of_reads = 0
+
+    def read():
+        nonlocal number_of_reads
+        while is_writing:
+            reader.load(DatabaseTable.CHECK_OFF_DATETIME.name.lower(), {"habit_id": 1})
+            number_of_reads += 1
+
+    reader_thread = threading.Thread(target=read)
+    reader_thread.start()
+
+    start_time = time.perf_counter()
+    for i in range(number_of_check_offs):
+        habit_manager.check_off(0, [start_datetime + timedelta(days=i)])
+    write_time = time.perf_counter() - start_time
+
+    is_writing = False
+    reader_thread.join()
+
+    assert habit_manager.get_streak(StreakType.LONGEST, 0) >= number_of_check_offs
+
+    reader.close()
+    del habit_manager
+    return number_of_check_offs / write_time, number_of_reads / write_time
+
+
+if __name__ == "__main__":
+    number_of_check_offs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    for durability_profile in [None] + list(DurabilityProfile):
+        name = "SQLite defaults" if durability_profile is None else durability_profile.name
+        check_offs_per_second, reads_per_second = benchmark_durability(
+            durability_profile, number_of_check_offs)
+        print(f"{name}: {check_offs_per_second:.0f} check offs per second, "
+              f"{reads_per_second:.0f} concurrent reads per second")
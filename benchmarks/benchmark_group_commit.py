@@ -0,0 +1,51 @@
+import sys
+import time
+from datetime import datetime, timedelta
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, DurabilityProfile, StreakType
+
+
+def benchmark_group_commit(group_commit_interval, number_of_check_offs, database_name="benchmark_habit.db"):
+    """
+    Measures the throughput of check offs requested one by one, saved with one transaction each or with group commit.
+
+    Args:
+        group_commit_interval (float): The group commit interval in seconds, see HabitManager. None for one transaction per check off.
+        number_of_check_offs (int): The number of check offs.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The number of check offs per second, including saving the last pending check offs.
+        dict: The group commit statistics, see HabitManager.get_group_commit_statistics.
+    """
+
+    create_benchmark_database(database_name, 100_000, number_of_habits=100)
+    habit_manager = HabitManager(database_name, 
+                                 durability_profile=DurabilityProfile.SAFE, 
+                                 group_commit_interval=group_commit_interval)
+    start_datetime = datetime(year=2010, month=1, day=1)
+
+    start_time = time.perf_counter()
+    for i in range(number_of_check_offs):
+        habit_manager.check_off(0, [start_datetime + timedelta(days=i)])
+    habit_manager.close()
+    total_time = time.perf_counter() - start_time
+
+    assert HabitManager(database_name).get_streak(StreakType.LONGEST, 0) >= number_of_check_offs
+
+    return number_of_check_offs / total_time, habit_manager.get_group_commit_statistics()
+
+
+if __name__ == "__main__":
+    number_of_check_offs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    for group_commit_interval in [None, 0.01, 0.05]:
+        check_offs_per_second, statistics = benchmark_group_commit(
+            group_commit_interval, number_of_check_offs)
+        name = ("one transaction per check off" 
+                if group_commit_interval is None 
+                else f"group commit every {group_commit_interval * 1000:.0f} ms")
+        transactions = statistics.get("flushes", number_of_check_offs)
+        print(f"{name}: {check_offs_per_second:.0f} check offs per second "
+              f"in {transactions} transactions")
@@ -0,0 +1,55 @@
+import sys
+import time
+import tracemalloc
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager
+
+
+def benchmark_habits(number_of_habits, number_of_listings=100, database_name="benchmark_habit.db"):
+    """
+    Measures and returns the memory per habit of a loaded database without check offs, and the memory and time get_all_habits takes.
+
+    Args:
+        number_of_habits (int): The number of habits in the database.
+        number_of_listings (int): The number of get_all_habits calls that get timed.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The number of bytes per habit.
+        float: The number of bytes allocated per habit by one get_all_habits call.
+        float: The time in seconds one get_all_habits call takes.
+    """
+
+    create_benchmark_database(database_name, 0, number_of_habits)
+
+    tracemalloc.start()
+    habit_manager = HabitManager(database_name)
+    bytes_per_habit = tracemalloc.get_traced_memory()[0] / number_of_habits
+
+    tracemalloc.reset_peak()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    all_habits = habit_manager.get_all_habits()
+    listing_bytes_per_habit = (tracemalloc.get_traced_memory()[0] - start_bytes) / number_of_habits
+    tracemalloc.stop()
+    del all_habits
+
+    start_time = time.perf_counter()
+    for i in range(number_of_listings):
+        habit_manager.get_all_habits()
+    listing_time = (time.perf_counter() - start_time) / number_of_listings
+
+    del habit_manager
+    return bytes_per_habit, listing_bytes_per_habit, listing_time
+
+
+if __name__ == "__main__":
+    sizes = ([int(argument) for argument in sys.argv[1:]] 
+             if len(sys.argv) > 1 
+             else [10_000, 100_000])
+
+    for number_of_habits in sizes:
+        bytes_per_habit, listing_bytes_per_habit, listing_time = benchmark_habits(number_of_habits)
+        print(f"{number_of_habits} habits: {bytes_per_habit:.1f} bytes per habit, "
+              f"get_all_habits allocated {listing_bytes_per_habit:.1f} bytes per habit "
+              f"and took {listing_time * 1000:.2f} ms")
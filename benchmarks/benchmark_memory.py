@@ -0,0 +1,51 @@
+import sys
+import time
+import tracemalloc
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, StreakType
+
+
+def benchmark_memory(number_of_check_offs, compact, database_name="benchmark_habit.db"):
+    """
+    Measures and returns the memory HabitManager holds after loading a database and calculating the longest streak of all habits, and the time this takes without tracing memory allocations.
+
+    Args:
+        number_of_check_offs (int): The total number of check offs in the database.
+        compact (bool): If True, the check offs are packed into arrays, see CheckOffHistory.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The number of bytes per check off.
+        float: The time in seconds.
+    """
+
+    create_benchmark_database(database_name, number_of_check_offs)
+
+    start_time = time.perf_counter()
+    habit_manager = HabitManager(database_name, compact=compact)
+    habit_manager.get_streak(StreakType.LONGEST)
+    load_time = time.perf_counter() - start_time
+    del habit_manager
+
+    tracemalloc.start()
+    habit_manager = HabitManager(database_name, compact=compact)
+    habit_manager.get_streak(StreakType.LONGEST)
+    total_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del habit_manager
+    return total_bytes / number_of_check_offs, load_time
+
+
+if __name__ == "__main__":
+    sizes = ([int(argument) for argument in sys.argv[1:]] 
+             if len(sys.argv) > 1 
+             else [100_000, 1_000_000])
+
+    for number_of_check_offs in sizes:
+        for compact in [False, True]:
+            bytes_per_check_off, load_time = benchmark_memory(number_of_check_offs, compact)
+            print(f"{number_of_check_offs} check offs, compact={compact}: "
+                  f"{bytes_per_check_off:.1f} bytes per check off, "
+                  f"loading and calculating the longest streak took {load_time:.2f} s")
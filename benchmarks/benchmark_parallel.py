@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, StreakEngine, StreakType
+
+
+def benchmark_parallel(habit_manager):
+    """
+    Measures and returns the time it takes to calculate the longest streak of all habits. The first call is not measured, so the worker processes of the parallel streak engine are already started.
+
+    Args:
+        habit_manager (HabitManager): The habit manager with the loaded database.
+
+    Returns:
+        float: The time in seconds.
+    """
+
+    habit_manager.get_streak(StreakType.LONGEST)
+
+    start_time = time.perf_counter()
+    habit_manager.get_streak(StreakType.LONGEST)
+    return time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    number_of_check_offs = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    database_name = "benchmark_habit.db"
+    create_benchmark_database(database_name, number_of_check_offs)
+
+    habit_manager = HabitManager(database_name, compact=True)
+    print(f"incremental streaks: {benchmark_parallel(habit_manager):.3f} s")
+
+    start_time = time.perf_counter()
+    habit_manager.get_streak(StreakType.LONGEST, verify=True)
+    print(f"recalculated streaks in one process: {time.perf_counter() - start_time:.3f} s")
+
+    number_of_workers = 1
+    while number_of_workers <= (os.cpu_count() or 1):
+        with HabitManager(database_name, 
+                          compact=True, 
+                          streak_engine=StreakEngine.PARALLEL, 
+                          streak_workers=number_of_workers) as habit_manager:
+            print(f"parallel streaks with {number_of_workers} workers: "
+                  f"{benchmark_parallel(habit_manager):.3f} s")
+        number_of_workers *= 2
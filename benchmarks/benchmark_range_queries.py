@@ -0,0 +1,76 @@
+import sys
+import time
+from datetime import datetime, timedelta
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, DatabaseManager, DatabaseTable
+from src.check_off_history import from_microseconds
+
+
+def benchmark_range_queries(number_of_queries=100, days=30, database_name="benchmark_habit.db"):
+    """
+    Measures the time for loading the check offs of a habit of the last days days and for calculating the completion rates of all habits over the last days days, within the database and in Python from all loaded check offs.
+
+    Args:
+        number_of_queries (int): The number of queries of check offs.
+        days (int): The number of days of the window.
+        database_name (str): The name of the database.
+
+    Returns:
+        dict: The times in seconds per query by measurement.
+    """
+
+    habit_manager = HabitManager(database_name, lazy=True)
+    database_manager = DatabaseManager(database_name)
+    start = datetime.combine(datetime.now().date() - timedelta(days=days - 1), datetime.min.time())
+    times = {}
+
+    start_time = time.perf_counter()
+    for query in range(number_of_queries):
+        habit_manager.get_check_offs(query, start=start)
+    times["check offs, range in SQL"] = (time.perf_counter() - start_time) / number_of_queries
+
+    start_time = time.perf_counter()
+    for query in range(number_of_queries):
+        rows = database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), {"habit_id": query})
+        sorted(check_off 
+               for check_off in map(from_microseconds, (row[2] for row in rows)) 
+               if check_off >= start)
+    times["check offs, range in Python"] = (time.perf_counter() - start_time) / number_of_queries
+
+    start_time = time.perf_counter()
+    habit_manager.get_completion_rates(days)
+    times["completion rates, in SQL"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    periods = {habit["habit_id"]: 7 if habit["periodicity"] == "Weekly" else 1 
+               for habit in habit_manager.get_all_habits()}
+    completed_periods = {habit_id: set() for habit_id in periods}
+    for row in database_manager.load(DatabaseTable.CHECK_OFF_DATETIME.name.lower()):
+        check_off = from_microseconds(row[2])
+        if check_off >= start:
+            completed_periods[row[1]].add((check_off - start).days // periods[row[1]])
+    {habit_id: len(completed_periods[habit_id]) / -(-days // period) 
+     for habit_id, period in periods.items()}
+    times["completion rates, in Python"] = time.perf_counter() - start_time
+
+    habit_manager.close()
+    database_manager.close()
+    return times
+
+
+if __name__ == "__main__":
+    number_of_check_offs = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    number_of_habits = 1000
+
+    # The check offs of each habit end today
+    create_benchmark_database(
+        "benchmark_habit.db", 
+        number_of_check_offs, 
+        number_of_habits=number_of_habits, 
+        start_datetime=datetime.now().replace(hour=12, minute=0, second=0, microsecond=0) 
+                       - timedelta(days=number_of_check_offs // number_of_habits - 1))
+
+    for measurement, query_time in benchmark_range_queries().items():
+        print(f"{number_of_check_offs} check offs, {measurement}: {query_time * 1000:.3f} ms")
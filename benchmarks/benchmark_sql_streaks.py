@@ -0,0 +1,46 @@
+import sys
+import time
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, StreakEngine, StreakType
+
+
+def benchmark_sql_streaks(number_of_check_offs, streak_engine, lazy, database_name="benchmark_habit.db"):
+    """
+    Measures and returns the time it takes to load a database and calculate the longest streak of all habits.
+
+    Args:
+        number_of_check_offs (int): The total number of check offs in the database.
+        streak_engine (StreakEngine): The engine used for calculating the longest streak of all habits.
+        lazy (bool): If True, the check offs are loaded on first access of a habit, see HabitManager.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The time in seconds.
+        int: The longest streak of all habits.
+    """
+
+    create_benchmark_database(database_name, number_of_check_offs)
+
+    start_time = time.perf_counter()
+    habit_manager = HabitManager(database_name, streak_engine=streak_engine, lazy=lazy)
+    longest_streak = habit_manager.get_streak(StreakType.LONGEST)
+    total_time = time.perf_counter() - start_time
+
+    habit_manager.close()
+    return total_time, longest_streak
+
+
+if __name__ == "__main__":
+    sizes = ([int(argument) for argument in sys.argv[1:]] 
+             if len(sys.argv) > 1 
+             else [100_000, 1_000_000])
+
+    for number_of_check_offs in sizes:
+        for streak_engine, lazy in [(StreakEngine.INCREMENTAL, False), 
+                                    (StreakEngine.INCREMENTAL, True), 
+                                    (StreakEngine.SQL, True)]:
+            total_time, longest_streak = benchmark_sql_streaks(
+                number_of_check_offs, streak_engine, lazy)
+            print(f"{number_of_check_offs} check offs, {streak_engine.name.lower()} streaks, lazy={lazy}: "
+                  f"longest streak {longest_streak} after {total_time:.2f} s")
@@ -0,0 +1,39 @@
+import sys
+import time
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager
+
+
+def benchmark_startup(number_of_check_offs, lazy=False, database_name="benchmark_habit.db"):
+    """
+    Measures and returns the time it takes HabitManager to load a database.
+
+    Args:
+        number_of_check_offs (int): The total number of check offs in the database.
+        lazy (bool): If True, the check offs are loaded on first access of a habit, see HabitManager.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The startup time in seconds.
+    """
+
+    create_benchmark_database(database_name, number_of_check_offs)
+
+    start_time = time.perf_counter()
+    habit_manager = HabitManager(database_name, lazy=lazy)
+    startup_time = time.perf_counter() - start_time
+
+    del habit_manager
+    return startup_time
+
+
+if __name__ == "__main__":
+    sizes = ([int(argument) for argument in sys.argv[1:]] 
+             if len(sys.argv) > 1 
+             else [100_000, 10_000_000])
+
+    for number_of_check_offs in sizes:
+        for lazy in [False, True]:
+            startup_time = benchmark_startup(number_of_check_offs, lazy)
+            print(f"{number_of_check_offs} check offs, lazy={lazy}: startup took {startup_time:.2f} s")
@@ -0,0 +1,48 @@
+import sys
+import time
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, StreakEngine, StreakType
+
+
+def benchmark_stats(streak_engine, lazy, number_of_queries=100, database_name="benchmark_habit.db"):
+    """
+    Measures the time it takes to load a database and calculate the longest streak of all habits, and the time each further calculation takes, like a dashboard refreshing.
+
+    Args:
+        streak_engine (StreakEngine): The engine used for calculating the longest streak of all habits.
+        lazy (bool): If True, the check offs are loaded on first access of a habit, see HabitManager.
+        number_of_queries (int): The number of further calculations.
+        database_name (str): The name of the database.
+
+    Returns:
+        float: The time until the first longest streak in seconds.
+        float: The time per further calculation in seconds.
+    """
+
+    start_time = time.perf_counter()
+    habit_manager = HabitManager(database_name, streak_engine=streak_engine, lazy=lazy)
+    habit_manager.get_streak(StreakType.LONGEST)
+    first_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(number_of_queries):
+        habit_manager.get_streak(StreakType.LONGEST)
+    query_time = (time.perf_counter() - start_time) / number_of_queries
+
+    habit_manager.close()
+    return first_time, query_time
+
+
+if __name__ == "__main__":
+    number_of_check_offs = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    create_benchmark_database("benchmark_habit.db", number_of_check_offs)
+
+    for streak_engine, lazy in [(StreakEngine.INCREMENTAL, False), 
+                                (StreakEngine.SQL, True), 
+                                (StreakEngine.STATS, True)]:
+        first_time, query_time = benchmark_stats(
+            streak_engine, lazy, 
+            number_of_queries=100 if streak_engine != StreakEngine.SQL else 3)
+        print(f"{streak_engine.name.lower()} streaks, lazy={lazy}: first longest streak after {first_time:.3f} s, "
+              f"then {query_time * 1000:.3f} ms per query")
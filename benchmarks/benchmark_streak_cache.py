@@ -0,0 +1,58 @@
+import sys
+import time
+from datetime import datetime
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager, StreakEngine, StreakType
+
+
+def benchmark_streak_cache(streak_engine, streak_cache_size, number_of_refreshes=1000, check_off_every=100, database_name="benchmark_habit.db"):
+    """
+    Measures the time per refresh of a dashboard which shows the current and longest streak of all habits and of ten habits, while a habit gets checked off every check_off_every refreshes.
+
+    Args:
+        streak_engine (StreakEngine): The engine used for calculating the streaks of all habits.
+        streak_cache_size (int): The maximum number of cached streaks. If None, streaks are not cached.
+        number_of_refreshes (int): The number of dashboard refreshes.
+        check_off_every (int): The number of refreshes between two check offs.
+        database_name (str): The name of the database.
+
+    Returns:
+        float: The time per refresh in seconds.
+        float: The share of streak lookups answered by the cache.
+    """
+
+    habit_manager = HabitManager(database_name, 
+                                 streak_engine=streak_engine, 
+                                 streak_cache_size=streak_cache_size)
+
+    start_time = time.perf_counter()
+    for refresh in range(number_of_refreshes):
+        if refresh % check_off_every == check_off_every - 1:
+            habit_manager.check_off(refresh % 10, [datetime.now()])
+
+        for streak_type in StreakType:
+            habit_manager.get_streak(streak_type)
+            for habit_id in range(10):
+                habit_manager.get_streak(streak_type, habit_id)
+    refresh_time = (time.perf_counter() - start_time) / number_of_refreshes
+
+    hit_rate = habit_manager.get_streak_cache_statistics().get("hit_rate", 0.0)
+    habit_manager.close()
+    return refresh_time, hit_rate
+
+
+if __name__ == "__main__":
+    number_of_check_offs = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    for streak_engine, number_of_refreshes in [(StreakEngine.INCREMENTAL, 1000), 
+                                               (StreakEngine.STATS, 1000), 
+                                               (StreakEngine.SQL, 10)]:
+        for streak_cache_size in [None, 1000]:
+            create_benchmark_database("benchmark_habit.db", number_of_check_offs)
+            refresh_time, hit_rate = benchmark_streak_cache(
+                streak_engine, streak_cache_size, 
+                number_of_refreshes=number_of_refreshes, 
+                check_off_every=min(100, number_of_refreshes // 2))
+            print(f"{streak_engine.name.lower()} streaks, streak_cache_size={streak_cache_size}: "
+                  f"{refresh_time * 1000:.3f} ms per refresh, hit rate {hit_rate:.2f}")
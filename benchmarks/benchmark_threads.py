@@ -0,0 +1,56 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit_manager import HabitManager
+
+
+def benchmark_threads(number_of_threads, write_behind, check_offs_per_thread=2000, database_name="benchmark_habit.db"):
+    """
+    Measures and returns the check off throughput of a thread-safe HabitManager, where each thread checks off its own habit.
+
+    Args:
+        number_of_threads (int): The number of threads.
+        write_behind (bool): If True, the check offs are saved with one flush at the end, otherwise each check off gets saved on its own.
+        check_offs_per_thread (int): The number of check offs of each thread.
+        database_name (str): The name of the database created for the benchmark.
+
+    Returns:
+        float: The number of check offs per second.
+    """
+
+    create_benchmark_database(database_name, 0, number_of_threads)
+    habit_manager = HabitManager(database_name, write_behind=write_behind, thread_safe=True)
+    start_datetime = datetime(year=2000, month=1, day=1)
+
+    def check_off(habit_id):
+        for i in range(check_offs_per_thread):
+            habit_manager.check_off(habit_id, [start_datetime + timedelta(days=i)])
+
+    threads = [threading.Thread(target=check_off, args=(habit_id,)) 
+               for habit_id in range(number_of_threads)]
+
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    habit_manager.flush()
+    check_off_time = time.perf_counter() - start_time
+
+    del habit_manager
+    return number_of_threads * check_offs_per_thread / check_off_time
+
+
+if __name__ == "__main__":
+    numbers_of_threads = ([int(argument) for argument in sys.argv[1:]] 
+                          if len(sys.argv) > 1 
+                          else [1, 2, 4, 8])
+
+    for write_behind in [False, True]:
+        for number_of_threads in numbers_of_threads:
+            throughput = benchmark_threads(number_of_threads, write_behind)
+            print(f"{number_of_threads} threads, write_behind={write_behind}: "
+                  f"{throughput:.0f} check offs per second")
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from context import src
+from benchmark_database import create_benchmark_database
+from src.habit import DatabaseTable
+from src.database_manager import DatabaseManager
+from src.schema_migrator import SchemaMigrator
+from src.check_off_history import CheckOffHistory
+
+
+def create_iso_database(database_name, number_of_check_offs, number_of_habits=1000):
+    """
+    Creates a database with schema version 2, which stores the timestamps as ISO strings, with the same data as create_benchmark_database. An existing database with the same name gets replaced.
+
+    Args:
+        database_name (str): The name of the database to create.
+        number_of_check_offs (int): The total number of check offs.
+        number_of_habits (int): The number of habits.
+    """
+
+    if os.path.exists(database_name):
+        os.remove(database_name)
+
+    start_datetime = datetime(year=2000, month=1, day=1, hour=12)
+    check_offs_per_habit = number_of_check_offs // number_of_habits
+
+    with sqlite3.connect(database_name) as connection:
+        connection.execute("""
+            CREATE TABLE habit (
+            habit_id INTEGER PRIMARY KEY,
+            name TEXT,
+            description TEXT,
+            periodicity INTEGER,
+            creation_datetime TEXT
+            )
+            """)
+        connection.execute("""
+            CREATE TABLE check_off_datetime (
+            id INTEGER PRIMARY KEY,
+            habit_id INTEGER,
+            check_off_datetime TEXT,
+            FOREIGN KEY(habit_id) REFERENCES habit(habit_id)
+            )
+            """)
+        connection.execute(
+            "CREATE UNIQUE INDEX check_off_datetime_habit_id_index ON check_off_datetime (habit_id, check_off_datetime)")
+        connection.executemany(
+            "INSERT INTO habit VALUES (?, ?, ?, ?, ?)", 
+            [(habit_id, f"habit {habit_id}", f"description {habit_id}", 1, start_datetime.isoformat()) 
+             for habit_id in range(number_of_habits)])
+
+        for habit_id in range(number_of_habits):
+            connection.executemany(
+                "INSERT INTO check_off_datetime (habit_id, check_off_datetime) VALUES (?, ?)", 
+                ((habit_id, (start_datetime + timedelta(days=day)).isoformat()) 
+                 for day in range(check_offs_per_habit)))
+
+        connection.execute("PRAGMA user_version = 2")
+        connection.commit()
+
+
+def benchmark_load(database_name, compact):
+    """
+    Measures and returns the time it takes to stream the check off table, group the stored timestamps by habit and build the check off history of each habit, as loading a database does. The timestamps get parsed by CheckOffHistory in either format.
+
+    Args:
+        database_name (str): The name of the database.
+        compact (bool): If True, the histories are packed into arrays, see CheckOffHistory.
+
+    Returns:
+        float: The time in seconds.
+    """
+
+    database_manager = DatabaseManager(database_name)
+
+    start_time = time.perf_counter()
+    timestamps = {}
+    for row in database_manager.iter_load(DatabaseTable.CHECK_OFF_DATETIME.name.lower()):
+        timestamps.setdefault(row[1], []).append(row[2])
+    for habit_timestamps in timestamps.values():
+        CheckOffHistory(habit_timestamps, compact=compact).get_longest_streak()
+    load_time = time.perf_counter() - start_time
+
+    database_manager.close()
+    return load_time
+
+
+if __name__ == "__main__":
+    sizes = ([int(argument) for argument in sys.argv[1:]] 
+             if len(sys.argv) > 1 
+             else [100_000, 1_000_000])
+    iso_database_name = "benchmark_habit_iso.db"
+    integer_database_name = "benchmark_habit.db"
+
+    for number_of_check_offs in sizes:
+        create_iso_database(iso_database_name, number_of_check_offs)
+        create_benchmark_database(integer_database_name, number_of_check_offs)
+
+        load_times = {
+            (database_name, compact): benchmark_load(database_name, compact) 
+            for database_name in [iso_database_name, integer_database_name] 
+            for compact in [False, True]}
+        iso_size = os.path.getsize(iso_database_name)
+        integer_size = os.path.getsize(integer_database_name)
+
+        database_manager = DatabaseManager(iso_database_name)
+        start_time = time.perf_counter()
+        SchemaMigrator(database_manager).migrate()
+        migration_time = time.perf_counter() - start_time
+        database_manager.close()
+
+        print(f"{number_of_check_offs} check offs:")
+        for name, database_name, size in [("ISO text", iso_database_name, iso_size), 
+                                          ("integers", integer_database_name, integer_size)]:
+            print(f"  {name}: loading took {load_times[(database_name, False)]:.2f} s, "
+                  f"{load_times[(database_name, True)]:.2f} s compact, "
+                  f"file size {size / 1e6:.1f} MB")
+        print(f"  migrating ISO text to integers took {migration_time:.2f} s")
@@ -1,8 +1,15 @@
+from datetime import datetime
 from enum import Enum
 
 __all__ = ["__init__", "database_manager", "habit", "habit_manager"]
 
 
+# Origin of the timestamps stored as microseconds
+EPOCH = datetime(year=1970, month=1, day=1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+
 class Periodicity(Enum):
     DAILY = 1
     WEEKLY = 7
@@ -11,13 +18,33 @@ class StreakType(Enum):
     CURRENT = 1
     LONGEST = 2
 
+class StreakEngine(Enum):
+    INCREMENTAL = 1
+    VECTORIZED = 2
+    PARALLEL = 3
+    SQL = 4
+    STATS = 5
+
+class DurabilityProfile(Enum):
+    SAFE = 1
+    BALANCED = 2
+    FAST = 3
+
 class DatabaseTable(Enum):
     HABIT = 1
     CHECK_OFF_DATETIME = 2
+    HABIT_STATS = 3
 
 class DatabaseCommand(Enum):
     CREATE_TABLE = 1
     INSERT_INTO = 2
     UPDATE = 3
     DELETE_FROM = 4
-    SELECT = 5
\ No newline at end of file
+    SELECT = 5
+    INSERT_OR_IGNORE = 6
+    CREATE_INDEX = 7
+    CREATE_UNIQUE_INDEX = 8
+    SELECT_PAGE = 9
+    SELECT_STREAKS = 10
+    SELECT_MAX = 11
+    SELECT_PERIOD_COUNTS = 12
\ No newline at end of file
@@ -0,0 +1,258 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from src.habit_manager import HabitManager
+
+
+class AsyncHabitManager:
+    """
+    Represents an asyncio front-end of a habit manager.
+
+    All operations run on a single database thread, so they never block the event loop and are serialized in the order they were requested. Check offs requested while the database thread is busy are collected and saved together with one HabitManager.check_off_many call, which is a single transaction. Any other operation first passes the collected check offs to the database thread, so they are applied before it.
+
+    If creating the habit manager fails, every later operation raises the error of its creation.
+
+    Attributes:
+        __executor (ThreadPoolExecutor): The database thread.
+        __habit_manager (HabitManager): The habit manager, created and used on the database thread only.
+        __creation_error (Exception): The error raised while creating the habit manager. None if it was created.
+        __pending_check_offs (list): The requested check offs that have not been passed to the database thread yet. Includes "(habit_id, datetimes, future)" tuples.
+        __check_off_task (asyncio.Task): The task passing the pending check offs to the database thread. None if no check offs are pending.
+        __statistics (dict): The counters exposed by get_statistics.
+    """
+
+    def __init__(self, database_name="habit.db", **habit_manager_arguments):
+        """
+        Initializes a new instance of the AsyncHabitManager class. The habit manager gets created on the database thread, so initializing does not block.
+
+        Args:
+            database_name (str): The name of the database where the habits get saved in and loaded from.
+            habit_manager_arguments (dict): Further keyword arguments of HabitManager.
+        """
+
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit_database")
+        self.__habit_manager = None
+        self.__creation_error = None
+        self.__pending_check_offs = []
+        self.__check_off_task = None
+        self.__statistics = {
+            "check_off_requests": 0,
+            "check_off_transactions": 0}
+
+        self.__executor.submit(self.__create_habit_manager, database_name, habit_manager_arguments)
+
+    async def __aenter__(self):
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+
+        await self.close()
+
+    async def create_habit(self, name, description, periodicity):
+        """
+        Creates a habit, see HabitManager.create_habit.
+
+        Args:
+            name (str): The name of the habit.
+            description (str): The description of the habit.
+            periodicity (Periodicity): The periodicity of the habit.
+        """
+
+        await self.__run(lambda habit_manager: habit_manager.create_habit(name, description, periodicity))
+
+    async def delete_habit(self, habit_id):
+        """
+        Deletes a habit, see HabitManager.delete_habit.
+
+        Args:
+            habit_id (int): The habit_id of the habit.
+        """
+
+        await self.__run(lambda habit_manager: habit_manager.delete_habit(habit_id))
+
+    async def check_off(self, habit_id, datetimes=None):
+        """
+        Checks off a habit for the given datetimes. Returns once the check offs are saved, together with all other check offs requested in the meantime.
+
+        Args:
+            habit_id (int): The habit_id of the habit to check off.
+            datetimes (list): The datetimes to check off. If None, the habit gets checked off now.
+        """
+
+        if datetimes is None:
+            datetimes = [datetime.now()]
+
+        future = asyncio.get_running_loop().create_future()
+        self.__pending_check_offs.append((habit_id, datetimes, future))
+        self.__statistics["check_off_requests"] += 1
+
+        if self.__check_off_task is None:
+            self.__check_off_task = asyncio.create_task(self.__save_pending_check_offs())
+
+        await future
+
+    async def get_streak(self, streak_type, habit_id=None):
+        """
+        Returns the habit streak, see HabitManager.get_streak.
+
+        Args:
+            streak_type (StreakType): The streak type to calculate.
+            habit_id (int): The habit_id of the habit to calculate the streak for. If None, the longest streak of all habits will be returned.
+
+        Returns:
+            int: The habit streak.
+        """
+
+        return await self.__run(lambda habit_manager: habit_manager.get_streak(streak_type, habit_id))
+
+    async def get_all_habits(self, periodicity=None):
+        """
+        Returns the habits, see HabitManager.get_all_habits.
+
+        Args:
+            periodicity (Periodicity): Only the habits with this periodicity get returned. If None, all habits will be returned
+
+        Returns:
+            list: The read-only views of the matching habits.
+        """
+
+        return await self.__run(lambda habit_manager: habit_manager.get_all_habits(periodicity))
+
+    async def close(self):
+        """
+        Waits for the pending check offs to be saved, closes the habit manager and stops the database thread.
+        """
+
+        if self.__check_off_task is not None:
+            await self.__check_off_task
+
+        # A habit manager whose creation failed has nothing to close
+        await asyncio.get_running_loop().run_in_executor(
+            self.__executor, 
+            lambda: self.__habit_manager.close() if self.__habit_manager is not None else None)
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.__executor.shutdown, wait=True))
+
+    def get_statistics(self):
+        """
+        Returns the check off statistics.
+
+        Returns:
+            dict: The number of requested check offs ("check_off_requests"), the number of transactions they were saved in ("check_off_transactions") and the average number of requests per transaction ("check_offs_per_transaction").
+        """
+
+        statistics = dict(self.__statistics)
+        statistics["check_offs_per_transaction"] = (
+            statistics["check_off_requests"] / statistics["check_off_transactions"]
+            if statistics["check_off_transactions"] > 0
+            else 0.0)
+
+        return statistics
+
+    async def __run(self, operation):
+        """
+        Runs an operation on the database thread and returns its result. The pending check offs get passed to the database thread first, so they are applied before the operation.
+
+        Args:
+            operation (function): The operation. Gets the habit manager as argument.
+
+        Returns:
+            object: The result of the operation.
+        """
+
+        # The database thread runs submitted functions in order, so both get submitted before awaiting either
+        check_off_batch = (self.__submit_pending_check_offs() 
+                           if self.__pending_check_offs != [] 
+                           else None)
+        result_future = asyncio.get_running_loop().run_in_executor(
+            self.__executor, lambda: operation(self.__get_habit_manager()))
+
+        if check_off_batch is not None:
+            await check_off_batch
+
+        return await result_future
+
+    async def __save_pending_check_offs(self):
+        """
+        Passes the pending check offs to the database thread until none are left. All check offs pending at a time get saved with one HabitManager.check_off_many call.
+        """
+
+        while self.__pending_check_offs != []:
+            await self.__submit_pending_check_offs()
+
+        self.__check_off_task = None
+
+    def __submit_pending_check_offs(self):
+        """
+        Passes all pending check offs to the database thread right away, to be saved with one HabitManager.check_off_many call.
+
+        Returns:
+            asyncio.Task: The task resolving the futures of the check offs once they are saved.
+        """
+
+        pending_check_offs = self.__pending_check_offs
+        self.__pending_check_offs = []
+
+        datetimes_by_habit_id = {}
+        for habit_id, datetimes, future in pending_check_offs:
+            datetimes_by_habit_id.setdefault(habit_id, []).extend(datetimes)
+
+        check_off_future = asyncio.get_running_loop().run_in_executor(
+            self.__executor, 
+            lambda: self.__get_habit_manager().check_off_many(datetimes_by_habit_id))
+
+        return asyncio.ensure_future(
+            self.__resolve_check_offs(check_off_future, pending_check_offs))
+
+    async def __resolve_check_offs(self, check_off_future, pending_check_offs):
+        """
+        Waits until check offs are saved and resolves their futures.
+
+        Args:
+            check_off_future (asyncio.Future): The future of the HabitManager.check_off_many call.
+            pending_check_offs (list): The saved check offs. Includes "(habit_id, datetimes, future)" tuples.
+        """
+
+        try:
+            await check_off_future
+            self.__statistics["check_off_transactions"] += 1
+
+            for habit_id, datetimes, future in pending_check_offs:
+                if not future.done():
+                    future.set_result(None)
+
+        except Exception as error:
+            for habit_id, datetimes, future in pending_check_offs:
+                if not future.done():
+                    future.set_exception(error)
+
+    def __get_habit_manager(self):
+        """
+        Returns the habit manager. Runs on the database thread.
+
+        Returns:
+            HabitManager: The habit manager.
+        """
+
+        if self.__creation_error is not None:
+            raise self.__creation_error
+
+        return self.__habit_manager
+
+    def __create_habit_manager(self, database_name, habit_manager_arguments):
+        """
+        Creates the habit manager and keeps the error if this fails. Runs on the database thread.
+
+        Args:
+            database_name (str): The name of the database where the habits get saved in and loaded from.
+            habit_manager_arguments (dict): Further keyword arguments of HabitManager.
+        """
+
+        try:
+            self.__habit_manager = HabitManager(database_name, **habit_manager_arguments)
+
+        except Exception as error:
+            self.__creation_error = error
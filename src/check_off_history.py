@@ -0,0 +1,379 @@
+import bisect
+import sys
+from array import array
+from datetime import datetime, timedelta
+from . import EPOCH, EPOCH_ORDINAL, MICROSECONDS_PER_DAY
+
+
+def to_microseconds(checked_off_datetime):
+    """
+    Converts a naive datetime to the number of microseconds since EPOCH.
+
+    Args:
+        checked_off_datetime (datetime.datetime): The datetime to convert.
+
+    Returns:
+        int: The microseconds since EPOCH.
+    """
+
+    return (checked_off_datetime - EPOCH) // timedelta(microseconds=1)
+
+
+def from_microseconds(microseconds):
+    """
+    Converts a number of microseconds since EPOCH to a naive datetime.
+
+    Args:
+        microseconds (int): The microseconds since EPOCH.
+
+    Returns:
+        datetime.datetime: The datetime.
+    """
+
+    # Positional arguments skip the keyword handling of timedelta, which is noticeable per loaded check off
+    return EPOCH + timedelta(0, 0, microseconds)
+
+
+def parse_datetime(checked_off_datetime):
+    """
+    Converts a datetime stored as microseconds since EPOCH or as ISO string to a naive datetime.
+
+    Args:
+        checked_off_datetime (int, str or datetime.datetime): The datetime to convert. A datetime.datetime is returned unchanged.
+
+    Returns:
+        datetime.datetime: The datetime.
+    """
+
+    if isinstance(checked_off_datetime, int):
+        return from_microseconds(checked_off_datetime)
+
+    if isinstance(checked_off_datetime, str):
+        return datetime.fromisoformat(checked_off_datetime)
+
+    return checked_off_datetime
+
+
+class CheckOffHistory:
+    """
+    Represents the checked off datetimes of a habit.
+
+    The datetimes are kept in a set for constant time membership tests and their dates as day ordinals in a list which stays sorted, so streaks can be calculated without sorting. Both hold exactly one entry per checked off datetime, which bounds the memory per check off, see get_memory_usage.
+
+    A compact history instead packs the naive datetimes as microseconds since EPOCH into a sorted array("q") and the day ordinals into an array("i"), which takes about 12 bytes per check off. Membership tests then take logarithmic time and datetime objects only get created while iterating. Datetimes passed as microseconds since EPOCH, as stored in the database, are packed without creating datetime objects. Datetimes passed as ISO strings are parsed on first use, so a compact history that is never used never parses its check offs.
+
+    A streak is a run of neighbouring sorted day ordinals which are exactly one period apart, so two check offs on the same day end a streak. The lengths of all runs are maintained on every add, which makes reading the current and the longest streak constant time. Adding a datetime in the middle of the history walks the runs next to it, appending after the latest datetime does not.
+
+    Attributes:
+        period (int): The number of days between two check offs of a streak.
+        compact (bool): If True, the history is packed into arrays.
+        __unparsed_datetimes (list): The datetimes, microseconds since EPOCH or ISO strings passed on initialization until they get parsed on first use, otherwise None.
+        __datetimes (set or array.array): The checked off datetimes, or their sorted microseconds since EPOCH if compact.
+        __ordinals (list or array.array): The sorted day ordinals of the checked off datetimes. Contains a day ordinal once per checked off datetime on that day.
+        __run_lengths (dict): The number of runs of each length. Includes "run length"-"number of runs" pairs.
+        __longest_run_length (int): The length of the longest run.
+        __last_run_length (int): The length of the run ending with the latest day ordinal.
+    """
+
+    def __init__(self, datetimes=[], period=1, compact=False):
+        """
+        Initializes a new instance of the CheckOffHistory class.
+
+        Args:
+            datetimes (list): The datetimes that are already checked off, either as datetime.datetime, as microseconds since EPOCH or as ISO strings.
+            period (int): The number of days between two check offs of a streak.
+            compact (bool): If True, the history is packed into arrays and gets parsed on first use.
+        """
+
+        self.period = period
+        self.compact = compact
+
+        self.__unparsed_datetimes = list(datetimes)
+
+        if not self.compact:
+            self.__parse()
+
+    def __parse(self):
+        """
+        Builds the datetimes, the day ordinals and the run lengths from self.__unparsed_datetimes, if that has not been done yet.
+        """
+
+        if self.__unparsed_datetimes is None:
+            return
+
+        if self.compact:
+            self.__datetimes = array("q", sorted({
+                checked_off_datetime
+                if isinstance(checked_off_datetime, int)
+                else to_microseconds(parse_datetime(checked_off_datetime))
+                for checked_off_datetime in self.__unparsed_datetimes}))
+            self.__ordinals = array(
+                "i",
+                (microseconds // MICROSECONDS_PER_DAY + EPOCH_ORDINAL
+                 for microseconds in self.__datetimes))
+        else:
+            self.__datetimes = set(map(parse_datetime, self.__unparsed_datetimes))
+            self.__ordinals = sorted(
+                checked_off_datetime.toordinal()
+                for checked_off_datetime in self.__datetimes)
+        self.__unparsed_datetimes = None
+
+        self.__run_lengths = {}
+        self.__longest_run_length = 0
+        self.__last_run_length = 0
+
+        run_length = 0
+        for i in range(len(self.__ordinals)):
+            if i > 0 and self.__ordinals[i] - self.__ordinals[i-1] == self.period:
+                run_length += 1
+            else:
+                self.__count_run(run_length, 1)
+                run_length = 1
+        self.__count_run(run_length, 1)
+        self.__last_run_length = run_length
+
+    def __contains__(self, checked_off_datetime):
+
+        self.__parse()
+
+        if self.compact:
+            microseconds = to_microseconds(checked_off_datetime)
+            position = bisect.bisect_left(self.__datetimes, microseconds)
+            return (position < len(self.__datetimes)
+                    and self.__datetimes[position] == microseconds)
+
+        return checked_off_datetime in self.__datetimes
+
+    def __len__(self):
+
+        self.__parse()
+
+        return len(self.__datetimes)
+
+    def __iter__(self):
+
+        self.__parse()
+
+        if self.compact:
+            return map(from_microseconds, self.__datetimes)
+
+        return iter(self.__datetimes)
+
+    def add(self, datetimes):
+        """
+        Adds datetimes which are not checked off yet.
+
+        Args:
+            datetimes (list): The datetimes to check off.
+
+        Returns:
+            list: The datetimes that had not been checked off before, in the given order.
+        """
+
+        self.__parse()
+
+        if self.compact:
+            return self.__add_compact(datetimes)
+
+        new_datetimes = []
+
+        for checked_off_datetime in datetimes:
+            if checked_off_datetime not in self.__datetimes:
+                self.__datetimes.add(checked_off_datetime)
+                self.__insert_ordinal(checked_off_datetime.toordinal())
+                new_datetimes.append(checked_off_datetime)
+
+        return new_datetimes
+
+    def __add_compact(self, datetimes):
+        """
+        Adds datetimes which are not checked off yet to a compact history.
+
+        Args:
+            datetimes (list): The datetimes to check off.
+
+        Returns:
+            list: The datetimes that had not been checked off before, in the given order.
+        """
+
+        new_datetimes = []
+
+        for checked_off_datetime in datetimes:
+            microseconds = to_microseconds(checked_off_datetime)
+            position = bisect.bisect_left(self.__datetimes, microseconds)
+
+            if (position == len(self.__datetimes)
+                or self.__datetimes[position] != microseconds):
+                self.__datetimes.insert(position, microseconds)
+                self.__insert_ordinal(microseconds // MICROSECONDS_PER_DAY + EPOCH_ORDINAL)
+                new_datetimes.append(checked_off_datetime)
+
+        return new_datetimes
+
+    def get_current_streak(self, today_ordinal):
+        """
+        Returns the current streak, which is the run ending with the latest check off if that is at most one period before today.
+
+        Args:
+            today_ordinal (int): The day ordinal of today.
+
+        Returns:
+            int: The current streak.
+        """
+
+        self.__parse()
+
+        if (len(self.__ordinals) == 0
+            or self.__ordinals[-1] < today_ordinal - self.period):
+            return 0
+
+        return self.__last_run_length
+
+    def get_last_streak(self):
+        """
+        Returns the length of the run ending with the latest check off, which is the current streak as long as the latest check off is at most one period before today.
+
+        Returns:
+            int: The length of the last run.
+        """
+
+        self.__parse()
+
+        return self.__last_run_length
+
+    def get_longest_streak(self):
+        """
+        Returns the longest streak.
+
+        Returns:
+            int: The longest streak.
+        """
+
+        self.__parse()
+
+        return self.__longest_run_length
+
+    def get_ordinals(self):
+        """
+        Returns the sorted day ordinals of the checked off datetimes. The returned list must not be changed.
+
+        Returns:
+            list or array.array: The sorted day ordinals, once per checked off datetime.
+        """
+
+        self.__parse()
+
+        return self.__ordinals
+
+    def __insert_ordinal(self, ordinal):
+        """
+        Inserts a day ordinal into self.__ordinals and updates the run lengths. Only the runs ending right before and starting right after the insertion position can change.
+
+        Args:
+            ordinal (int): The day ordinal to insert.
+        """
+
+        ordinals = self.__ordinals
+        position = bisect.bisect_right(ordinals, ordinal)
+        number_of_ordinals = len(ordinals)
+
+        # Length of the run part ending right before the position
+        if position == 0:
+            left_length = 0
+        elif position == number_of_ordinals:
+            left_length = self.__last_run_length
+        else:
+            left_length = 1
+            i = position - 1
+            while i > 0 and ordinals[i] - ordinals[i-1] == self.period:
+                left_length += 1
+                i -= 1
+
+        # Length of the run part starting at the position
+        right_length = 0
+        if position < number_of_ordinals:
+            right_length = 1
+            i = position
+            while (i < number_of_ordinals - 1
+                   and ordinals[i+1] - ordinals[i] == self.period):
+                right_length += 1
+                i += 1
+        right_is_last_run = position + right_length == number_of_ordinals
+
+        is_linked_left = position > 0 and ordinal - ordinals[position-1] == self.period
+        is_linked_right = (position < number_of_ordinals
+                           and ordinals[position] - ordinal == self.period)
+        was_linked = (0 < position < number_of_ordinals
+                      and ordinals[position] - ordinals[position-1] == self.period)
+
+        if was_linked:
+            self.__count_run(left_length + right_length, -1)
+        else:
+            self.__count_run(left_length, -1)
+            self.__count_run(right_length, -1)
+
+        new_run_length = 1
+        if is_linked_left:
+            new_run_length += left_length
+        else:
+            self.__count_run(left_length, 1)
+        if is_linked_right:
+            new_run_length += right_length
+        else:
+            self.__count_run(right_length, 1)
+        self.__count_run(new_run_length, 1)
+
+        if position == number_of_ordinals or (right_is_last_run and is_linked_right):
+            self.__last_run_length = new_run_length
+        elif right_is_last_run:
+            self.__last_run_length = right_length
+
+        ordinals.insert(position, ordinal)
+
+    def __count_run(self, run_length, change):
+        """
+        Changes the number of runs with a length and keeps self.__longest_run_length up to date.
+
+        Args:
+            run_length (int): The run length. Runs of length 0 are ignored.
+            change (int): The change of the number of runs, 1 or -1.
+        """
+
+        if run_length == 0:
+            return
+
+        number_of_runs = self.__run_lengths.get(run_length, 0) + change
+
+        if number_of_runs == 0:
+            del self.__run_lengths[run_length]
+            if run_length == self.__longest_run_length:
+                self.__longest_run_length = max(self.__run_lengths, default=0)
+        else:
+            self.__run_lengths[run_length] = number_of_runs
+            self.__longest_run_length = max(self.__longest_run_length, run_length)
+
+    def get_memory_usage(self):
+        """
+        Returns the memory used by the history. Per check off this is one datetime object, one set slot, one day ordinal object and one list slot, plus the amortized over-allocation of the set and the list. This takes constant time. A compact history only uses one 8 byte and one 4 byte array item per check off.
+
+        Returns:
+            dict: The total number of bytes ("total_bytes") and the number of bytes per check off ("bytes_per_check_off").
+        """
+
+        self.__parse()
+
+        total_bytes = (sys.getsizeof(self.__datetimes)
+                       + sys.getsizeof(self.__ordinals))
+
+        # All datetimes and all day ordinals have the same size, so one of each is measured
+        if not self.compact and len(self.__ordinals) > 0:
+            total_bytes += len(self.__ordinals) * (
+                sys.getsizeof(next(iter(self.__datetimes)))
+                + sys.getsizeof(self.__ordinals[0]))
+
+        bytes_per_check_off = (total_bytes / len(self.__datetimes)
+                               if len(self.__datetimes) > 0
+                               else 0.0)
+
+        return {"total_bytes": total_bytes,
+                "bytes_per_check_off": bytes_per_check_off}
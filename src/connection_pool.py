@@ -0,0 +1,216 @@
+import sqlite3
+import threading
+import time
+
+
+class ConnectionPool:
+    """
+    Represents a small thread-aware pool of long-lived SQLite connections.
+
+    A connection is checked out to exactly one thread at a time. Nested checkouts from the same thread get the connection the thread already holds, so a thread never needs more than one connection.
+
+    Attributes:
+        database_name (str): The name of the database the connections are opened on.
+        max_connections (int): The maximum number of connections that are open at the same time.
+        timeout (float): The number of seconds a connection waits for a database lock before raising an error.
+        cached_statements (int): The number of prepared statements each connection keeps for reuse.
+        pragmas (tuple): The pragmas set on every new connection. Includes "pragma name"-"value" pairs.
+        __idle_connections (list): The open connections that are currently not checked out.
+        __all_connections (list): All open connections.
+        __connections_to_close (list): The connections that were checked out while the pool was closed and get closed when they are returned.
+        __local (threading.local): The connection checked out by the current thread and its checkout depth.
+        __condition (threading.Condition): Synchronizes the checkout and return of connections.
+        __statistics (dict): The counters exposed by get_statistics.
+    """
+
+    def __init__(self,
+                 database_name,
+                 max_connections=5, timeout=5.0, cached_statements=128,
+                 pragmas=()):
+        """
+        Initializes a new instance of the ConnectionPool class. No connection is opened until one is requested.
+
+        Args:
+            database_name (str): The name of the database the connections are opened on.
+            max_connections (int): The maximum number of connections that are open at the same time.
+            timeout (float): The number of seconds a connection waits for a database lock before raising an error.
+            cached_statements (int): The number of prepared statements each connection keeps for reuse.
+            pragmas (tuple): The pragmas set on every new connection, in the given order. Must include "pragma name"-"value" pairs.
+        """
+
+        self.database_name = database_name
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pragmas = tuple(pragmas)
+
+        self.__idle_connections = []
+        self.__all_connections = []
+        self.__connections_to_close = []
+        self.__local = threading.local()
+        self.__condition = threading.Condition()
+        self.__statistics = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "reuses": 0,
+            "wait_time": 0.0}
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def acquire(self):
+        """
+        Checks out a connection for the current thread. Reuses an idle connection if possible, opens a new one if the pool is not full and waits for a returned connection otherwise.
+
+        Returns:
+            sqlite3.Connection: The checked out connection.
+        """
+
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None:
+            self.__local.depth += 1
+            return connection
+
+        with self.__condition:
+            self.__statistics["checkouts"] += 1
+
+            if (self.__idle_connections == []
+                and len(self.__all_connections) >= self.max_connections):
+                wait_start = time.perf_counter()
+                while (self.__idle_connections == []
+                       and len(self.__all_connections) >= self.max_connections):
+                    self.__condition.wait()
+                self.__statistics["wait_time"] += time.perf_counter() - wait_start
+
+            if self.__idle_connections != []:
+                connection = self.__idle_connections.pop()
+                self.__statistics["reuses"] += 1
+            else:
+                connection = self.__open_connection()
+                self.__all_connections.append(connection)
+
+        self.__local.connection = connection
+        self.__local.depth = 1
+        return connection
+
+    def release(self, connection, rollback=False):
+        """
+        Returns a connection checked out by the current thread to the pool.
+
+        Args:
+            connection (sqlite3.Connection): The connection to return.
+            rollback (bool): If True, the open transaction of the connection gets rolled back when the outermost checkout of the thread returns it.
+        """
+
+        self.__local.depth -= 1
+        if self.__local.depth > 0:
+            return
+
+        self.__local.connection = None
+
+        if rollback:
+            connection.rollback()
+
+        with self.__condition:
+            if connection in self.__connections_to_close:
+                connection.close()
+                self.__connections_to_close.remove(connection)
+                self.__all_connections.remove(connection)
+                self.__statistics["connections_closed"] += 1
+            else:
+                self.__idle_connections.append(connection)
+            self.__condition.notify()
+
+    def connection(self):
+        """
+        Returns a context manager that checks out a connection and returns it to the pool afterwards.
+
+        Returns:
+            PooledConnection: The context manager yielding the connection.
+        """
+
+        return PooledConnection(self)
+
+    def close(self):
+        """
+        Closes all idle connections. Connections that are checked out get closed as soon as they are returned.
+        """
+
+        with self.__condition:
+            for connection in self.__idle_connections:
+                connection.close()
+                self.__all_connections.remove(connection)
+                self.__statistics["connections_closed"] += 1
+            self.__idle_connections = []
+            self.__connections_to_close = list(self.__all_connections)
+
+    def get_statistics(self):
+        """
+        Returns the usage statistics of the pool.
+
+        Returns:
+            dict: The number of opened, closed and currently open connections, the number of checkouts and reuses, the reuse rate and the total time spent waiting for a connection in seconds.
+        """
+
+        with self.__condition:
+            statistics = dict(self.__statistics)
+            statistics["open_connections"] = len(self.__all_connections)
+
+        statistics["reuse_rate"] = (statistics["reuses"] / statistics["checkouts"]
+                                    if statistics["checkouts"] > 0
+                                    else 0.0)
+        return statistics
+
+    def __open_connection(self):
+        """
+        Opens and returns a new connection and sets the pragmas on it.
+
+        Returns:
+            sqlite3.Connection: The new connection.
+        """
+
+        connection = sqlite3.connect(self.database_name,
+                                     timeout=self.timeout,
+                                     check_same_thread=False,
+                                     cached_statements=self.cached_statements)
+        for pragma_name, value in self.pragmas:
+            connection.execute(f"PRAGMA {pragma_name} = {value}")
+        self.__statistics["connections_opened"] += 1
+        return connection
+
+
+class PooledConnection:
+    """
+    Represents the checkout of a pooled connection for the duration of a with block.
+
+    Attributes:
+        __connection_pool (ConnectionPool): The pool the connection gets checked out from.
+        __connection (sqlite3.Connection): The checked out connection.
+    """
+
+    def __init__(self, connection_pool):
+        """
+        Initializes a new instance of the PooledConnection class.
+
+        Args:
+            connection_pool (ConnectionPool): The pool the connection gets checked out from.
+        """
+
+        self.__connection_pool = connection_pool
+        self.__connection = None
+
+    def __enter__(self):
+
+        self.__connection = self.__connection_pool.acquire()
+        return self.__connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.__connection_pool.release(self.__connection,
+                                       rollback=exc_type is not None)
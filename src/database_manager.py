@@ -1,48 +1,184 @@
+import json
 import sqlite3
-import copy
-from . import DatabaseCommand
+import contextlib
+import threading
+from . import DatabaseCommand, DurabilityProfile, EPOCH_ORDINAL, MICROSECONDS_PER_DAY
+from src.connection_pool import ConnectionPool
 
 
 class DatabaseManager:
     """
     Represents a database manager.
 
+    Connections are kept open in a pool and reused by all operations until close gets called. The instance can be used as a context manager, which closes the connections on exit.
+
+    Write operations of all threads take turns on a lock before they check out a connection, so they queue within the process instead of polling the database lock, which lets writers starve under contention. Reads do not take the lock.
+
+    A durability profile trades durability for speed by setting pragmas on every connection. All profiles use write-ahead logging, so readers do not block the writer and the writer does not block readers. "DurabilityProfile.SAFE" syncs every commit to disk. "DurabilityProfile.BALANCED" only syncs at checkpoints, so a power loss may roll back the latest commits but never corrupts the database. "DurabilityProfile.FAST" never syncs and keeps more pages in memory, so a power loss or an operating system crash may corrupt the database. Without a profile the SQLite defaults apply.
+
+    SQL command strings are parameterized and created once per command, table and set of columns. Values always get bound as parameters, so equal commands share one prepared statement in the statement cache of each connection.
+
+    Where expressions are "column name"-"value" pairs that compare the column with the value for equality. A column name may be followed by an operator, e.g. "check_off_datetime >=", which is one of "=", ">", ">=", "<", "<=" and "IN". The value of "IN" is a list, which gets bound as a single JSON array, so lists of any length share one command string. Columns compared for equality first and by range last can be served by one index.
+
     Attributes:
         database_name (str): The name of the database where the data gets stored and loaded from.
+        durability_profile (DurabilityProfile): The durability profile of the connections. None for the SQLite defaults.
+        WHERE_OPERATORS (tuple): The operators of where expressions.
+        DURABILITY_PRAGMAS (dict): The pragmas of each durability profile. Includes "durability profile"-"tuple of pragma name-value pairs" pairs.
+        __sql_strings (dict): The created SQL command strings, shared by all instances.
+        __connection_pool (ConnectionPool): The pool of connections to the database.
+        __unique_indexes (dict): The column sets of the unique indexes of each database table, filled on first use.
+        __local (threading.local): The transaction depth of the current thread.
+        __write_lock (threading.RLock): Serializes the write operations of all threads.
     """
 
-    def __init__(self, database_name):
+    WHERE_OPERATORS = ("=", ">", ">=", "<", "<=", "IN")
+
+    DURABILITY_PRAGMAS = {
+        DurabilityProfile.SAFE: (
+            ("journal_mode", "WAL"), 
+            ("synchronous", "FULL"), 
+            ("cache_size", -8_000), 
+            ("mmap_size", 0), 
+            ("temp_store", "DEFAULT")), 
+        DurabilityProfile.BALANCED: (
+            ("journal_mode", "WAL"), 
+            ("synchronous", "NORMAL"), 
+            ("cache_size", -32_000), 
+            ("mmap_size", 64_000_000), 
+            ("temp_store", "MEMORY")), 
+        DurabilityProfile.FAST: (
+            ("journal_mode", "WAL"), 
+            ("synchronous", "OFF"), 
+            ("cache_size", -128_000), 
+            ("mmap_size", 256_000_000), 
+            ("temp_store", "MEMORY"))}
+
+    __sql_strings = {}
+
+    def __init__(self, database_name, max_connections=5, durability_profile=None):
         """
         Initializes a new instance of the DatabaseManager class.
 
         Args:
             database_name (str): The name of the database where the data gets stored and loaded from.
+            max_connections (int): The maximum number of connections that are open at the same time.
+            durability_profile (DurabilityProfile): The durability profile of the connections. If None, the SQLite defaults apply.
         """
         
         self.database_name = database_name
+        self.durability_profile = durability_profile
+
+        self.__connection_pool = ConnectionPool(
+            self.database_name, 
+            max_connections=max_connections, 
+            pragmas=self.DURABILITY_PRAGMAS.get(self.durability_profile, ()))
+        self.__local = threading.local()
+        self.__write_lock = threading.RLock()
+        self.__unique_indexes = {}
+
+    def __enter__(self):
+
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def __del__(self):
+
+        self.close()
+
+    def open(self):
+        """
+        Opens a connection to the database so that the first operation does not have to. Operations after close reopen connections on demand.
+        """
+
+        try:
+            with self.__connection_pool.connection():
+                pass
+
+        except Exception as error:
+            print(f"During opening the database an error occurred: {error}")
+
+    def close(self):
+        """
+        Closes all connections to the database.
+        """
+
+        self.__connection_pool.close()
+
+    def get_statistics(self):
+        """
+        Returns the connection statistics.
+
+        Returns:
+            dict: The connection pool statistics, see ConnectionPool.get_statistics.
+        """
+
+        return self.__connection_pool.get_statistics()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Returns a context manager that bundles all operations of the current thread within the with block in a single transaction. The transaction gets committed at the end of the with block and rolled back if an error occurs, including errors of save_many and delete, which get raised instead of printed within a transaction. Nested transactions become part of the outermost one.
+
+        Yields:
+            sqlite3.Cursor: A cursor for executing additional SQL commands within the transaction.
+        """
+
+        with self.__write_lock, self.__connection_pool.connection() as connection:
+            transaction_depth = getattr(self.__local, "transaction_depth", 0)
+            if transaction_depth == 0 and not connection.in_transaction:
+                connection.execute("BEGIN IMMEDIATE")
+
+            self.__local.transaction_depth = transaction_depth + 1
+            try:
+                yield connection.cursor()
+            finally:
+                self.__local.transaction_depth = transaction_depth
+
+            if transaction_depth == 0:
+                connection.commit()
 
     def initialize_database(self, 
                             database_table_name, data_structure, 
-                            foreign_keys={}):
+                            foreign_keys={}, indexes={}, unique_indexes={}):
         """
-        Creates a database table.
+        Creates a database table and its indexes.
 
         Args:
             database_table_name (str): The name of the database table that should be created.
             data_structure (dict): The data structure of the database table. Must include "column name"-"data type" pairs.
             foreign_keys (dict): The foreign keys of the database table. Must include "foreign key"-"reference" pairs.
+            indexes (dict): The indexes of the database table. Must include "index name"-"list of column names" pairs.
+            unique_indexes (dict): The unique indexes of the database table. Must include "index name"-"list of column names" pairs. Existing data records must not violate them.
         """
 
         try:
-            with sqlite3.connect(self.database_name) as connection:
+            with self.__write_lock, self.__connection_pool.connection() as connection:
                 cursor = connection.cursor()
                 sql_command = self.__create_sql_string(
                     DatabaseCommand.CREATE_TABLE, 
                     database_table_name, 
-                    data_structure, 
-                    foreign_keys)
+                    data_structure=tuple(data_structure.items()), 
+                    foreign_keys=tuple(foreign_keys.items()))
                 cursor.execute(sql_command)
-                connection.commit()
+
+                for command, index_columns in [
+                        (DatabaseCommand.CREATE_INDEX, indexes), 
+                        (DatabaseCommand.CREATE_UNIQUE_INDEX, unique_indexes)]:
+                    for index_name, column_names in index_columns.items():
+                        sql_command = self.__create_sql_string(
+                            command, 
+                            database_table_name, 
+                            keys=tuple(column_names), 
+                            index_name=index_name)
+                        cursor.execute(sql_command)
+
+                self.__unique_indexes.pop(database_table_name, None)
+                self.__commit(connection)
 
         except Exception as error:
             print(f"During initializing the database an error occurred: {error}")
@@ -56,58 +192,74 @@ class DatabaseManager:
         Args:
             database_table_name (str): The name of the database table where the data record should be saved in.
             data_record (dict): The data record to save in the database table. Must include "column name"-"value" pairs.
-            primary_key_name (str): The name of the primary key. If not first key of the table, primary key will automatically get created.
+            primary_key_name (str): The name of the primary key. If not first key of the data record, the primary key gets assigned by the database.
             only_insert_if_unique (bool): If True, the data record will only get inserted into the database table if it is unique (not considering the primary key).
         """
 
+        self.save_many(database_table_name, 
+                       [data_record], 
+                       primary_key_name, 
+                       only_insert_if_unique)
+
+    def save_many(self, 
+                  database_table_name, data_records, primary_key_name, 
+                  only_insert_if_unique=False):
+        """
+        Saves multiple data records in a database table within a single transaction. Errors get printed, but within a transaction started with transaction they get raised, so the whole transaction gets rolled back.
+
+        Args:
+            database_table_name (str): The name of the database table where the data records should be saved in.
+            data_records (list): The data records to save in the database table. Each data record must include the same "column name"-"value" pairs.
+            primary_key_name (str): The name of the primary key. If not first key of the data records, the primary keys get assigned by the database. This requires the primary key to be declared as "INTEGER", then it is an alias for the rowid and the database allocates the next key atomically even with concurrent writers.
+            only_insert_if_unique (bool): If True, data records will only get inserted into the database table if they are unique (not considering the primary key), both within the table and within data_records. If a unique index on exactly these columns exists, duplicates get ignored by the index, otherwise each data record gets checked with a subquery.
+        """
+
+        if data_records == []:
+            return
+
         try:
-            with sqlite3.connect(self.database_name) as connection:
+            with self.__write_lock, self.__connection_pool.connection() as connection:
                 cursor = connection.cursor()
 
-                # Create primary key if not given
-                first_key = next(iter(data_record))
+                # Let the database assign the primary key if not given, otherwise insert or update
+                first_key = next(iter(data_records[0]))
                 if primary_key_name != first_key:
-                    primary_key_value = self.__create_primary_key(
-                        database_table_name, 
-                        cursor)
-                    data_record = ({primary_key_name: str(primary_key_value)} 
-                                   | data_record)
+                    command = DatabaseCommand.INSERT_INTO
+                else:
+                    command = DatabaseCommand.UPDATE
+
+                # Data records which are not unique get skipped by the command itself
+                keys = tuple(data_records[0].keys())
+                unique_keys = (tuple(key for key in keys if key != primary_key_name) 
+                               if only_insert_if_unique 
+                               else ())
+                if (command == DatabaseCommand.INSERT_INTO 
+                    and unique_keys != () 
+                    and self.__has_unique_index(cursor, database_table_name, unique_keys)):
+                    command = DatabaseCommand.INSERT_OR_IGNORE
+                    unique_keys = ()
 
-                # Check if primary_key exists already, then insert or update in database
                 sql_command = self.__create_sql_string(
-                    DatabaseCommand.SELECT, 
+                    command, 
                     database_table_name, 
-                    where_expressions={primary_key_name: data_record[primary_key_name]})
-                cursor.execute(sql_command)
-                primary_key_result = cursor.fetchall()
-
-                # Check if data record is unique
-                data_record_copy = copy.deepcopy(data_record)
-                del data_record_copy[primary_key_name]
+                    keys=keys, 
+                    unique_keys=unique_keys)
+                cursor.executemany(
+                    sql_command, 
+                    [[data_record[key] for key in keys + unique_keys] 
+                     for data_record in data_records])
 
-                sql_command = self.__create_sql_string(
-                    DatabaseCommand.SELECT, 
-                    database_table_name, 
-                    where_expressions=data_record_copy)
-                cursor.execute(sql_command)
-                same_records_result = cursor.fetchall()
-
-                if (only_insert_if_unique == False 
-                    or (only_insert_if_unique and same_records_result == [])):
-                    if primary_key_result == []:
-                        sql_command = self.__create_sql_string(DatabaseCommand.INSERT_INTO, database_table_name, data_record=data_record)
-                    else:
-                        sql_command = self.__create_sql_string(DatabaseCommand.UPDATE, database_table_name, data_record=data_record)
-                cursor.execute(sql_command)
+                self.__commit(connection)
 
-                connection.commit()
-            
         except Exception as error:
+            # Within a transaction the error has to reach transaction, which rolls back the other operations
+            if self.__is_in_transaction():
+                raise
             print(f"During saving in the database an error occurred: {error}")
 
     def delete(self, database_table_name, where_expressions={}):
         """
-        Deletes records from a database table.
+        Deletes records from a database table. Errors get printed, but within a transaction started with transaction they get raised, so the whole transaction gets rolled back.
 
         Args:
             database_table_name (str): The name of the database table where data should be deleted from.
@@ -115,39 +267,53 @@ class DatabaseManager:
         """
 
         try:
-            with sqlite3.connect(self.database_name) as connection:
+            with self.__write_lock, self.__connection_pool.connection() as connection:
                 cursor = connection.cursor()
                 sql_command = self.__create_sql_string(
                     DatabaseCommand.DELETE_FROM, 
                     database_table_name, 
-                    where_expressions=where_expressions)
-                cursor.execute(sql_command)
+                    keys=tuple(where_expressions.keys()))
+                cursor.execute(sql_command, self.__get_where_values(where_expressions))
 
-                connection.commit()
+                self.__commit(connection)
 
         except Exception as error:
+            if self.__is_in_transaction():
+                raise
             print(f"During deleting from the database an error occurred: {error}")
 
-    def load(self, database_table_name, where_expressions={}):
+    def load(self, 
+             database_table_name, where_expressions={}, 
+             order_key_name=None, descending=False, limit=None):
         """
         Loads and returns a database table.
 
         Args:
             database_table_name (str): The name of the database table where data should be loaded from.
-            where_expressions (dict): Defines the where expressions of the command. Must include "column name"-"value" pairs.
+            where_expressions (dict): Defines the where expressions of the command. Must include "column name"-"value" pairs, where column names may be followed by an operator, e.g. {"habit_id IN": [0, 1], "check_off_datetime >=": 0}.
+            order_key_name (str): The name of the column the rows get ordered by. If None, the rows are not ordered.
+            descending (bool): If True, the rows get ordered from the largest to the smallest value of order_key_name.
+            limit (int): The maximum number of rows. If None, all matching rows get loaded.
 
         Returns:
             list: The loaded table.
         """
 
         try:
-            with sqlite3.connect(self.database_name) as connection:
+            with self.__connection_pool.connection() as connection:
                 cursor = connection.cursor()
                 sql_command = self.__create_sql_string(
                     DatabaseCommand.SELECT, 
                     database_table_name, 
-                    where_expressions=where_expressions)
-                cursor.execute(sql_command)
+                    keys=tuple(where_expressions.keys()), 
+                    order_key=(f"{order_key_name} DESC" 
+                               if order_key_name is not None and descending 
+                               else order_key_name or ""))
+
+                # A negative limit does not limit the rows
+                cursor.execute(sql_command, 
+                               (*self.__get_where_values(where_expressions), 
+                                limit if limit is not None else -1))
 
                 result = cursor.fetchall()
                 return result
@@ -163,48 +329,316 @@ class DatabaseManager:
             print(f"During loading from the database an error occurred: {error}")
             return None
             
-    def __create_primary_key(self, database_table_name, cursor):
+    def load_streaks(self, 
+                     database_table_name, group_key_name, timestamp_key_name, 
+                     period_reference, today_ordinal, where_expressions={}):
+        """
+        Calculates the current and the longest streak of each group of rows within the database, without loading the rows.
+
+        The timestamps are microseconds since 1970-01-01 and get converted to day ordinals. A streak is a run of rows, ordered by timestamp, whose day ordinals are exactly one period apart, so two rows on the same day end a streak. The runs are found with window functions in a single ordered pass over the rows, which the index on the group key and the timestamp serves without sorting: a row starts a new run unless its day ordinal is one period after the one of the previous row. Only the run starts and the last row of each group are kept, and the length of a run is the distance between the row numbers of its start and the next start. The current streak is the length of the last run if it ends at most one period before today, otherwise 0.
+
+        Args:
+            database_table_name (str): The name of the database table with the timestamps.
+            group_key_name (str): The name of the column the rows get grouped by.
+            timestamp_key_name (str): The name of the column with the timestamps. Should be unique within each group.
+            period_reference (str): The column with the period of each group in days, as "table(column)". The table gets joined on group_key_name.
+            today_ordinal (int): The day ordinal of today.
+            where_expressions (dict): Defines the where expressions on the columns of database_table_name. Must include "column name"-"value" pairs.
+
+        Returns:
+            list: The "(group key, current streak, longest streak, last streak, last day ordinal, number of rows)" tuples of all groups with rows, ordered by group key. The last streak is the length of the run ending with the last row.
+        """
+
+        try:
+            with self.__connection_pool.connection() as connection:
+                cursor = connection.cursor()
+                sql_command = self.__create_sql_string(
+                    DatabaseCommand.SELECT_STREAKS, 
+                    database_table_name, 
+                    keys=tuple(where_expressions.keys()), 
+                    foreign_keys=((group_key_name, period_reference),), 
+                    order_key=timestamp_key_name)
+                cursor.execute(sql_command, 
+                               (*self.__get_where_values(where_expressions), today_ordinal))
+
+                return cursor.fetchall()
+
+        except sqlite3.OperationalError as error:
+            if "no such table: " in str(error):
+                return []
+            else:
+                print(f"During calculating streaks in the database an error occurred: {error}")
+                return None
+
+        except Exception as error:
+            print(f"During calculating streaks in the database an error occurred: {error}")
+            return None
+
+    def load_pragma(self, pragma_name):
+        """
+        Loads and returns the value of a pragma. No transaction gets started, so this neither takes nor waits for the write lock of the database.
+
+        Args:
+            pragma_name (str): The name of the pragma, e.g. "user_version".
+
+        Returns:
+            object: The value of the pragma. None if an error occurred.
         """
-        Creates and returns a primary key.
+
+        try:
+            with self.__connection_pool.connection() as connection:
+                return connection.execute(f"PRAGMA {pragma_name}").fetchone()[0]
+
+        except Exception as error:
+            print(f"During loading from the database an error occurred: {error}")
+            return None
+
+    def load_max(self, database_table_name, key_name, where_expressions={}):
+        """
+        Loads and returns the largest value of a column. With an index on the column this reads a single index entry.
+
+        Args:
+            database_table_name (str): The name of the database table where data should be loaded from.
+            key_name (str): The name of the column.
+            where_expressions (dict): Defines the where expressions of the command. Must include "column name"-"value" pairs.
+
+        Returns:
+            object: The largest value. None if the table has no matching rows.
+        """
+
+        try:
+            with self.__connection_pool.connection() as connection:
+                cursor = connection.cursor()
+                sql_command = self.__create_sql_string(
+                    DatabaseCommand.SELECT_MAX, 
+                    database_table_name, 
+                    keys=tuple(where_expressions.keys()), 
+                    order_key=key_name)
+                cursor.execute(sql_command, self.__get_where_values(where_expressions))
+
+                return cursor.fetchone()[0]
+
+        except sqlite3.OperationalError as error:
+            if "no such table: " not in str(error):
+                print(f"During loading from the database an error occurred: {error}")
+            return None
+
+        except Exception as error:
+            print(f"During loading from the database an error occurred: {error}")
+            return None
+
+    def load_period_counts(self, 
+                           database_table_name, group_key_name, timestamp_key_name, 
+                           period_reference, start_ordinal, where_expressions={}):
+        """
+        Counts the periods with rows and the rows of each group of rows within the database, without loading the rows.
+
+        The timestamps are microseconds since 1970-01-01 and get converted to day ordinals. The periods of a group are counted from start_ordinal on, so the days start_ordinal to start_ordinal + period - 1 form the first period. Rows before start_ordinal should be excluded by the where expressions, e.g. with {"check_off_datetime >=": start}, which an index on the group key and the timestamp serves with one range per group.
+
+        Args:
+            database_table_name (str): The name of the database table with the timestamps.
+            group_key_name (str): The name of the column the rows get grouped by.
+            timestamp_key_name (str): The name of the column with the timestamps.
+            period_reference (str): The column with the period of each group in days, as "table(column)". The table gets joined on group_key_name.
+            start_ordinal (int): The day ordinal the first period of each group starts on.
+            where_expressions (dict): Defines the where expressions on the columns of database_table_name, see load.
+
+        Returns:
+            list: The "(group key, number of periods with rows, number of rows)" tuples of all groups with matching rows, ordered by group key.
+        """
+
+        try:
+            with self.__connection_pool.connection() as connection:
+                cursor = connection.cursor()
+                sql_command = self.__create_sql_string(
+                    DatabaseCommand.SELECT_PERIOD_COUNTS, 
+                    database_table_name, 
+                    keys=tuple(where_expressions.keys()), 
+                    foreign_keys=((group_key_name, period_reference),), 
+                    order_key=timestamp_key_name)
+                cursor.execute(sql_command, 
+                               (start_ordinal, *self.__get_where_values(where_expressions)))
+
+                return cursor.fetchall()
+
+        except sqlite3.OperationalError as error:
+            if "no such table: " in str(error):
+                return []
+            else:
+                print(f"During counting periods in the database an error occurred: {error}")
+                return None
+
+        except Exception as error:
+            print(f"During counting periods in the database an error occurred: {error}")
+            return None
+
+    def iter_load(self, 
+                  database_table_name, where_expressions={}, 
+                  chunk_size=1000, batches=False, key_name=None):
+        """
+        Loads a database table in chunks and yields its rows, so only one chunk is in memory at a time.
+
+        Without key_name the rows come from a single query, which keeps a connection checked out until the generator is exhausted or closed. With key_name each chunk is queried on its own with keyset pagination ("WHERE key_name > ? ORDER BY key_name LIMIT ?"), so no connection is held between chunks and an index on key_name serves every chunk.
+
+        Args:
+            database_table_name (str): The name of the database table where data should be loaded from.
+            where_expressions (dict): Defines the where expressions of the command. Must include "column name"-"value" pairs.
+            chunk_size (int): The number of rows fetched at a time.
+            batches (bool): If True, lists of up to chunk_size rows get yielded instead of single rows.
+            key_name (str): The name of a unique column to paginate by, rows where it is NULL are skipped. If None, the rows are not paginated.
+
+        Yields:
+            tuple or list: The loaded rows, or lists of them if batches is True.
+        """
+
+        try:
+            if key_name is None:
+                with self.__connection_pool.connection() as connection:
+                    cursor = connection.cursor()
+                    sql_command = self.__create_sql_string(
+                        DatabaseCommand.SELECT, 
+                        database_table_name, 
+                        keys=tuple(where_expressions.keys()))
+                    cursor.execute(sql_command, 
+                                   (*self.__get_where_values(where_expressions), -1))
+
+                    rows = cursor.fetchmany(chunk_size)
+                    while rows != []:
+                        if batches:
+                            yield rows
+                        else:
+                            yield from rows
+                        rows = cursor.fetchmany(chunk_size)
+
+                return
+
+            sql_command = self.__create_sql_string(
+                DatabaseCommand.SELECT_PAGE, 
+                database_table_name, 
+                keys=tuple(where_expressions.keys()), 
+                order_key=key_name)
+            key_index = None
+
+            # Negative infinity sorts before all numbers and texts, so the first page starts with the smallest key
+            last_key = float("-inf")
+
+            while True:
+                with self.__connection_pool.connection() as connection:
+                    cursor = connection.cursor()
+                    cursor.execute(sql_command, 
+                                   (*self.__get_where_values(where_expressions), last_key, chunk_size))
+                    rows = cursor.fetchall()
+
+                    if key_index is None:
+                        key_index = [column[0] for column in cursor.description].index(key_name)
+
+                if rows == []:
+                    return
+
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+
+                if len(rows) < chunk_size:
+                    return
+                last_key = rows[-1][key_index]
+
+        except sqlite3.OperationalError as error:
+            if "no such table: " not in str(error):
+                print(f"During loading from the database an error occurred: {error}")
+
+        except Exception as error:
+            print(f"During loading from the database an error occurred: {error}")
+
+    def __commit(self, connection):
+        """
+        Commits the open transaction of a connection unless it is part of a transaction started with transaction.
+
+        Args:
+            connection (sqlite3.Connection): The connection to commit.
+        """
+
+        if not self.__is_in_transaction():
+            connection.commit()
+
+    def __is_in_transaction(self):
+        """
+        Checks whether the current thread is within a transaction started with transaction.
+
+        Returns:
+            bool: True if the current thread is within such a transaction.
+        """
+
+        return getattr(self.__local, "transaction_depth", 0) > 0
+
+    def __has_unique_index(self, cursor, database_table_name, keys):
+        """
+        Checks whether a unique index on exactly the given columns exists. The unique indexes of each database table get looked up once and are then taken from self.__unique_indexes.
 
         Args:
-            database_table_name (str): The name of the database table where the primary key will become part of.
             cursor (sqlite3.Cursor): The cursor used for executing SQL commands.
+            database_table_name (str): The name of the database table.
+            keys (tuple): The column names.
 
         Returns:
-            int: The primary key.
+            bool: True if such a unique index exists.
         """
 
-        sql_command = self.__create_sql_string(
-            DatabaseCommand.SELECT, 
-            database_table_name)
-        cursor.execute(sql_command)
-        primary_key_result = cursor.fetchall()
+        unique_indexes = self.__unique_indexes.get(database_table_name)
 
-        primary_key = 0
-        existing_primary_keys = [
-            result_row[0] 
-            for result_row in primary_key_result]
-        
-        while primary_key in existing_primary_keys:
-            primary_key += 1
-        
-        return primary_key
+        if unique_indexes is None:
+            unique_indexes = []
+            index_list = cursor.execute(
+                f"PRAGMA index_list({database_table_name})").fetchall()
+            for index in index_list:
+                if index[2]:
+                    index_info = cursor.execute(
+                        f"PRAGMA index_info({index[1]})").fetchall()
+                    unique_indexes.append(
+                        frozenset(column[2] for column in index_info))
+            self.__unique_indexes[database_table_name] = unique_indexes
+
+        return frozenset(keys) in unique_indexes
 
     def __create_sql_string(self, 
                             command, table_name, 
-                            data_structure=None, data_record=None, 
-                            foreign_keys={}, where_expressions={}):
+                            keys=(), unique_keys=(), 
+                            data_structure=(), foreign_keys=(), 
+                            index_name="", order_key=""):
         """
-        Creates and returns specific SQL command strings ready to be executed.
+        Returns the parameterized SQL command string for a command, a table and a set of columns. Each string gets created once and is then taken from self.__sql_strings.
 
         Args:
             command (DatabaseCommand): The command to create a string for.
             table_name (str): The name of the database table where data should be written to or read from.
-            data_structure (dict): The data structure for creating database tables. Must include "column name"-"data type" pairs. Only used for command "DatabaseCommand.CREATE_TABLE".
-            data_record (dict): The data record to save in the database. Must include "column name"-"value" pairs. Only used for commands "DatabaseCommand.INSERT_INTO" and "DatabaseCommand.UPDATE".
-            foreign_keys (dict): The foreign keys of the database table. Must include "foreign key"-"reference" pairs. Only used for command "DatabaseCommand.CREATE_TABLE".
-            where_expressions (dict): Defines the where expressions of the command. Must include "column name"-"value" pairs. Only used for commands "DatabaseCommand.DELETE_FROM" and "DatabaseCommand.SELECT".
+            keys (tuple): The column names the values get bound to. For commands "DatabaseCommand.INSERT_INTO" and "DatabaseCommand.UPDATE" the columns of the data records, where "DatabaseCommand.UPDATE" inserts or updates the data record with the same primary key, which must be the first key. For the other commands the columns of the where expressions, optionally followed by an operator.
+            unique_keys (tuple): If not empty, a data record only gets written if no data record with the same values in these columns exists. The values of these columns must be bound again after the values of keys. Only used for commands "DatabaseCommand.INSERT_INTO" and "DatabaseCommand.UPDATE".
+            data_structure (tuple): The data structure for creating database tables. Must include "column name"-"data type" pairs. Only used for command "DatabaseCommand.CREATE_TABLE".
+            foreign_keys (tuple): The foreign keys of the database table. Must include "foreign key"-"reference" pairs. Only used for command "DatabaseCommand.CREATE_TABLE", and for commands "DatabaseCommand.SELECT_STREAKS" and "DatabaseCommand.SELECT_PERIOD_COUNTS" as the single "group key"-"period reference" pair.
+            index_name (str): The name of the index to create. Only used for commands "DatabaseCommand.CREATE_INDEX" and "DatabaseCommand.CREATE_UNIQUE_INDEX", which index the columns in keys.
+            order_key (str): The column to paginate by. Only used for command "DatabaseCommand.SELECT_PAGE", which selects the rows matching the where expressions of keys whose order_key is greater than the next bound value, ordered by order_key and limited to the last bound value, for command "DatabaseCommand.SELECT" as the optional ordering, e.g. "check_off_datetime DESC", where the limit gets bound last, for commands "DatabaseCommand.SELECT_STREAKS" and "DatabaseCommand.SELECT_PERIOD_COUNTS" as the timestamp column, see load_streaks and load_period_counts, and for command "DatabaseCommand.SELECT_MAX" as the column whose largest value gets selected.
+
+        Returns:
+            str: The SQL command string.
+        """
+
+        cache_key = (command, table_name, keys, unique_keys, data_structure, foreign_keys, index_name, order_key)
+        sql_string = self.__sql_strings.get(cache_key)
+
+        if sql_string is None:
+            sql_string = self.__compile_sql_string(*cache_key)
+            self.__sql_strings[cache_key] = sql_string
+
+        return sql_string
+
+    def __compile_sql_string(self, 
+                             command, table_name, 
+                             keys, unique_keys, 
+                             data_structure, foreign_keys, 
+                             index_name, order_key):
+        """
+        Creates and returns a parameterized SQL command string. See __create_sql_string for the arguments.
 
         Returns:
             str: The SQL command string.
@@ -214,9 +648,9 @@ class DatabaseManager:
             sql_string = f"""
                 CREATE TABLE IF NOT EXISTS {table_name} (
                 """
-            first_key = next(iter(data_structure))
+            first_key = data_structure[0][0]
 
-            for key, value in data_structure.items():
+            for key, value in data_structure:
                 if key == first_key:
                     comma = ""
                     extension = "PRIMARY KEY"
@@ -225,79 +659,222 @@ class DatabaseManager:
                     extension = "NOT NULL"
                 sql_string += f"{comma}{key} {value} {extension}"
 
-            for key, value in foreign_keys.items():
+            for key, value in foreign_keys:
                 sql_string += f",\nFOREIGN KEY({key}) REFERENCES {value}"
 
             sql_string += "\n)"
             return sql_string
-        
-        elif command == DatabaseCommand.INSERT_INTO:
-            keys_string, values_string = self.__get_dictionary_string(data_record)
+
+        elif command in [DatabaseCommand.CREATE_INDEX, DatabaseCommand.CREATE_UNIQUE_INDEX]:
+            unique_string = ("UNIQUE " 
+                             if command == DatabaseCommand.CREATE_UNIQUE_INDEX 
+                             else "")
             sql_string = f"""
-                INSERT INTO {table_name} ({keys_string}) 
-                VALUES ({values_string})
+                CREATE {unique_string}INDEX IF NOT EXISTS {index_name} 
+                ON {table_name} ({", ".join(keys)})
                 """
             return sql_string
-        
-        elif command == DatabaseCommand.UPDATE:
-            set_string = ", ".join(
-                [F"{key} = '{value}'" 
-                 for (key, value) in list(data_record.items())[1:]])
+
+        elif command == DatabaseCommand.INSERT_OR_IGNORE:
             sql_string = f"""
-                UPDATE {table_name} 
-                SET {set_string} 
-                WHERE {next(iter(data_record))} = '{next(iter(data_record.values()))}'
+                INSERT OR IGNORE INTO {table_name} ({", ".join(keys)}) 
+                VALUES ({", ".join(["?"] * len(keys))})
                 """
             return sql_string
         
+        elif command in [DatabaseCommand.INSERT_INTO, DatabaseCommand.UPDATE]:
+            keys_string = ", ".join(keys)
+            placeholders_string = ", ".join(["?"] * len(keys))
+
+            if unique_keys == ():
+                sql_string = f"""
+                    INSERT INTO {table_name} ({keys_string}) 
+                    VALUES ({placeholders_string})
+                    """
+            else:
+                sql_string = f"""
+                    INSERT INTO {table_name} ({keys_string}) 
+                    SELECT {placeholders_string} 
+                    WHERE NOT EXISTS (SELECT 1 FROM {table_name} {self.__create_where_string(unique_keys)})
+                    """
+
+            if command == DatabaseCommand.UPDATE and len(keys) > 1:
+                set_string = ", ".join(
+                    [f"{key} = excluded.{key}" for key in keys[1:]])
+                sql_string += f"ON CONFLICT({keys[0]}) DO UPDATE SET {set_string}"
+            elif command == DatabaseCommand.UPDATE:
+                sql_string += f"ON CONFLICT({keys[0]}) DO NOTHING"
+
+            return sql_string
+        
         elif command == DatabaseCommand.DELETE_FROM:
             sql_string = f"""
-                DELETE FROM {table_name}
+                DELETE FROM {table_name} 
+                {self.__create_where_string(keys)}
                 """
+            return sql_string
 
-            if where_expressions != {}:
-                first_key = next(iter(where_expressions))
-
-                for key, value in where_expressions.items():
-                    if key == first_key:
-                        sql_string += f"WHERE {key} = '{value}'"
-                    else:
-                        sql_string += f" AND {key} = '{value}'"
+        elif command == DatabaseCommand.SELECT:
+            order_string = (f"ORDER BY {order_key}" 
+                            if order_key != "" 
+                            else "")
+            sql_string = f"""
+                SELECT * FROM {table_name} 
+                {self.__create_where_string(keys)}
+                {order_string} 
+                LIMIT ?
+                """
+            return sql_string
 
+        elif command == DatabaseCommand.SELECT_PAGE:
+            where_string = self.__create_where_string(keys)
+            where_string += (" AND " if where_string != "" else "WHERE ") + f"{order_key} > ?"
+            sql_string = f"""
+                SELECT * FROM {table_name} 
+                {where_string}
+                ORDER BY {order_key} 
+                LIMIT ?
+                """
             return sql_string
 
-        elif command == DatabaseCommand.SELECT:
+        elif command == DatabaseCommand.SELECT_MAX:
             sql_string = f"""
-                SELECT * FROM {table_name}
+                SELECT MAX({order_key}) FROM {table_name} 
+                {self.__create_where_string(keys)}
                 """
+            return sql_string
 
-            if where_expressions != {}:
-                first_key = next(iter(where_expressions))
+        elif command == DatabaseCommand.SELECT_STREAKS:
+            group_key, period_reference = foreign_keys[0]
+            period_table_name, period_key = period_reference.rstrip(")").split("(")
 
-                for key, value in where_expressions.items():
-                    if key == first_key:
-                        sql_string += f"WHERE {key} = '{value}'"
-                    else:
-                        sql_string += f" AND {key} = '{value}'"
+            sql_string = f"""
+                WITH days AS (
+                    SELECT {table_name}.{group_key} AS group_key, 
+                           {table_name}.{order_key} AS timestamp, 
+                           {self.__create_day_string(table_name, order_key)} AS day, 
+                           {period_table_name}.{period_key} AS period 
+                    FROM {table_name} 
+                    JOIN {period_table_name} 
+                    ON {period_table_name}.{group_key} = {table_name}.{group_key} 
+                    {self.__create_where_string(keys, table_name)}
+                ), 
+                boundaries AS (
+                    SELECT group_key, day, period, 
+                           ROW_NUMBER() OVER row_window AS row_number, 
+                           day - LAG(day) OVER row_window IS NOT period AS is_run_start, 
+                           LEAD(day) OVER row_window IS NULL AS is_last_row 
+                    FROM days 
+                    WINDOW row_window AS (PARTITION BY group_key ORDER BY timestamp)
+                ), 
+                run_starts AS (
+                    SELECT group_key, period, row_number, is_run_start, 
+                           MAX(row_number) OVER (PARTITION BY group_key) AS last_row_number, 
+                           MAX(day) OVER (PARTITION BY group_key) AS last_day 
+                    FROM boundaries 
+                    WHERE is_run_start OR is_last_row
+                ), 
+                runs AS (
+                    SELECT group_key, period, last_day, last_row_number, 
+                           LEAD(row_number, 1, last_row_number + 1) OVER run_window - row_number AS run_length, 
+                           LEAD(row_number) OVER run_window IS NULL AS is_last_run 
+                    FROM run_starts 
+                    WHERE is_run_start 
+                    WINDOW run_window AS (PARTITION BY group_key ORDER BY row_number)
+                )
+                SELECT group_key, 
+                       MAX(CASE WHEN is_last_run AND last_day >= ? - period 
+                                THEN run_length ELSE 0 END), 
+                       MAX(run_length), 
+                       MAX(CASE WHEN is_last_run THEN run_length ELSE 0 END), 
+                       MAX(last_day), 
+                       MAX(last_row_number) 
+                FROM runs 
+                GROUP BY group_key 
+                ORDER BY group_key
+                """
+            return sql_string
 
+        elif command == DatabaseCommand.SELECT_PERIOD_COUNTS:
+            group_key, period_reference = foreign_keys[0]
+            period_table_name, period_key = period_reference.rstrip(")").split("(")
+            # CROSS JOIN keeps the period table as the outer loop, so each group reads one range of the index on the group key and the timestamp
+            sql_string = f"""
+                SELECT {period_table_name}.{group_key}, 
+                       COUNT(DISTINCT ({self.__create_day_string(table_name, order_key)} - ?) 
+                                      / {period_table_name}.{period_key}), 
+                       COUNT(*) 
+                FROM {period_table_name} 
+                CROSS JOIN {table_name} 
+                ON {table_name}.{group_key} = {period_table_name}.{group_key} 
+                {self.__create_where_string(keys, table_name)}
+                GROUP BY {period_table_name}.{group_key} 
+                ORDER BY {period_table_name}.{group_key}
+                """
             return sql_string
 
-    def __get_dictionary_string(self, dictionary):
+    def __create_day_string(self, table_name, key):
         """
-        Converts the dictionary keys and the dictionary values into comma seperated strings and returns both strings.
+        Creates and returns an SQL expression that converts a column of microseconds since 1970-01-01 to day ordinals.
 
         Args:
-            dictionary (dict): The dictionary to take the keys and values from.
+            table_name (str): The name of the database table of the column.
+            key (str): The column name.
 
         Returns:
-            str: The comma seperated string of the keys.
-            str: The comma seperated string of the values.
+            str: The SQL expression.
         """
 
-        keys = [key for key in dictionary.keys()]
-        values = [f'"{value}"' for value in dictionary.values()]
+        # Floor division, so timestamps before 1970 fall on the right day as well
+        return (f"({table_name}.{key} - (({table_name}.{key} % {MICROSECONDS_PER_DAY}) "
+                f"+ {MICROSECONDS_PER_DAY}) % {MICROSECONDS_PER_DAY}) "
+                f"/ {MICROSECONDS_PER_DAY} + {EPOCH_ORDINAL}")
+
+    def __create_where_string(self, keys, table_name=""):
+        """
+        Creates and returns a parameterized where clause that compares each column with a bound value.
 
-        keys_string = ", ".join(keys)
-        values_string = ", ".join(values)
+        Args:
+            keys (tuple): The column names of the where expressions, each optionally followed by an operator, see WHERE_OPERATORS. Without an operator the column gets compared for equality.
+            table_name (str): If not empty, the column names get qualified with this table name.
+
+        Returns:
+            str: The where clause. Empty if no keys are given.
+        """
+
+        if keys == ():
+            return ""
+
+        prefix = f"{table_name}." if table_name != "" else ""
+        expressions = []
+
+        for key in keys:
+            column_name, _, operator = key.partition(" ")
+            operator = operator.strip().upper() or "="
+
+            if operator not in self.WHERE_OPERATORS:
+                raise ValueError(f"The where expression '{key}' has an unknown operator.")
+
+            if operator == "IN":
+                expressions.append(f"{prefix}{column_name} IN (SELECT value FROM json_each(?))")
+            else:
+                expressions.append(f"{prefix}{column_name} {operator} ?")
+
+        return "WHERE " + " AND ".join(expressions)
+
+    def __get_where_values(self, where_expressions):
+        """
+        Returns the values to bind to the where clause of __create_where_string.
+
+        Args:
+            where_expressions (dict): The where expressions, see load.
+
+        Returns:
+            tuple: The values, where each list of an "IN" expression is encoded as a JSON array.
+        """
 
-        return keys_string, values_string
\ No newline at end of file
+        return tuple(
+            json.dumps(list(value)) 
+            if key.upper().endswith(" IN") 
+            else value 
+            for key, value in where_expressions.items())
@@ -0,0 +1,205 @@
+import threading
+import time
+import weakref
+
+
+class GroupCommitQueue:
+    """
+    Represents a queue of records that get saved in groups by a background thread.
+
+    The queue only counts the pending records, the records themselves are kept by the caller and saved by the flush function, which saves all pending records within one transaction. The background thread calls it once flush_interval seconds have passed since the last flush or max_batch_size records are pending, whichever comes first. Adding records blocks while max_pending records are pending, so producers slow down to the speed of the database instead of growing the queue.
+
+    A failed flush keeps its records pending, they get retried by the next flush after flush_interval seconds. If the last flush after closing fails, close raises its error and the records stay with the caller.
+
+    Records are acknowledged before they are saved. If the process crashes, the records added since the last flush are lost: at most the records of the last flush_interval seconds, and never more than max_pending records. Closing the queue, which also happens at interpreter exit, saves all pending records.
+
+    Neither the background thread nor the interpreter exit hook keep the queue alive, both only hold weak references. A queue that gets garbage collected without being closed stops its background thread without saving its pending records, the caller has to save them, as HabitManager does on teardown.
+
+    Attributes:
+        flush (function): Saves all pending records within one transaction.
+        flush_interval (float): The maximum number of seconds between two flushes.
+        max_batch_size (int): The number of pending records which triggers a flush before flush_interval has passed.
+        max_pending (int): The number of pending records at which adding records blocks until a flush completes.
+        __number_of_pending_records (int): The number of records added since the start of the last flush.
+        __is_closed (bool): True once close was called.
+        __condition (threading.Condition): Synchronizes producers and the background thread.
+        __thread (threading.Thread): The background thread calling flush.
+        __flush_error (Exception): The error of the last flush of the background thread if it failed, otherwise None.
+        __exit_finalizer (weakref.finalize): Closes the queue at interpreter exit if it is still alive.
+        __statistics (dict): The counters exposed by get_statistics.
+    """
+
+    def __init__(self, flush, flush_interval=0.05, max_batch_size=1000, max_pending=10_000):
+        """
+        Initializes a new instance of the GroupCommitQueue class and starts the background thread.
+
+        Args:
+            flush (function): Saves all pending records within one transaction. Called from the background thread.
+            flush_interval (float): The maximum number of seconds between two flushes.
+            max_batch_size (int): The number of pending records which triggers a flush before flush_interval has passed.
+            max_pending (int): The number of pending records at which adding records blocks until a flush completes. Must be at least max_batch_size.
+        """
+
+        self.flush = flush
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_pending = max(max_pending, max_batch_size)
+
+        self.__number_of_pending_records = 0
+        self.__is_closed = False
+        self.__flush_error = None
+        self.__condition = threading.Condition()
+        self.__statistics = {
+            "flushes": 0,
+            "flushed_records": 0,
+            "failed_flushes": 0,
+            "backpressure_waits": 0,
+            "backpressure_wait_time": 0.0}
+
+        self.__thread = threading.Thread(
+            target=GroupCommitQueue.__run, 
+            args=(weakref.ref(self), self.__condition), 
+            name="group_commit", 
+            daemon=True)
+        self.__thread.start()
+        self.__exit_finalizer = weakref.finalize(
+            self, GroupCommitQueue.__close_at_exit, weakref.ref(self))
+
+    def add(self, number_of_records=1):
+        """
+        Counts records the caller has added to its pending records. Blocks while max_pending records are pending.
+
+        Args:
+            number_of_records (int): The number of added records.
+        """
+
+        if number_of_records == 0:
+            return
+
+        with self.__condition:
+            if (self.__number_of_pending_records >= self.max_pending
+                and not self.__is_closed):
+                wait_start = time.perf_counter()
+                self.__statistics["backpressure_waits"] += 1
+                while (self.__number_of_pending_records >= self.max_pending
+                       and not self.__is_closed):
+                    self.__condition.wait()
+                self.__statistics["backpressure_wait_time"] += time.perf_counter() - wait_start
+
+            is_closed = self.__is_closed
+            if not is_closed:
+                self.__number_of_pending_records += number_of_records
+                if self.__number_of_pending_records >= self.max_batch_size:
+                    self.__condition.notify_all()
+
+        if is_closed:
+            self.flush()
+
+    def close(self):
+        """
+        Stops the background thread and saves all pending records. Records added afterwards get saved right away.
+
+        Raises:
+            Exception: The error of the last flush if it failed, the pending records were not saved then.
+        """
+
+        with self.__condition:
+            if self.__is_closed:
+                return
+            self.__is_closed = True
+            self.__condition.notify_all()
+
+        self.__thread.join()
+        self.__exit_finalizer.detach()
+
+        if self.__flush_error is not None:
+            raise self.__flush_error
+
+    def get_statistics(self):
+        """
+        Returns the queue statistics.
+
+        Returns:
+            dict: The number of flushes ("flushes") and of records counted by them ("flushed_records"), the number of failed flushes ("failed_flushes"), the number of currently pending records ("pending_records"), how often adding records blocked ("backpressure_waits") and for how many seconds in total ("backpressure_wait_time").
+        """
+
+        with self.__condition:
+            statistics = dict(self.__statistics)
+            statistics["pending_records"] = self.__number_of_pending_records
+
+        return statistics
+
+    @staticmethod
+    def __run(queue_reference, condition):
+        """
+        Calls flush whenever flush_interval has passed or max_batch_size records are pending, until the queue gets closed. Flushes a last time after closing. After a failed flush the records stay pending and the next flush waits for flush_interval, so a failing database is not retried in a busy loop. Runs on the background thread, which stops once the queue got garbage collected.
+
+        Args:
+            queue_reference (weakref.ref): The weak reference to the queue.
+            condition (threading.Condition): The condition of the queue.
+        """
+
+        is_closed = False
+        has_failed = False
+
+        while not is_closed:
+            queue = queue_reference()
+            if queue is None:
+                return
+            deadline = time.monotonic() + queue.flush_interval
+
+            with condition:
+                while ((queue.__number_of_pending_records < queue.max_batch_size or has_failed)
+                       and not queue.__is_closed):
+                    remaining_time = deadline - time.monotonic()
+                    if remaining_time <= 0:
+                        break
+
+                    # Wait with the weak reference only, so an unclosed queue can be garbage collected
+                    del queue
+                    condition.wait(remaining_time)
+                    queue = queue_reference()
+                    if queue is None:
+                        return
+
+                is_closed = queue.__is_closed
+                number_of_records = queue.__number_of_pending_records
+
+            if number_of_records == 0 and not is_closed:
+                continue
+
+            flush_error = None
+            try:
+                queue.flush()
+            except Exception as error:
+                print(f"During saving pending records an error occurred: {error}")
+                flush_error = error
+            has_failed = flush_error is not None
+
+            with condition:
+                if has_failed:
+                    # The records stay pending for the next flush
+                    queue.__flush_error = flush_error
+                    queue.__statistics["failed_flushes"] += 1
+                else:
+                    queue.__flush_error = None
+                    queue.__number_of_pending_records -= number_of_records
+                    queue.__statistics["flushes"] += 1
+                    queue.__statistics["flushed_records"] += number_of_records
+                    condition.notify_all()
+
+            # The traceback references the flushed objects, only the queue may keep it
+            del flush_error
+
+    @staticmethod
+    def __close_at_exit(queue_reference):
+        """
+        Closes the queue at interpreter exit if it is still alive.
+
+        Args:
+            queue_reference (weakref.ref): The weak reference to the queue.
+        """
+
+        queue = queue_reference()
+        if queue is not None:
+            queue.close()
@@ -1,12 +1,26 @@
-from datetime import datetime, date, timedelta
+import contextlib
+import threading
+import weakref
+from datetime import datetime, date
 from . import Periodicity, StreakType, DatabaseTable
 from src.database_manager import DatabaseManager
+from src.schema_migrator import SchemaMigrator
+from src.check_off_history import CheckOffHistory, to_microseconds
+from src.habit_view import HabitView
 
 
 class Habit:
     """
     Represents a habit.
 
+    The metadata of a habit is immutable and the instances use __slots__ instead of a per-instance __dict__. The database manager is injected, so all habits of a HabitManager share one connection pool.
+
+    If a history cache is injected, the habit does not keep its checked off datetimes itself. They get loaded from the database on first access and are kept in the cache, which may evict them again. Check offs that have not been saved yet are kept by the habit and added again after loading.
+
+    A thread-safe habit guards its check offs with its own lock, so threads checking off different habits do not wait for each other in memory.
+
+    The database gets initialized once per database manager, so habits created with the database manager of a HabitManager do not migrate the schema or create tables again.
+
     Attributes:
         habit_id (int): The identifier for this habit.
         name (str): The name of the habit.
@@ -14,13 +28,30 @@ class Habit:
         periodicity (Periodicity): The periodicity of the habit.
         creation_datetime (datetime.datetime): The creation datetime of the habit.
         database_name (str): The name of the database where the habit gets saved.
-        __checked_off_datetimes (list): The checked off datetimes for this habit.
+        __checked_off_datetimes (CheckOffHistory): The checked off datetimes for this habit. None if they are kept in self.__history_cache.
+        __history_cache (LRUCache): The cache of the checked off datetimes of lazily loaded habits, by habit_id. None if the habit keeps them itself.
+        __compact (bool): If True, the checked off datetimes are packed into arrays.
+        __unsaved_datetimes (list): The checked off datetimes that have not been saved in the database yet.
         __database_manager (DatabaseManager): An instance of the DatabaseManager class.
+        __view (HabitView): The read-only view of the metadata, created on first use.
+        __lock (threading.RLock): Guards the checked off datetimes if thread-safe, otherwise a context manager that does nothing.
+        __is_deleted (bool): True once the habit was deleted. Then check offs are ignored and nothing gets saved anymore.
+        __initialized_database_managers (weakref.WeakSet): The database managers whose database has been initialized by initialize_database.
     """
 
+    __slots__ = ("__habit_id", "__name", "__description", "__periodicity", 
+                 "__creation_datetime", "__checked_off_datetimes", 
+                 "__history_cache", "__compact", 
+                 "__unsaved_datetimes", "__database_manager", "__view", "__lock", 
+                 "__is_deleted")
+
+    __initialized_database_managers = weakref.WeakSet()
+
     def __init__(self, 
                  habit_id, name, description, periodicity, 
-                 creation_datetime=None, database_name="habit.db"):
+                 creation_datetime=None, database_name="habit.db", 
+                 is_saved=False, checked_off_datetimes=[], compact=False, 
+                 database_manager=None, history_cache=None, thread_safe=False):
 
         """
         Initializes a new instance of the Habit class, initializes the database and saves the habit in the database.
@@ -31,89 +62,283 @@ class Habit:
             description (str): The description of the habit.
             periodicity (Periodicity): The periodicity of the habit.
             creation_datetime (datetime.datetime): The creation datetime of the habit.
-            database_name (str): The name of the database where the habit gets saved.
+            database_name (str): The name of the database where the habit gets saved. Ignored if database_manager is given.
+            is_saved (bool): If True, the habit gets hydrated from data loaded from the database: the database is neither initialized nor written to. Otherwise the database gets initialized unless it already was for the database manager.
+            checked_off_datetimes (list): The datetimes that are already checked off and saved in the database, either as datetime.datetime, as microseconds since EPOCH or as ISO strings.
+            compact (bool): If True, the checked off datetimes are packed into arrays and get parsed on first use, see CheckOffHistory.
+            database_manager (DatabaseManager): The database manager used for saving the habit. If None, the habit creates its own for database_name.
+            history_cache (LRUCache): If given, the checked off datetimes get loaded from the database on first access and are kept in this cache instead of by the habit. Then checked_off_datetimes is ignored.
+            thread_safe (bool): If True, the check offs, streaks and unsaved data records of the habit can be used from multiple threads.
         """
         
-        self.habit_id = habit_id
-        self.name = name
-        self.description = description
-        self.periodicity = periodicity
-        self.creation_datetime = (datetime.now() 
-                                  if creation_datetime is None 
-                                  else creation_datetime)
-        self.database_name = database_name
+        self.__habit_id = habit_id
+        self.__name = name
+        self.__description = description
+        self.__periodicity = periodicity
+        self.__creation_datetime = (datetime.now() 
+                                    if creation_datetime is None 
+                                    else creation_datetime)
+
+        self.__compact = compact
+        self.__history_cache = history_cache
+        self.__checked_off_datetimes = (
+            CheckOffHistory(checked_off_datetimes, 
+                            period=self.__periodicity.value, 
+                            compact=self.__compact) 
+            if self.__history_cache is None 
+            else None)
+        self.__unsaved_datetimes = []
+        self.__database_manager = (DatabaseManager(database_name) 
+                                   if database_manager is None 
+                                   else database_manager)
+        self.__view = None
+        self.__lock = (threading.RLock() 
+                       if thread_safe 
+                       else contextlib.nullcontext())
+        self.__is_deleted = False
+
+        if not is_saved:
+            if self.__database_manager not in Habit.__initialized_database_managers:
+                Habit.initialize_database(self.__database_manager)
+            self.__save(DatabaseTable.HABIT)
+
+    @property
+    def habit_id(self):
+
+        return self.__habit_id
+
+    @property
+    def name(self):
+
+        return self.__name
+
+    @property
+    def description(self):
+
+        return self.__description
 
-        self.__checked_off_datetimes = []
-        self.__database_manager = DatabaseManager(self.database_name)
+    @property
+    def periodicity(self):
 
-        self.__initialize_database()
-        self.__save(DatabaseTable.HABIT)
+        return self.__periodicity
 
-    def check_off(self, datetimes=[datetime.now()]):
+    @property
+    def creation_datetime(self):
+
+        return self.__creation_datetime
+
+    @property
+    def database_name(self):
+
+        return self.__database_manager.database_name
+
+    def get_view(self):
+        """
+        Returns the read-only view of the metadata. The view is created once and reflects the habit without copying its metadata.
+
+        Returns:
+            HabitView: The view of the habit.
+        """
+
+        if self.__view is None:
+            self.__view = HabitView(self)
+
+        return self.__view
+
+    def check_off(self, datetimes=[datetime.now()], flush=True):
         """
         Checkes off datetimes and saves them in the database.
 
         Args:
             datetimes (list): The datetimes to check off.
+            flush (bool): If False, the new datetimes are only checked off in memory and get saved in the database by the next flush.
+
+        Returns:
+            list: The datetimes that had not been checked off before. Empty if the habit was deleted.
         """
         
-        for datetime in datetimes:
-            if datetime not in self.__checked_off_datetimes:
-                self.__checked_off_datetimes.append(datetime)
+        with self.__lock:
+            if self.__is_deleted:
+                return []
+
+            checked_off_datetimes = self.__get_checked_off_datetimes()
+            new_datetimes = checked_off_datetimes.add(datetimes)
+            self.__unsaved_datetimes.extend(new_datetimes)
+
+            # Measure the grown history again
+            if self.__history_cache is not None and new_datetimes != []:
+                self.__history_cache.put(self.habit_id, checked_off_datetimes)
+
+            if flush:
+                self.flush()
+
+        return new_datetimes
+
+    def flush(self):
+        """
+        Saves the checked off datetimes that have not been saved yet in the database within a single transaction.
+        """
+
+        with self.__lock:
+            self.__save(DatabaseTable.CHECK_OFF_DATETIME)
+
+    def get_unsaved_data_records(self):
+        """
+        Returns the data records of the checked off datetimes that have not been saved yet. Meant for saving the check offs of multiple habits within a single transaction, the caller is responsible for saving the returned data records in one transaction and for calling mark_data_records_saved once that transaction got committed. Until then the check offs stay unsaved, so a failed save gets retried by the next one.
+
+        Returns:
+            list: The data records of the check off table. Each data record includes "column name"-"value" pairs. Empty if the habit was deleted.
+        """
+
+        with self.__lock:
+            return [{"habit_id": str(self.habit_id),
+                     "check_off_datetime": to_microseconds(check_off_datetime)} 
+                    for check_off_datetime in self.__unsaved_datetimes]
+
+    def mark_data_records_saved(self, data_records):
+        """
+        Marks the checked off datetimes of data records returned by get_unsaved_data_records as saved. Datetimes checked off in the meantime stay unsaved.
+
+        Args:
+            data_records (list): The saved data records, see get_unsaved_data_records.
+        """
+
+        with self.__lock:
+            del self.__unsaved_datetimes[:len(data_records)]
 
-        self.__save(DatabaseTable.CHECK_OFF_DATETIME)
-    
     def delete(self):
         """
-        Deletes the habit instance and the according checked off dates from the database.
+        Deletes the habit instance, the according checked off dates and the streak summary from the database within a single transaction. Check offs that have not been saved yet get discarded, and later check offs are ignored.
         """
         
-        for database_table in DatabaseTable:
-            self.__database_manager.delete(
-                database_table.name.lower(), 
-                where_expressions={"habit_id": self.habit_id})
+        with self.__lock:
+            self.__is_deleted = True
+            self.__unsaved_datetimes = []
+
+            with self.__database_manager.transaction():
+                for database_table in DatabaseTable:
+                    self.__database_manager.delete(
+                        database_table.name.lower(), 
+                        where_expressions={"habit_id": self.habit_id})
+
+        if self.__history_cache is not None:
+            self.__history_cache.pop(self.habit_id)
 
-    def get_streak(self, streak_type):
+    def get_streak(self, streak_type, verify=False):
         """
-        Calculates and returns the streak.
+        Returns the streak. The streaks are maintained with every check off, so this takes constant time.
 
         Args:
-            streak_type (StreakType): The streak type to calculate.
+            streak_type (StreakType): The streak type to return.
+            verify (bool): If True, the streak also gets calculated from the full history and an error is raised if both differ.
 
         Returns:
             int: The streak of the habit.
         """
         
-        if streak_type == StreakType.CURRENT:
-            return self.__get_current_streak()
+        with self.__lock:
+            if streak_type == StreakType.CURRENT:
+                streak = self.__get_checked_off_datetimes().get_current_streak(
+                    date.today().toordinal())
+
+                if verify:
+                    self.__verify_streak(streak_type, streak, self.__get_current_streak())
         
-        elif streak_type == StreakType.LONGEST:
-            return self.__get_longest_streak()
+            elif streak_type == StreakType.LONGEST:
+                streak = self.__get_checked_off_datetimes().get_longest_streak()
+
+                if verify:
+                    self.__verify_streak(streak_type, streak, self.__get_longest_streak())
+
+        return streak
+
+    def get_check_off_ordinals(self):
+        """
+        Returns the sorted day ordinals of the checked off datetimes. The returned list must not be changed. A thread-safe habit returns a copy.
+
+        Returns:
+            list or array.array: The sorted day ordinals, once per checked off datetime.
+        """
+
+        with self.__lock:
+            ordinals = self.__get_checked_off_datetimes().get_ordinals()
+
+            if isinstance(self.__lock, contextlib.nullcontext):
+                return ordinals
+
+            return ordinals[:]
+
+    def get_memory_usage(self):
+        """
+        Returns the memory used by the checked off datetimes.
+
+        Returns:
+            dict: The total number of bytes ("total_bytes") and the number of bytes per check off ("bytes_per_check_off").
+        """
+
+        with self.__lock:
+            return self.__get_checked_off_datetimes().get_memory_usage()
+
+    def __get_checked_off_datetimes(self):
+        """
+        Returns the checked off datetimes. If they are kept in self.__history_cache but are not cached, they get loaded from the database and cached.
+
+        Returns:
+            CheckOffHistory: The checked off datetimes.
+        """
+
+        if self.__history_cache is None:
+            return self.__checked_off_datetimes
+
+        checked_off_datetimes = self.__history_cache.get(self.habit_id)
+
+        if checked_off_datetimes is None:
+            loaded_table = self.__database_manager.load(
+                DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                where_expressions={"habit_id": self.habit_id})
+            checked_off_datetimes = CheckOffHistory(
+                [row[2] for row in loaded_table or []], 
+                period=self.periodicity.value, 
+                compact=self.__compact)
+            checked_off_datetimes.add(self.__unsaved_datetimes)
+            self.__history_cache.put(self.habit_id, checked_off_datetimes)
+
+        return checked_off_datetimes
+
+    def __verify_streak(self, streak_type, streak, calculated_streak):
+        """
+        Raises an error if a maintained streak differs from the streak calculated from the full history.
+
+        Args:
+            streak_type (StreakType): The streak type.
+            streak (int): The maintained streak.
+            calculated_streak (int): The streak calculated from the full history.
+        """
+
+        if streak != calculated_streak:
+            raise RuntimeError(
+                f"The {streak_type.name.lower()} streak of habit {self.habit_id} is {streak}, "
+                f"but calculating it from the full history results in {calculated_streak}.")
 
     def __get_current_streak(self):
         """
-        Calculates and returns the current streak.
+        Calculates and returns the current streak from the full history.
 
         Returns:
             int: The current streak of the habit.
         """
         
-        checked_off_dates = [
-            checked_off_datetime.date() 
-            for checked_off_datetime in self.__checked_off_datetimes]
-        reverse_sorted_dates = sorted(checked_off_dates, reverse=True)
-        period_ago_day = date.today() - timedelta(days=self.periodicity.value)
+        sorted_ordinals = self.__get_checked_off_datetimes().get_ordinals()
+        period_ago_ordinal = date.today().toordinal() - self.periodicity.value
 
-        if reverse_sorted_dates == [] or reverse_sorted_dates[0] < period_ago_day:
+        if len(sorted_ordinals) == 0 or sorted_ordinals[-1] < period_ago_ordinal:
             return 0
         
         else:
             streak = 1
 
-            for i in range(1, len(reverse_sorted_dates)):
-                date_1 = reverse_sorted_dates[i-1]
-                date_2 = reverse_sorted_dates[i]
-                day_difference = (date_1 - date_2).days
+            for i in range(len(sorted_ordinals) - 1, 0, -1):
+                day_difference = sorted_ordinals[i] - sorted_ordinals[i-1]
 
                 if day_difference == self.periodicity.value:
                     streak += 1
@@ -124,28 +349,23 @@ class Habit:
 
     def __get_longest_streak(self):
         """
-        Calculates and returns the longest streak.
+        Calculates and returns the longest streak from the full history.
 
         Returns:
             int: The longest streak of the habit.
         """
         
-        checked_off_dates = [
-            checked_off_datetime.date() 
-            for checked_off_datetime in self.__checked_off_datetimes]
-        sorted_dates = sorted(checked_off_dates)
+        sorted_ordinals = self.__get_checked_off_datetimes().get_ordinals()
 
-        if sorted_dates == []:
+        if len(sorted_ordinals) == 0:
             return 0
         
         else:
             temp_streak = 1
             streak = temp_streak
 
-            for i in range(1, len(sorted_dates)):
-                date_1 = sorted_dates[i-1]
-                date_2 = sorted_dates[i]
-                day_difference = (date_2 - date_1).days
+            for i in range(1, len(sorted_ordinals)):
+                day_difference = sorted_ordinals[i] - sorted_ordinals[i-1]
 
                 if day_difference == self.periodicity.value:
                     temp_streak += 1
@@ -155,29 +375,107 @@ class Habit:
 
             return streak
 
-    def __initialize_database(self):
+    @staticmethod
+    def initialize_database(database_manager):
         """
-        Creates the tables in the database.
+        Upgrades the schema of existing tables and creates the missing tables and indexes in the database. Afterwards new habits with this database manager skip initializing the database.
+
+        Args:
+            database_manager (DatabaseManager): The database manager of the database to initialize.
         """
         
+        SchemaMigrator(database_manager).migrate()
+
         habit_data_structure = {
             "habit_id": "INTEGER",
             "name": "TEXT",
             "description": "TEXT",
             "periodicity": "INTEGER",
-            "creation_datetime": "TEXT"}
-        self.__database_manager.initialize_database(
+            "creation_datetime": "INTEGER"}
+        database_manager.initialize_database(
             DatabaseTable.HABIT.name.lower(), 
             habit_data_structure)
 
         check_off_data_structure = {
             "id": "INTEGER",
             "habit_id": "INTEGER",
-            "check_off_datetime": "TEXT"}
-        self.__database_manager.initialize_database(
+            "check_off_datetime": "INTEGER"}
+        database_manager.initialize_database(
             DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
             check_off_data_structure, 
-            foreign_keys={"habit_id": "habit(habit_id)"})
+            foreign_keys={"habit_id": "habit(habit_id)"}, 
+            unique_indexes={"check_off_datetime_habit_id_index": ["habit_id", "check_off_datetime"]})
+
+        habit_stats_data_structure = {
+            "habit_id": "INTEGER",
+            "last_check_off_ordinal": "INTEGER",
+            "last_streak": "INTEGER",
+            "longest_streak": "INTEGER",
+            "number_of_check_offs": "INTEGER"}
+        database_manager.initialize_database(
+            DatabaseTable.HABIT_STATS.name.lower(), 
+            habit_stats_data_structure, 
+            foreign_keys={"habit_id": "habit(habit_id)"}, 
+            indexes={"habit_stats_longest_streak_index": ["longest_streak"]})
+
+        Habit.__initialized_database_managers.add(database_manager)
+
+    @staticmethod
+    def rebuild_stats(database_manager, habit_ids=None):
+        """
+        Replaces the streak summaries in the habit_stats table by summaries calculated from the saved check offs within the database, see DatabaseManager.load_streaks.
+
+        Args:
+            database_manager (DatabaseManager): The database manager of the database.
+            habit_ids (list): The habit_ids of the habits whose streak summaries get replaced. If None, all streak summaries get replaced.
+        """
+
+        where_expressions = ({"habit_id IN": habit_ids} 
+                             if habit_ids is not None 
+                             else {})
+
+        with database_manager.transaction():
+            streaks = database_manager.load_streaks(
+                DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                "habit_id", 
+                "check_off_datetime", 
+                f"{DatabaseTable.HABIT.name.lower()}(periodicity)", 
+                date.today().toordinal(), 
+                where_expressions)
+
+            database_manager.delete(DatabaseTable.HABIT_STATS.name.lower(), where_expressions)
+            database_manager.save_many(
+                DatabaseTable.HABIT_STATS.name.lower(), 
+                [{"habit_id": row[0], 
+                  "last_check_off_ordinal": row[4], 
+                  "last_streak": row[3], 
+                  "longest_streak": row[2], 
+                  "number_of_check_offs": row[5]} 
+                 for row in streaks or []], 
+                primary_key_name="habit_id")
+
+    @staticmethod
+    def save_data_records(database_manager, data_records):
+        """
+        Saves the data records returned by get_unsaved_data_records of one or more habits and replaces the streak summaries of these habits within a single transaction. The streak summaries are calculated from all saved check offs, so check offs saved by other habit managers in the meantime are included.
+
+        Args:
+            database_manager (DatabaseManager): The database manager of the database.
+            data_records (list): The data records of the check off table, see get_unsaved_data_records.
+        """
+
+        if data_records == []:
+            return
+
+        with database_manager.transaction():
+            database_manager.save_many(
+                DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                data_records, 
+                primary_key_name="id", 
+                only_insert_if_unique=True)
+            Habit.rebuild_stats(
+                database_manager, 
+                sorted({int(data_record["habit_id"]) for data_record in data_records}))
 
     def __save(self, database_table):
         """
@@ -192,7 +490,7 @@ class Habit:
                            "name": self.name,
                            "description": self.description,
                            "periodicity": str(self.periodicity.value),
-                           "creation_datetime": self.creation_datetime.isoformat()}
+                           "creation_datetime": to_microseconds(self.creation_datetime)}
             
             self.__database_manager.save(
                 DatabaseTable.HABIT.name.lower(), 
@@ -200,12 +498,6 @@ class Habit:
                 primary_key_name="habit_id")
 
         elif database_table == DatabaseTable.CHECK_OFF_DATETIME:
-            for check_off_datetime in self.__checked_off_datetimes:
-                data_record = {"habit_id": str(self.habit_id),
-                               "check_off_datetime": check_off_datetime.isoformat()}
-                
-                self.__database_manager.save(
-                    DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
-                    data_record, 
-                    primary_key_name="id", 
-                    only_insert_if_unique=True)
\ No newline at end of file
+            data_records = self.get_unsaved_data_records()
+            Habit.save_data_records(self.__database_manager, data_records)
+            self.mark_data_records_saved(data_records)
\ No newline at end of file
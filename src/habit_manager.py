@@ -1,6 +1,18 @@
-from datetime import datetime
+import contextlib
+import heapq
+import os
+import threading
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date
+from . import StreakEngine, EPOCH_ORDINAL, MICROSECONDS_PER_DAY
 from src.habit import Habit, Periodicity, StreakType, DatabaseTable
+from src.check_off_history import from_microseconds, to_microseconds
 from src.database_manager import DatabaseManager
+from src.lru_cache import LRUCache
+from src.group_commit_queue import GroupCommitQueue
+from src import streak_engine
 
 
 class HabitManager:
@@ -9,50 +21,161 @@ class HabitManager:
 
     Attributes:
         database_name (str): The name of the database where the habit gets saved in and loaded from.
-        __habits (list): The existing habits.
+        write_behind (bool): If True, check offs are only kept in memory until flush gets called.
+        streak_engine (StreakEngine): The engine used for calculating the longest streak of all habits.
+        streak_workers (int): The number of worker processes of the parallel streak engine.
+        compact (bool): If True, the check offs of the habits are packed into arrays, see CheckOffHistory.
+        lazy (bool): If True, the check offs of a habit get loaded on first access and are kept in self.__history_cache.
+        thread_safe (bool): If True, the habit manager can be used from multiple threads.
+        durability_profile (DurabilityProfile): The durability profile of the database connections.
+        __history_cache (LRUCache): The check off histories of lazily loaded habits, by habit_id. None if not lazy.
+        __habits (dict): The existing habits. Includes "habit_id"-"habit" pairs in creation order.
+        __habits_by_periodicity (dict): The existing habits grouped by periodicity. Includes "periodicity"-"dict of habit_id-habit pairs" pairs.
+        __free_habit_ids (list): The unused habit_ids below self.__next_habit_id as a heap.
+        __next_habit_id (int): The lowest habit_id from which on all habit_ids are unused.
+        __unsaved_habits (set): The habits with check offs that have not been saved yet. Only modified in place, so the teardown finalizer sees the current habits.
         __database_manager (DatabaseManager): An instance of the DatabaseManager class.
+        __lock (threading.RLock): Guards the habit dicts, the habit_ids and self.__unsaved_habits if thread-safe, otherwise a context manager that does nothing.
+        __flush_lock (threading.RLock): Serializes flushes and deletes of habits if thread-safe, so a delete never gets overtaken by the save of check offs of the deleted habit. Otherwise a context manager that does nothing.
+        __group_commit_queue (GroupCommitQueue): Saves the write-behind check offs in the background. None if not group committing.
+        __teardown_finalizer (weakref.finalize): Saves the pending check offs if the habit manager gets garbage collected or the interpreter exits without close being called. Holds the database manager, self.__unsaved_habits and the locks, but not the habit manager.
+        __process_pool (ProcessPoolExecutor): The worker processes of the parallel streak engine. None until first used.
+        __streak_cache (LRUCache): The results of get_streak by "(habit_id, streak type, day ordinal)", where habit_id is None for the streak of all habits. None if not caching streaks.
+        __streak_cache_day (int): The day ordinal of the cached streaks. The cache gets cleared once the day rolls over.
+        __streak_cache_generation (int): Counts the invalidations, so a streak calculated before an invalidation does not get cached after it.
     """
 
-    def __init__(self, database_name="habit.db"):
+    def __init__(self, 
+                 database_name="habit.db", write_behind=False, 
+                 streak_engine=StreakEngine.INCREMENTAL, compact=False, 
+                 lazy=False, history_cache_bytes=64_000_000, thread_safe=False, 
+                 durability_profile=None, 
+                 group_commit_interval=None, group_commit_size=1000, 
+                 max_pending_check_offs=10_000, streak_workers=None, 
+                 streak_cache_size=None):
         """
         Initializes a new instance of the HabitManager class.
 
         Attributes:
             database_name (str): The name of the database where the habit gets saved in and loaded from.
+            write_behind (bool): If True, check offs are only kept in memory until flush gets called. Pending check offs also get saved if the habit manager gets garbage collected or the interpreter exits without close being called.
+            streak_engine (StreakEngine): The engine used for calculating the longest streak of all habits. "StreakEngine.INCREMENTAL" reads the streaks maintained by each habit, "StreakEngine.VECTORIZED" calculates all streaks at once with NumPy, which must be installed, "StreakEngine.PARALLEL" calculates the streaks from the day ordinals in worker processes, which scales with the number of cores and works best with compact, whose day ordinal arrays are shipped to the workers without conversion, "StreakEngine.SQL" calculates all streaks within the database without loading any check offs, which suits lazy, "StreakEngine.STATS" reads the streak summaries kept in the habit_stats table, which takes a single index lookup for the longest streak. With both, pending write-behind check offs get saved first.
+            compact (bool): If True, the check offs of the habits are packed into arrays and the loaded ISO strings get parsed on first use of a habit, see CheckOffHistory.
+            lazy (bool): If True, only the habits get loaded on initialization. The check offs of a habit get loaded on first access and are kept in a cache which evicts the least recently used histories, see get_cache_statistics.
+            history_cache_bytes (int): The memory budget of the cache of check off histories in bytes. Only used if lazy is True.
+            thread_safe (bool): If True, all methods can be called from multiple threads. The habit dicts are guarded by one lock which is only held while habits get added, removed or listed, the check offs of each habit by a lock of the habit, so check offs of different habits only contend for the database. Check offs of the same datetime are saved once, see DatabaseManager.save_many.
+            durability_profile (DurabilityProfile): The durability profile of the database connections, see DatabaseManager. If None, the SQLite defaults apply.
+            group_commit_interval (float): If not None, check offs are acknowledged in memory and a background thread saves them within one transaction every group_commit_interval seconds, see GroupCommitQueue. This implies write_behind and thread_safe. Check offs of the last group_commit_interval seconds, at most max_pending_check_offs, are lost if the process crashes. Call close to save the pending check offs, which also happens at interpreter exit and if the habit manager gets garbage collected.
+            group_commit_size (int): The number of pending check offs which get saved before group_commit_interval has passed.
+            max_pending_check_offs (int): The number of pending check offs at which check_off blocks until the pending check offs are saved.
+            streak_workers (int): The number of worker processes of the parallel streak engine. If None, the number of CPUs.
+            streak_cache_size (int): If not None, the results of get_streak are cached for the day they were calculated on, at most streak_cache_size of them, evicting the least recently used ones. Check offs and deletes invalidate the streaks of their habit and of all habits, see get_streak_cache_statistics.
         """
         
+        if group_commit_interval is not None:
+            write_behind = True
+            thread_safe = True
+
         self.database_name = database_name
+        self.write_behind = write_behind
+        self.streak_engine = streak_engine
+        self.streak_workers = (streak_workers 
+                               if streak_workers is not None 
+                               else os.cpu_count() or 1)
+        self.compact = compact
+        self.lazy = lazy
+        self.thread_safe = thread_safe
+        self.durability_profile = durability_profile
 
-        self.__habits = []
-        self.__database_manager = DatabaseManager(self.database_name)
+        self.__habits = {}
+        self.__habits_by_periodicity = {
+            periodicity: {} 
+            for periodicity in Periodicity}
+        self.__free_habit_ids = []
+        self.__next_habit_id = 0
+        self.__unsaved_habits = set()
+        self.__database_manager = DatabaseManager(
+            self.database_name, 
+            durability_profile=self.durability_profile)
+        self.__history_cache = (
+            LRUCache(max_bytes=history_cache_bytes, 
+                     size_of=lambda history: history.get_memory_usage()["total_bytes"]) 
+            if self.lazy 
+            else None)
+        self.__lock = (threading.RLock() 
+                       if self.thread_safe 
+                       else contextlib.nullcontext())
+        self.__flush_lock = (threading.RLock() 
+                             if self.thread_safe 
+                             else contextlib.nullcontext())
+        self.__group_commit_queue = None
+        self.__process_pool = None
+        self.__streak_cache = (LRUCache(max_size=streak_cache_size) 
+                               if streak_cache_size is not None 
+                               else None)
+        self.__streak_cache_day = date.today().toordinal()
+        self.__streak_cache_generation = 0
 
         self.__load_data()
 
+        if group_commit_interval is not None:
+            self.__group_commit_queue = GroupCommitQueue(
+                self.flush, 
+                flush_interval=group_commit_interval, 
+                max_batch_size=group_commit_size, 
+                max_pending=max_pending_check_offs)
+
+        self.__teardown_finalizer = weakref.finalize(
+            self, HabitManager.__flush_at_teardown, 
+            self.__database_manager, self.__unsaved_habits, self.__lock, self.__flush_lock)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
     def __load_data(self):
         """
-        Loads all data from the database. Loads the habit data and saves the Habit instances in self.__habits. Also loads the check off datetimes and checkes them off for the according habits in self.__habits.
+        Loads all data from the database without writing to it. Streams the habit table and the check off table with one query each instead of materializing them, groups the check off datetimes by habit_id and adds the hydrated Habit instances to self.__habits. The check off datetimes are passed on as microseconds since EPOCH, in compact mode they get packed by each habit on first use without creating datetime objects. In lazy mode the check off table is not loaded at all.
         """
         
-        loaded_table = self.__database_manager.load(DatabaseTable.HABIT.name.lower())
-        for row in loaded_table:
+        Habit.initialize_database(self.__database_manager)
+
+        checked_off_datetimes = {}
+        loaded_rows = (self.__database_manager.iter_load(
+                           DatabaseTable.CHECK_OFF_DATETIME.name.lower()) 
+                       if not self.lazy 
+                       else [])
+        for row in loaded_rows:
+            checked_off_datetimes.setdefault(row[1], []).append(row[2])
+
+        loaded_rows = self.__database_manager.iter_load(DatabaseTable.HABIT.name.lower())
+        for row in loaded_rows:
             habit = Habit(row[0], 
                           row[1], 
                           row[2], 
                           Periodicity(row[3]), 
-                          datetime.fromisoformat(row[4]), 
-                          database_name=self.database_name)
-            self.__habits.append(habit)
+                          from_microseconds(row[4]), 
+                          is_saved=True, 
+                          checked_off_datetimes=checked_off_datetimes.get(row[0], []), 
+                          compact=self.compact, 
+                          database_manager=self.__database_manager, 
+                          history_cache=self.__history_cache, 
+                          thread_safe=self.thread_safe)
+            self.__add_habit(habit)
 
-        loaded_table = self.__database_manager.load(
-            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
-        for row in loaded_table:
-            habit_id = row[1]
-            check_off_datetime = datetime.fromisoformat(row[2])
-            self.check_off(habit_id, [check_off_datetime])
+        self.__next_habit_id = max(self.__habits, default=-1) + 1
+        self.__free_habit_ids = [
+            habit_id 
+            for habit_id in range(self.__next_habit_id) 
+            if habit_id not in self.__habits]
 
     def create_habit(self, name, description, periodicity):
         """
-        Creates a habit and appends it to self.__habits.
+        Creates a habit and adds it to self.__habits.
 
         Args:
             name (str): The name of the habit.
@@ -60,27 +183,36 @@ class HabitManager:
             periodicity (Periodicity): The periodicity of the habit.
         """
         
-        habit_id = self.__create_habit_id()
-        habit = Habit(
-            habit_id, 
-            name, 
-            description, 
-            periodicity, 
-            database_name=self.database_name)
-        self.__habits.append(habit)
+        with self.__lock:
+            habit_id = self.__create_habit_id()
+            habit = Habit(
+                habit_id, 
+                name, 
+                description, 
+                periodicity, 
+                compact=self.compact, 
+                database_manager=self.__database_manager, 
+                history_cache=self.__history_cache, 
+                thread_safe=self.thread_safe)
+            self.__add_habit(habit)
 
     def delete_habit(self, habit_id):
         """
-        Deletes a habit and removes it from self.__habits.
+        Deletes a habit and removes it from self.__habits. Waits for a running flush, so the check offs it saves get deleted as well, and the habit_id only gets reused afterwards.
 
         Args:
             habit_id (int): The habit_id of the habit.
         """
         
-        for habit in self.__habits:
-            if habit_id == habit.habit_id:
+        with self.__flush_lock, self.__lock:
+            habit = self.__habits.pop(habit_id, None)
+
+            if habit is not None:
                 habit.delete()
-                self.__habits.remove(habit)
+                del self.__habits_by_periodicity[habit.periodicity][habit_id]
+                self.__unsaved_habits.discard(habit)
+                heapq.heappush(self.__free_habit_ids, habit_id)
+                self.__invalidate_streaks(habit_id)
 
     def check_off(self, habit_id, datetimes=[datetime.now()]):
         """
@@ -91,10 +223,142 @@ class HabitManager:
             datetimes (list): The datetimes to check off.
         """
         
-        for habit in self.__habits:
-            if habit_id == habit.habit_id:
-                habit.check_off(datetimes)
-                break
+        habit = self.__habits.get(habit_id)
+
+        if habit is None:
+            return
+
+        if self.write_behind:
+            new_datetimes = habit.check_off(datetimes, flush=False)
+            with self.__lock:
+                self.__unsaved_habits.add(habit)
+            self.__add_to_group_commit(len(new_datetimes))
+        else:
+            try:
+                new_datetimes = habit.check_off(datetimes)
+            except Exception:
+                # The check offs stay unsaved in memory, the next flush retries them
+                with self.__lock:
+                    self.__unsaved_habits.add(habit)
+                self.__invalidate_streaks(habit_id)
+                raise
+
+        if new_datetimes != []:
+            self.__invalidate_streaks(habit_id)
+
+    def check_off_many(self, datetimes_by_habit_id):
+        """
+        Checks off multiple habits for the given datetimes and saves all new check offs in the database within a single transaction.
+
+        Args:
+            datetimes_by_habit_id (dict): The datetimes to check off. Must include "habit_id"-"list of datetimes" pairs. Habit_ids without a habit are ignored.
+        """
+
+        number_of_new_datetimes = 0
+
+        for habit_id, datetimes in datetimes_by_habit_id.items():
+            habit = self.__habits.get(habit_id)
+            if habit is not None:
+                new_datetimes = habit.check_off(datetimes, flush=False)
+                number_of_new_datetimes += len(new_datetimes)
+                with self.__lock:
+                    self.__unsaved_habits.add(habit)
+                if new_datetimes != []:
+                    self.__invalidate_streaks(habit_id)
+
+        if not self.write_behind:
+            self.flush()
+        else:
+            self.__add_to_group_commit(number_of_new_datetimes)
+
+    def flush(self):
+        """
+        Saves the check offs of all habits that have not been saved yet and the streak summaries of these habits in the database within a single transaction. If the transaction fails, the check offs stay unsaved and get saved by the next flush.
+        """
+
+        HabitManager.__flush(self.__database_manager, self.__unsaved_habits, 
+                             self.__lock, self.__flush_lock)
+
+    @staticmethod
+    def __flush(database_manager, unsaved_habits, lock, flush_lock):
+        """
+        Saves the check offs of the unsaved habits and their streak summaries within a single transaction, see flush. Does not reference the habit manager, so it can be called by the teardown finalizer.
+
+        Args:
+            database_manager (DatabaseManager): The database manager of the habit manager.
+            unsaved_habits (set): The habits with check offs that have not been saved yet. Emptied if the transaction succeeds.
+            lock (threading.RLock): Guards unsaved_habits if thread-safe, otherwise a context manager that does nothing.
+            flush_lock (threading.RLock): Serializes flushes if thread-safe, otherwise a context manager that does nothing.
+        """
+
+        with flush_lock:
+            with lock:
+                flushed_habits = set(unsaved_habits)
+                unsaved_habits.clear()
+
+            data_records_by_habit = {habit: habit.get_unsaved_data_records() for habit in flushed_habits}
+            data_records = [data_record 
+                            for habit_data_records in data_records_by_habit.values() 
+                            for data_record in habit_data_records]
+
+            try:
+                Habit.save_data_records(database_manager, data_records)
+            except Exception:
+                with lock:
+                    unsaved_habits |= flushed_habits
+                raise
+
+            for habit, habit_data_records in data_records_by_habit.items():
+                habit.mark_data_records_saved(habit_data_records)
+
+    @staticmethod
+    def __flush_at_teardown(database_manager, unsaved_habits, lock, flush_lock):
+        """
+        Saves the pending check offs of a habit manager that got garbage collected or is alive at interpreter exit without close being called.
+
+        Args:
+            database_manager (DatabaseManager): The database manager of the habit manager.
+            unsaved_habits (set): The habits with check offs that have not been saved yet.
+            lock (threading.RLock): Guards unsaved_habits if thread-safe, otherwise a context manager that does nothing.
+            flush_lock (threading.RLock): Serializes flushes if thread-safe, otherwise a context manager that does nothing.
+        """
+
+        if not unsaved_habits:
+            return
+
+        try:
+            HabitManager.__flush(database_manager, unsaved_habits, lock, flush_lock)
+        except Exception as error:
+            print(f"During saving pending check offs an error occurred: {error}")
+
+    def close(self):
+        """
+        Saves all pending check offs, closes the database connections and stops the worker processes of the parallel streak engine. With group commit the background thread gets stopped and later check offs are saved right away. If saving fails, the error is raised and the check offs stay pending, so close can be called again.
+        """
+
+        if self.__group_commit_queue is not None:
+            self.__group_commit_queue.close()
+
+        self.flush()
+        self.__teardown_finalizer.detach()
+        self.__database_manager.close()
+
+        if self.__process_pool is not None:
+            self.__process_pool.shutdown()
+            self.__process_pool = None
+
+    def get_group_commit_statistics(self):
+        """
+        Returns the statistics of the group commit.
+
+        Returns:
+            dict: The group commit statistics, see GroupCommitQueue.get_statistics. Empty if not group committing.
+        """
+
+        if self.__group_commit_queue is None:
+            return {}
+
+        return self.__group_commit_queue.get_statistics()
 
     def get_all_habits(self, periodicity=None):
         """
@@ -104,82 +368,450 @@ class HabitManager:
             periodicity (Periodicity): Only the habits with this periodicity get returned. If None, all habits will be returned
 
         Returns:
-            list: The matching habits in self.__habits.
+            list: The read-only views of the matching habits in self.__habits, see HabitView. Each view can be used like a dict of "attribute name"-"value" pairs.
         """
         
-        if periodicity is None:
-            all_habits = [
-                {"habit_id": habit.habit_id, 
-                "name": habit.name, 
-                "description": habit.description, 
-                "periodicity": habit.periodicity.name.capitalize(), 
-                "creation_datetime": habit.creation_datetime.isoformat()} 
-                for habit in self.__habits]
-            
-        else:
-            all_habits = [
-                {"habit_id": habit.habit_id, 
-                "name": habit.name, 
-                "description": habit.description, 
-                "periodicity": habit.periodicity.name.capitalize(), 
-                "creation_datetime": habit.creation_datetime.isoformat()} 
-                for habit in self.__habits
-                if habit.periodicity == periodicity]
-        
-        return all_habits
+        habits = (self.__habits 
+                  if periodicity is None 
+                  else self.__habits_by_periodicity[periodicity])
+
+        with self.__lock:
+            return [habit.get_view() for habit in habits.values()]
+
+    def get_streak(self, streak_type, habit_id=None, verify=False):
+        """
+        Calculates and returns the habit streak. If streaks are cached, a streak already calculated today gets returned without calculating it again.
+
+        Args:
+            streak_type (StreakType): The streak type to calculate.
+            habit_id (int): The habit_id of the habit to calculate the streak for. If None, the longest streak of all habits will be returned.
+            verify (bool): If True, the streaks also get calculated from the full histories and an error is raised if they differ, see Habit.get_streak. Bypasses the streak cache.
+
+        Returns:
+            int: The habit streak.
+        """
+
+        if self.__streak_cache is None or verify:
+            return self.__calculate_streak(streak_type, habit_id, verify)
+
+        with self.__lock:
+            today_ordinal = date.today().toordinal()
+
+            # Current streaks depend on the day, so a new day invalidates all of them
+            if today_ordinal != self.__streak_cache_day:
+                self.__streak_cache.clear()
+                self.__streak_cache_day = today_ordinal
+                self.__streak_cache_generation += 1
+
+            generation = self.__streak_cache_generation
+
+        key = (habit_id, streak_type, today_ordinal)
+        streak = self.__streak_cache.get(key)
+
+        if streak is None:
+            streak = self.__calculate_streak(streak_type, habit_id, verify)
+
+            with self.__lock:
+                if generation == self.__streak_cache_generation:
+                    self.__streak_cache.put(key, streak)
+
+        return streak
+
+    def get_streak_cache_statistics(self):
+        """
+        Returns the statistics of the streak cache.
+
+        Returns:
+            dict: The cache statistics, see LRUCache.get_statistics. Empty if not caching streaks.
+        """
+
+        if self.__streak_cache is None:
+            return {}
 
-    def get_streak(self, streak_type, habit_id=None):
+        return self.__streak_cache.get_statistics()
+
+    def __calculate_streak(self, streak_type, habit_id, verify):
         """
-        Calculates and returns the habit streak.
+        Calculates and returns the habit streak with the streak engine.
 
         Args:
             streak_type (StreakType): The streak type to calculate.
             habit_id (int): The habit_id of the habit to calculate the streak for. If None, the longest streak of all habits will be returned.
+            verify (bool): If True, the streaks also get calculated from the full histories and an error is raised if they differ.
 
         Returns:
             int: The habit streak.
         """
         
-        if habit_id is None:
+        if habit_id is None and self.streak_engine == StreakEngine.VECTORIZED:
+            return self.__get_vectorized_streak(streak_type)
+
+        elif habit_id is None and self.streak_engine == StreakEngine.PARALLEL:
+            top_streaks = self.__get_parallel_top_streaks(streak_type, 1)
+            return top_streaks[0][1] if top_streaks != [] else 0
+
+        elif habit_id is None and self.streak_engine == StreakEngine.STATS and streak_type == StreakType.LONGEST:
+            if self.write_behind:
+                self.flush()
+            return self.__database_manager.load_max(
+                DatabaseTable.HABIT_STATS.name.lower(), "longest_streak") or 0
+
+        elif habit_id is None and self.streak_engine == StreakEngine.STATS:
+            return max((streak for _, streak in self.__get_stats_streaks(streak_type)), 
+                       default=0)
+
+        elif habit_id is None and self.streak_engine == StreakEngine.SQL:
+            return max((streak for _, streak in self.__get_sql_streaks(streak_type)), 
+                       default=0)
+
+        elif habit_id is None:
             longest_streak = 0
 
-            for habit in self.__habits:
-                this_streak = habit.get_streak(streak_type)
+            with self.__lock:
+                habits = list(self.__habits.values())
+
+            for habit in habits:
+                this_streak = habit.get_streak(streak_type, verify)
                 longest_streak = max(longest_streak, this_streak)
 
             return longest_streak
         
         else:
-            for habit in self.__habits:
-                if habit_id == habit.habit_id:
-                    return habit.get_streak(streak_type)
-            
-            return 0
+            habit = self.__habits.get(habit_id)
 
-    def __create_habit_id(self):
+            if habit is None:
+                return 0
+
+            return habit.get_streak(streak_type, verify)
+
+    def get_top_streaks(self, streak_type, number_of_habits=10):
         """
-        Creates and returns a unique habit_id.
+        Returns the habits with the largest streaks.
+
+        Args:
+            streak_type (StreakType): The streak type to calculate.
+            number_of_habits (int): The number of habits to return.
 
         Returns:
-            int: The habit_id.
+            list: "(habit_id, streak)" tuples in descending order of the streaks, ties in ascending order of the habit_ids.
         """
-        
-        existing_habit_ids = self.__get_habit_ids()
-        habit_id = 0
 
-        while habit_id in existing_habit_ids:
-            habit_id += 1
+        if self.streak_engine == StreakEngine.PARALLEL:
+            return self.__get_parallel_top_streaks(streak_type, number_of_habits)
 
-        return habit_id
+        if self.streak_engine in [StreakEngine.SQL, StreakEngine.STATS]:
+            # Habits without check offs have no row but a streak of 0
+            sql_streaks = dict(self.__get_sql_streaks(streak_type) 
+                               if self.streak_engine == StreakEngine.SQL 
+                               else self.__get_stats_streaks(streak_type))
+            with self.__lock:
+                habit_ids = list(self.__habits)
+            streaks = ((sql_streaks.get(habit_id, 0), habit_id) for habit_id in habit_ids)
+
+        else:
+            with self.__lock:
+                habits = list(self.__habits.values())
+            streaks = ((habit.get_streak(streak_type), habit.habit_id) for habit in habits)
+
+        top_streaks = streak_engine.get_top_streaks(streaks, number_of_habits)
 
-    def __get_habit_ids(self):
+        return [(habit_id, streak) for streak, habit_id in top_streaks]
+
+    def get_check_offs(self, habit_id, start=None, end=None, descending=False, limit=None):
         """
-        Returns all existing habit_ids.
+        Loads and returns the check offs of a habit within a range of datetimes from the database. The index on the habit_id and the check off datetime serves the range, so only the returned check offs get read. Pending write-behind check offs get saved first.
+
+        Args:
+            habit_id (int): The habit_id of the habit.
+            start (datetime.datetime): The earliest check off to return. If None, the range is open towards the past.
+            end (datetime.datetime): The check offs before this datetime get returned. If None, the range is open towards the future.
+            descending (bool): If True, the latest check offs come first.
+            limit (int): The maximum number of check offs. If None, all check offs within the range get returned.
 
         Returns:
-            list: The existing habit_ids.
+            list: The checked off datetimes, ordered by datetime.
+        """
+
+        if self.write_behind:
+            self.flush()
+
+        where_expressions = {"habit_id": habit_id}
+        if start is not None:
+            where_expressions["check_off_datetime >="] = to_microseconds(start)
+        if end is not None:
+            where_expressions["check_off_datetime <"] = to_microseconds(end)
+
+        rows = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            where_expressions, 
+            order_key_name="check_off_datetime", 
+            descending=descending, 
+            limit=limit)
+
+        return [from_microseconds(row[2]) for row in rows or []]
+
+    def get_completion_rates(self, days=30, habit_ids=None):
+        """
+        Calculates the completion rates of the habits over a rolling window, within the database without loading any check offs, see DatabaseManager.load_period_counts. Pending write-behind check offs get saved first.
+
+        The window covers the last days days including today. Its periods start with the first day of the window, so a weekly habit has days / 7 periods, rounded up, and the completion rate is the share of these periods with at least one check off.
+
+        Args:
+            days (int): The number of days of the window.
+            habit_ids (list): The habit_ids of the habits. If None, the completion rates of all habits get returned.
+
+        Returns:
+            dict: The completion rates between 0 and 1. Includes "habit_id"-"completion rate" pairs in the order of habit_ids, or in creation order of all habits.
+        """
+
+        if self.write_behind:
+            self.flush()
+
+        start_ordinal = date.today().toordinal() - days + 1
+        where_expressions = {
+            "check_off_datetime >=": (start_ordinal - EPOCH_ORDINAL) * MICROSECONDS_PER_DAY, 
+            "check_off_datetime <": (start_ordinal + days - EPOCH_ORDINAL) * MICROSECONDS_PER_DAY}
+
+        with self.__lock:
+            if habit_ids is None:
+                habits = list(self.__habits.values())
+            else:
+                habits = [self.__habits[habit_id] 
+                          for habit_id in habit_ids 
+                          if habit_id in self.__habits]
+                where_expressions["habit_id IN"] = [habit.habit_id for habit in habits]
+
+        rows = self.__database_manager.load_period_counts(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            "habit_id", 
+            "check_off_datetime", 
+            f"{DatabaseTable.HABIT.name.lower()}(periodicity)", 
+            start_ordinal, 
+            where_expressions)
+        completed_periods = {row[0]: row[1] for row in rows or []}
+
+        return {habit.habit_id: completed_periods.get(habit.habit_id, 0) 
+                                / -(-days // habit.periodicity.value) 
+                for habit in habits}
+
+    def rebuild_stats(self):
+        """
+        Recalculates the streak summaries in the habit_stats table from the saved check offs, see Habit.rebuild_stats. Pending write-behind check offs get saved first.
+        """
+
+        self.flush()
+        Habit.rebuild_stats(self.__database_manager)
+
+    def get_cache_statistics(self):
+        """
+        Returns the statistics of the cache of check off histories.
+
+        Returns:
+            dict: The cache statistics, see LRUCache.get_statistics. Empty if not lazy.
+        """
+
+        if self.__history_cache is None:
+            return {}
+
+        return self.__history_cache.get_statistics()
+
+    def __get_vectorized_streak(self, streak_type):
+        """
+        Calculates and returns the longest streak of all habits with the vectorized streak engine.
+
+        Args:
+            streak_type (StreakType): The streak type to calculate.
+
+        Returns:
+            int: The longest streak of all habits.
+        """
+
+        np = streak_engine.np
+        if np is None:
+            raise ImportError("NumPy is required for calculating streaks with the vectorized streak engine.")
+
+        with self.__lock:
+            habits = list(self.__habits.values())
+
+        ordinals = [habit.get_check_off_ordinals() for habit in habits]
+        lengths = [len(habit_ordinals) for habit_ordinals in ordinals]
+
+        habit_ids, current_streaks, longest_streaks = streak_engine.compute_all_streaks(
+            np.repeat([habit.habit_id for habit in habits], lengths), 
+            np.fromiter((ordinal 
+                         for habit_ordinals in ordinals 
+                         for ordinal in habit_ordinals), 
+                        dtype=np.int32, 
+                        count=sum(lengths)), 
+            np.repeat([habit.periodicity.value for habit in habits], lengths), 
+            date.today().toordinal())
+
+        streaks = (current_streaks 
+                   if streak_type == StreakType.CURRENT 
+                   else longest_streaks)
+
+        return int(streaks.max(initial=0))
+
+    def __get_sql_streaks(self, streak_type):
+        """
+        Calculates the streaks of all habits with check offs within the database, see DatabaseManager.load_streaks. Pending write-behind check offs get saved first.
+
+        Args:
+            streak_type (StreakType): The streak type to calculate.
+
+        Returns:
+            list: "(habit_id, streak)" tuples in ascending order of the habit_ids.
+        """
+
+        if self.write_behind:
+            self.flush()
+
+        rows = self.__database_manager.load_streaks(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            "habit_id", 
+            "check_off_datetime", 
+            f"{DatabaseTable.HABIT.name.lower()}(periodicity)", 
+            date.today().toordinal())
+        streak_index = 1 if streak_type == StreakType.CURRENT else 2
+
+        return [(row[0], row[streak_index]) for row in rows or []]
+
+    def __get_stats_streaks(self, streak_type):
+        """
+        Reads the streaks of all habits with check offs from the habit_stats table. The last streak of a habit is its current streak as long as its last check off is at most one period before today. Pending write-behind check offs get saved first.
+
+        Args:
+            streak_type (StreakType): The streak type to read.
+
+        Returns:
+            list: "(habit_id, streak)" tuples.
+        """
+
+        if self.write_behind:
+            self.flush()
+
+        rows = self.__database_manager.load(DatabaseTable.HABIT_STATS.name.lower())
+        today_ordinal = date.today().toordinal()
+        streaks = []
+
+        for habit_id, last_check_off_ordinal, last_streak, longest_streak, number_of_check_offs in rows or []:
+            habit = self.__habits.get(habit_id)
+            if habit is None:
+                continue
+
+            if streak_type == StreakType.LONGEST:
+                streaks.append((habit_id, longest_streak))
+            elif last_check_off_ordinal >= today_ordinal - habit.periodicity.value:
+                streaks.append((habit_id, last_streak))
+            else:
+                streaks.append((habit_id, 0))
+
+        return streaks
+
+    def __get_parallel_top_streaks(self, streak_type, number_of_habits):
+        """
+        Calculates the streaks of all habits with the parallel streak engine and returns the largest ones. The habits are split into shards of about the same number of check offs, a few per worker so unequal shards even out. Each worker returns the largest streaks of its shards, which get reduced to the largest streaks of all habits.
+
+        Args:
+            streak_type (StreakType): The streak type to calculate.
+            number_of_habits (int): The number of habits to return.
+
+        Returns:
+            list: "(habit_id, streak)" tuples in descending order of the streaks, ties in ascending order of the habit_ids.
+        """
+
+        with self.__lock:
+            habits = list(self.__habits.values())
+            if self.__process_pool is None:
+                self.__process_pool = ProcessPoolExecutor(max_workers=self.streak_workers)
+
+        number_of_shards = min(len(habits), 4 * self.streak_workers)
+        if number_of_shards == 0:
+            return []
+
+        # Assign the largest histories first, each to the shard with the fewest check offs
+        shards = [[] for _ in range(number_of_shards)]
+        shard_sizes = [(0, shard_index) for shard_index in range(number_of_shards)]
+        habit_ordinals = [(habit, habit.get_check_off_ordinals()) for habit in habits]
+        habit_ordinals.sort(key=lambda item: len(item[1]), reverse=True)
+
+        for habit, ordinals in habit_ordinals:
+            size, shard_index = heapq.heappop(shard_sizes)
+            shards[shard_index].append(
+                (habit.habit_id, 
+                 habit.periodicity.value, 
+                 ordinals if isinstance(ordinals, array) else array("i", ordinals)))
+            heapq.heappush(shard_sizes, (size + len(ordinals), shard_index))
+
+        today_ordinal = date.today().toordinal()
+        futures = [self.__process_pool.submit(streak_engine.compute_top_streaks, 
+                                              shard, 
+                                              today_ordinal, 
+                                              number_of_habits) 
+                   for shard in shards]
+
+        result_index = 0 if streak_type == StreakType.CURRENT else 1
+        top_streaks = streak_engine.get_top_streaks(
+            (streak 
+             for future in futures 
+             for streak in future.result()[result_index]), 
+            number_of_habits)
+
+        return [(habit_id, streak) for streak, habit_id in top_streaks]
+
+    def __invalidate_streaks(self, habit_id):
+        """
+        Removes the cached streaks of a habit and of all habits.
+
+        Args:
+            habit_id (int): The habit_id of the checked off or deleted habit.
+        """
+
+        if self.__streak_cache is None:
+            return
+
+        with self.__lock:
+            self.__streak_cache_generation += 1
+
+            for streak_type in StreakType:
+                for key_habit_id in [habit_id, None]:
+                    self.__streak_cache.pop(
+                        (key_habit_id, streak_type, self.__streak_cache_day))
+
+    def __add_to_group_commit(self, number_of_check_offs):
+        """
+        Counts write-behind check offs in the group commit queue, which blocks while too many check offs are pending.
+
+        Args:
+            number_of_check_offs (int): The number of new check offs.
+        """
+
+        if self.__group_commit_queue is not None:
+            self.__group_commit_queue.add(number_of_check_offs)
+
+    def __add_habit(self, habit):
+        """
+        Adds a habit to self.__habits and self.__habits_by_periodicity.
+
+        Args:
+            habit (Habit): The habit to add.
+        """
+
+        self.__habits[habit.habit_id] = habit
+        self.__habits_by_periodicity[habit.periodicity][habit.habit_id] = habit
+
+    def __create_habit_id(self):
+        """
+        Creates and returns a unique habit_id. The lowest unused habit_id gets taken from self.__free_habit_ids if possible, otherwise self.__next_habit_id gets used.
+
+        Returns:
+            int: The habit_id.
         """
         
-        habit_ids = [habit.habit_id for habit in self.__habits]
+        if self.__free_habit_ids != []:
+            return heapq.heappop(self.__free_habit_ids)
+
+        habit_id = self.__next_habit_id
+        self.__next_habit_id += 1
 
-        return habit_ids
\ No newline at end of file
+        return habit_id
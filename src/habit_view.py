@@ -0,0 +1,54 @@
+from collections.abc import Mapping
+
+
+class HabitView(Mapping):
+    """
+    Represents a read-only view of the metadata of a habit.
+
+    The view behaves like the dict HabitManager.get_all_habits returned before: it has the keys "habit_id", "name", "description", "periodicity" and "creation_datetime", the periodicity as capitalized name and the creation datetime as ISO string. The values are read from the habit on access instead of being copied, and the view compares equal to a dict with the same items.
+
+    Attributes:
+        KEYS (tuple): The keys of the view.
+        __habit (Habit): The habit the view reads from.
+    """
+
+    __slots__ = ("__habit",)
+
+    KEYS = ("habit_id", "name", "description", "periodicity", "creation_datetime")
+
+    def __init__(self, habit):
+        """
+        Initializes a new instance of the HabitView class.
+
+        Args:
+            habit (Habit): The habit the view reads from.
+        """
+
+        self.__habit = habit
+
+    def __getitem__(self, key):
+
+        if key == "habit_id":
+            return self.__habit.habit_id
+        elif key == "name":
+            return self.__habit.name
+        elif key == "description":
+            return self.__habit.description
+        elif key == "periodicity":
+            return self.__habit.periodicity.name.capitalize()
+        elif key == "creation_datetime":
+            return self.__habit.creation_datetime.isoformat()
+
+        raise KeyError(key)
+
+    def __iter__(self):
+
+        return iter(self.KEYS)
+
+    def __len__(self):
+
+        return len(self.KEYS)
+
+    def __repr__(self):
+
+        return f"HabitView({dict(self)!r})"
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Represents a cache which evicts the least recently used entries once it exceeds its bounds.
+
+    The cache can be bounded by the number of entries, by the number of bytes of its entries or both. The bytes of an entry are measured with size_of when it is put, so an entry whose value grows should be put again. The most recently put entry is never evicted, even if it alone exceeds max_bytes. All operations are thread-safe.
+
+    Attributes:
+        max_size (int): The maximum number of entries. If None, the number of entries is not bounded.
+        max_bytes (int): The maximum number of bytes of all entries. If None, the bytes are not bounded.
+        size_of (function): Returns the number of bytes of a value. If None, entries count as 0 bytes.
+        __entries (OrderedDict): The cached entries from least to most recently used. Includes "key"-"(value, number of bytes)" pairs.
+        __total_bytes (int): The number of bytes of all entries.
+        __statistics (dict): The counters exposed by get_statistics.
+        __lock (threading.Lock): Synchronizes the access to the entries.
+    """
+
+    def __init__(self, max_size=None, max_bytes=None, size_of=None):
+        """
+        Initializes a new instance of the LRUCache class.
+
+        Args:
+            max_size (int): The maximum number of entries. If None, the number of entries is not bounded.
+            max_bytes (int): The maximum number of bytes of all entries. If None, the bytes are not bounded.
+            size_of (function): Returns the number of bytes of a value. If None, entries count as 0 bytes.
+        """
+
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+
+        self.__entries = OrderedDict()
+        self.__total_bytes = 0
+        self.__statistics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0}
+        self.__lock = threading.Lock()
+
+    def __contains__(self, key):
+
+        return key in self.__entries
+
+    def __len__(self):
+
+        return len(self.__entries)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of an entry and marks it as most recently used.
+
+        Args:
+            key (hashable): The key of the entry.
+            default (object): The value returned if no entry with this key exists.
+
+        Returns:
+            object: The value of the entry, or default.
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                self.__statistics["misses"] += 1
+                return default
+
+            self.__statistics["hits"] += 1
+            self.__entries.move_to_end(key)
+
+        return entry[0]
+
+    def put(self, key, value):
+        """
+        Adds or replaces an entry, marks it as most recently used and evicts the least recently used entries while the cache exceeds its bounds.
+
+        Args:
+            key (hashable): The key of the entry.
+            value (object): The value of the entry.
+        """
+
+        number_of_bytes = self.size_of(value) if self.size_of is not None else 0
+
+        with self.__lock:
+            old_entry = self.__entries.pop(key, None)
+            if old_entry is not None:
+                self.__total_bytes -= old_entry[1]
+
+            self.__entries[key] = (value, number_of_bytes)
+            self.__total_bytes += number_of_bytes
+
+            while len(self.__entries) > 1 and self.__is_full():
+                evicted_key, evicted_entry = self.__entries.popitem(last=False)
+                self.__total_bytes -= evicted_entry[1]
+                self.__statistics["evictions"] += 1
+
+    def pop(self, key, default=None):
+        """
+        Removes an entry and returns its value.
+
+        Args:
+            key (hashable): The key of the entry.
+            default (object): The value returned if no entry with this key exists.
+
+        Returns:
+            object: The value of the removed entry, or default.
+        """
+
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+
+            if entry is None:
+                return default
+
+            self.__total_bytes -= entry[1]
+
+        return entry[0]
+
+    def clear(self):
+        """
+        Removes all entries. The statistics are kept.
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__total_bytes = 0
+
+    def get_statistics(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: The number of hits ("hits"), misses ("misses") and evicted entries ("evictions"), the number of entries ("entries"), their number of bytes ("total_bytes") and the share of lookups that were hits ("hit_rate").
+        """
+
+        with self.__lock:
+            statistics = dict(self.__statistics)
+            statistics["entries"] = len(self.__entries)
+            statistics["total_bytes"] = self.__total_bytes
+
+        lookups = statistics["hits"] + statistics["misses"]
+        statistics["hit_rate"] = (statistics["hits"] / lookups
+                                  if lookups > 0
+                                  else 0.0)
+
+        return statistics
+
+    def __is_full(self):
+        """
+        Checks whether the cache exceeds its bounds.
+
+        Returns:
+            bool: True if there are more entries than max_size or more bytes than max_bytes.
+        """
+
+        return ((self.max_size is not None and len(self.__entries) > self.max_size)
+                or (self.max_bytes is not None and self.__total_bytes > self.max_bytes))
@@ -0,0 +1,302 @@
+from datetime import date
+from . import DatabaseTable
+from src.check_off_history import to_microseconds, parse_datetime
+
+
+class SchemaMigrator:
+    """
+    Represents a schema migrator which upgrades existing databases to the schema the application expects.
+
+    The schema version of a database is stored in its user_version pragma. Migrations run before missing tables and indexes get created. Every migration step checks the actual schema before changing it, so new databases get stamped with the latest version without any changes.
+
+    Migration steps that rewrite large tables copy the rows in batches first, each batch within its own transaction. An interrupted migration resumes after the last copied batch, and the final transaction only copies the rows added since.
+
+    Attributes:
+        LATEST_VERSION (int): The schema version the application expects.
+        TIMESTAMP_COLUMNS (dict): The columns stored as microseconds since EPOCH from version 3 on. Includes "table name"-"(primary key name, column name)" pairs.
+        batch_size (int): The number of rows copied per transaction.
+        __database_manager (DatabaseManager): An instance of the DatabaseManager class.
+    """
+
+    LATEST_VERSION = 4
+
+    TIMESTAMP_COLUMNS = {
+        DatabaseTable.HABIT.name.lower(): ("habit_id", "creation_datetime"), 
+        DatabaseTable.CHECK_OFF_DATETIME.name.lower(): ("id", "check_off_datetime")}
+
+    def __init__(self, database_manager, batch_size=10_000):
+        """
+        Initializes a new instance of the SchemaMigrator class.
+
+        Args:
+            database_manager (DatabaseManager): The database manager of the database to migrate.
+            batch_size (int): The number of rows copied per transaction.
+        """
+
+        self.batch_size = batch_size
+        self.__database_manager = database_manager
+
+    def migrate(self):
+        """
+        Upgrades the database to the latest schema version. Each migration step runs within its own transaction, after the batches it copies beforehand. The schema version gets read without a transaction first, so the write lock is only taken if a migration step is pending.
+
+        Returns:
+            int: The schema version of the database after the migration.
+        """
+
+        migration_steps = {
+            1: self.__migrate_to_version_1, 
+            2: self.__migrate_to_version_2, 
+            3: self.__migrate_to_version_3, 
+            4: self.__migrate_to_version_4}
+        batch_steps = {
+            3: self.__copy_timestamps_in_batches}
+
+        # Reading the version takes no write lock, so an up-to-date database never waits for a writer
+        version = self.__database_manager.load_pragma("user_version")
+
+        if version is None:
+            return 0
+
+        try:
+            for target_version in range(version + 1, self.LATEST_VERSION + 1):
+                if target_version in batch_steps:
+                    batch_steps[target_version]()
+
+                with self.__database_manager.transaction() as cursor:
+                    # Another connection may have migrated the database in the meantime
+                    if cursor.execute("PRAGMA user_version").fetchone()[0] < target_version:
+                        migration_steps[target_version](cursor)
+                        cursor.execute(f"PRAGMA user_version = {target_version}")
+                version = target_version
+
+        except Exception as error:
+            print(f"During migrating the database an error occurred: {error}")
+
+        return version
+
+    def __migrate_to_version_1(self, cursor):
+        """
+        Rebuilds tables whose primary key is not declared as "INTEGER". Only such a primary key is an alias for the rowid, which lets the database allocate new keys in constant time.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor used for executing SQL commands within the migration transaction.
+        """
+
+        for database_table in DatabaseTable:
+            table_name = database_table.name.lower()
+            columns = cursor.execute(f"PRAGMA table_info({table_name})").fetchall()
+            primary_key_columns = [column for column in columns if column[5] > 0]
+
+            if (len(primary_key_columns) != 1
+                or primary_key_columns[0][2].upper() == "INTEGER"):
+                continue
+
+            definitions_string = self.__get_column_definitions(
+                cursor, table_name, columns, {primary_key_columns[0][1]: "INTEGER"})
+            column_names = ", ".join([column[1] for column in columns])
+            cursor.execute(f"""
+                CREATE TABLE {table_name}_migration (
+                {definitions_string}
+                )
+                """)
+            cursor.execute(f"""
+                INSERT INTO {table_name}_migration ({column_names})
+                SELECT {column_names} FROM {table_name}
+                """)
+            cursor.execute(f"DROP TABLE {table_name}")
+            cursor.execute(f"ALTER TABLE {table_name}_migration RENAME TO {table_name}")
+
+    def __migrate_to_version_2(self, cursor):
+        """
+        Deletes duplicate check offs of a habit, keeping the first one. Afterwards the unique index on habit_id and check_off_datetime can get created.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor used for executing SQL commands within the migration transaction.
+        """
+
+        table_name = DatabaseTable.CHECK_OFF_DATETIME.name.lower()
+        columns = cursor.execute(f"PRAGMA table_info({table_name})").fetchall()
+
+        if columns == []:
+            return
+
+        cursor.execute(f"""
+            DELETE FROM {table_name}
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM {table_name}
+                GROUP BY habit_id, check_off_datetime)
+            """)
+
+    def __migrate_to_version_3(self, cursor):
+        """
+        Replaces the tables of TIMESTAMP_COLUMNS by their copies with INTEGER timestamp columns, see __copy_timestamps_in_batches. Rows added since the last batch get copied first.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor used for executing SQL commands within the migration transaction.
+        """
+
+        for table_name, (primary_key_name, column_name) in self.TIMESTAMP_COLUMNS.items():
+            is_copied = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", 
+                (f"{table_name}_migration",)).fetchone() is not None
+
+            if not is_copied:
+                continue
+
+            while self.__copy_timestamp_batch(
+                    cursor, table_name, primary_key_name, column_name) == self.batch_size:
+                pass
+
+            cursor.execute(f"DROP TABLE {table_name}")
+            cursor.execute(f"ALTER TABLE {table_name}_migration RENAME TO {table_name}")
+
+    def __migrate_to_version_4(self, cursor):
+        """
+        Creates the habit_stats table and fills it with the streak summaries calculated from the saved check offs within the database, see DatabaseManager.load_streaks. The summaries are calculated within the migration transaction, so they include every check off saved before version 4.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor used for executing SQL commands within the migration transaction.
+        """
+
+        table_name = DatabaseTable.CHECK_OFF_DATETIME.name.lower()
+        stats_table_name = DatabaseTable.HABIT_STATS.name.lower()
+        columns = cursor.execute(f"PRAGMA table_info({table_name})").fetchall()
+
+        if columns == []:
+            return
+
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {stats_table_name} (
+            habit_id INTEGER PRIMARY KEY,
+            last_check_off_ordinal INTEGER NOT NULL,
+            last_streak INTEGER NOT NULL,
+            longest_streak INTEGER NOT NULL,
+            number_of_check_offs INTEGER NOT NULL,
+            FOREIGN KEY(habit_id) REFERENCES {DatabaseTable.HABIT.name.lower()}(habit_id)
+            )
+            """)
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS habit_stats_longest_streak_index
+            ON {stats_table_name} (longest_streak)
+            """)
+
+        # Joins the migration transaction, which runs on the same connection
+        streaks = self.__database_manager.load_streaks(
+            table_name, 
+            "habit_id", 
+            "check_off_datetime", 
+            f"{DatabaseTable.HABIT.name.lower()}(periodicity)", 
+            date.today().toordinal())
+
+        if streaks is None:
+            raise RuntimeError("The streak summaries could not be calculated.")
+
+        cursor.execute(f"DELETE FROM {stats_table_name}")
+        cursor.executemany(f"""
+            INSERT INTO {stats_table_name} (habit_id, last_check_off_ordinal, last_streak, longest_streak, number_of_check_offs)
+            VALUES (?, ?, ?, ?, ?)
+            """, 
+            [(row[0], row[4], row[3], row[2], row[5]) for row in streaks])
+
+    def __copy_timestamps_in_batches(self):
+        """
+        Copies the tables of TIMESTAMP_COLUMNS whose timestamp column is not declared as "INTEGER" into new tables which store the timestamps as microseconds since EPOCH instead of ISO strings. Integers are smaller, cheaper to compare and need no parsing on load. Each batch gets copied within its own transaction.
+        """
+
+        for table_name, (primary_key_name, column_name) in self.TIMESTAMP_COLUMNS.items():
+            with self.__database_manager.transaction() as cursor:
+                columns = cursor.execute(f"PRAGMA table_info({table_name})").fetchall()
+                column_types = {column[1]: column[2].upper() for column in columns}
+
+                if column_types.get(column_name, "INTEGER") == "INTEGER":
+                    continue
+
+                definitions_string = self.__get_column_definitions(
+                    cursor, table_name, columns, {column_name: "INTEGER"})
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table_name}_migration (
+                    {definitions_string}
+                    )
+                    """)
+
+            number_of_rows = self.batch_size
+            while number_of_rows == self.batch_size:
+                with self.__database_manager.transaction() as cursor:
+                    number_of_rows = self.__copy_timestamp_batch(
+                        cursor, table_name, primary_key_name, column_name)
+
+    def __copy_timestamp_batch(self, cursor, table_name, primary_key_name, column_name):
+        """
+        Copies the next batch of rows into the copy of a table and converts their timestamps to microseconds since EPOCH. The batch starts after the largest primary key copied so far.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor used for executing SQL commands.
+            table_name (str): The name of the table.
+            primary_key_name (str): The name of the primary key.
+            column_name (str): The name of the timestamp column.
+
+        Returns:
+            int: The number of copied rows.
+        """
+
+        last_key = cursor.execute(
+            f"SELECT MAX({primary_key_name}) FROM {table_name}_migration").fetchone()[0]
+        rows = cursor.execute(f"""
+            SELECT * FROM {table_name}
+            WHERE {primary_key_name} > ?
+            ORDER BY {primary_key_name}
+            LIMIT ?
+            """, 
+            (last_key if last_key is not None else float("-inf"), self.batch_size)).fetchall()
+
+        if rows == []:
+            return 0
+
+        column_names = [description[0] for description in cursor.description]
+        column_index = column_names.index(column_name)
+        converted_rows = [
+            row[:column_index] 
+            + (to_microseconds(parse_datetime(row[column_index])),) 
+            + row[column_index+1:] 
+            for row in rows]
+
+        placeholders = ", ".join(["?"] * len(column_names))
+        cursor.executemany(f"""
+            INSERT INTO {table_name}_migration ({", ".join(column_names)})
+            VALUES ({placeholders})
+            """, 
+            converted_rows)
+
+        return len(rows)
+
+    def __get_column_definitions(self, cursor, table_name, columns, column_types={}):
+        """
+        Returns the column definitions and foreign keys of a table for creating a copy of it.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor used for executing SQL commands.
+            table_name (str): The name of the table.
+            columns (list): The columns of the table, as returned by "PRAGMA table_info".
+            column_types (dict): The data types of the copy that differ from the table. Includes "column name"-"data type" pairs.
+
+        Returns:
+            str: The definitions for a "CREATE TABLE" command.
+        """
+
+        column_definitions = []
+        for column in columns:
+            column_type = column_types.get(column[1], column[2])
+            if column[5] > 0:
+                column_definitions.append(f"{column[1]} {column_type} PRIMARY KEY")
+            else:
+                not_null_string = " NOT NULL" if column[3] else ""
+                column_definitions.append(f"{column[1]} {column_type}{not_null_string}")
+
+        foreign_keys = cursor.execute(
+            f"PRAGMA foreign_key_list({table_name})").fetchall()
+        for foreign_key in foreign_keys:
+            column_definitions.append(
+                f"FOREIGN KEY({foreign_key[3]}) REFERENCES {foreign_key[2]}({foreign_key[4]})")
+
+        return ",\n".join(column_definitions)
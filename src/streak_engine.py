@@ -0,0 +1,144 @@
+import heapq
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src import EPOCH_ORDINAL
+
+
+def compute_all_streaks(habit_ids, dates, periods, today_ordinal):
+    """
+    Calculates the current and the longest streak of many habits at once with NumPy. The check offs of all habits are sorted once, then runs are found by comparing neighbouring dates and measured by the distance between run starts.
+
+    Args:
+        habit_ids (numpy.ndarray): The habit_id of each check off.
+        dates (numpy.ndarray): The date of each check off, either as datetime64[D] or as integer day ordinals. Need not be sorted.
+        periods (numpy.ndarray): The number of days between two check offs of a streak, per check off.
+        today_ordinal (int): The day ordinal of today.
+
+    Returns:
+        numpy.ndarray: The sorted habit_ids that have check offs.
+        numpy.ndarray: The current streak per habit_id.
+        numpy.ndarray: The longest streak per habit_id.
+    """
+
+    if np is None:
+        raise ImportError("NumPy is required for calculating streaks with the vectorized streak engine.")
+
+    habit_ids = np.asarray(habit_ids, dtype=np.int64)
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        ordinals = dates.astype("datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+    else:
+        ordinals = dates.astype(np.int64)
+    periods = np.asarray(periods, dtype=np.int64)
+
+    if len(ordinals) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    order = np.lexsort((ordinals, habit_ids))
+    habit_ids = habit_ids[order]
+    ordinals = ordinals[order]
+    periods = periods[order]
+
+    # A check off starts a new run if it belongs to another habit than its predecessor or is not exactly one period after it
+    is_new_habit = np.empty(len(ordinals), dtype=bool)
+    is_new_habit[0] = True
+    is_new_habit[1:] = habit_ids[1:] != habit_ids[:-1]
+
+    is_run_start = is_new_habit.copy()
+    is_run_start[1:] |= (ordinals[1:] - ordinals[:-1]) != periods[1:]
+
+    run_starts = np.flatnonzero(is_run_start)
+    run_lengths = np.diff(np.append(run_starts, len(ordinals)))
+    run_indices = np.cumsum(is_run_start) - 1
+
+    habit_starts = np.flatnonzero(is_new_habit)
+    habit_ends = np.append(habit_starts[1:], len(ordinals)) - 1
+    habit_indices = np.cumsum(is_new_habit) - 1
+
+    longest_streaks = np.zeros(len(habit_starts), dtype=np.int64)
+    np.maximum.at(longest_streaks, habit_indices[run_starts], run_lengths)
+
+    last_run_lengths = run_lengths[run_indices[habit_ends]]
+    is_current = ordinals[habit_ends] >= today_ordinal - periods[habit_ends]
+    current_streaks = np.where(is_current, last_run_lengths, 0)
+
+    return habit_ids[habit_starts], current_streaks, longest_streaks
+
+
+def compute_streaks(ordinals, period, today_ordinal):
+    """
+    Calculates the current and the longest streak of one habit from its day ordinals in pure Python.
+
+    Args:
+        ordinals (list or array.array): The sorted day ordinals of the check offs, once per check off.
+        period (int): The number of days between two check offs of a streak.
+        today_ordinal (int): The day ordinal of today.
+
+    Returns:
+        int: The current streak.
+        int: The longest streak.
+    """
+
+    longest_streak = 0
+    run_length = 0
+    previous_ordinal = None
+
+    for ordinal in ordinals:
+        if previous_ordinal is not None and ordinal - previous_ordinal == period:
+            run_length += 1
+        else:
+            run_length = 1
+        longest_streak = max(longest_streak, run_length)
+        previous_ordinal = ordinal
+
+    if previous_ordinal is None or previous_ordinal < today_ordinal - period:
+        return 0, longest_streak
+
+    return run_length, longest_streak
+
+
+def compute_top_streaks(shard, today_ordinal, number_of_streaks=1):
+    """
+    Calculates the streaks of a shard of habits and returns the largest ones. Meant to run in a worker process, so the shard only holds picklable day ordinal arrays instead of Habit instances.
+
+    Args:
+        shard (list): The habits of the shard. Includes "(habit_id, period, ordinals)" tuples, see compute_streaks.
+        today_ordinal (int): The day ordinal of today.
+        number_of_streaks (int): The number of largest streaks to return per streak type.
+
+    Returns:
+        list: The largest current streaks as "(streak, habit_id)" tuples in descending order of the streaks, ties in ascending order of the habit_ids.
+        list: The largest longest streaks in the same form.
+    """
+
+    current_streaks = []
+    longest_streaks = []
+
+    for habit_id, period, ordinals in shard:
+        current_streak, longest_streak = compute_streaks(ordinals, period, today_ordinal)
+        current_streaks.append((current_streak, habit_id))
+        longest_streaks.append((longest_streak, habit_id))
+
+    return (get_top_streaks(current_streaks, number_of_streaks), 
+            get_top_streaks(longest_streaks, number_of_streaks))
+
+
+def get_top_streaks(streaks, number_of_streaks):
+    """
+    Returns the largest streaks. Also reduces the results of several shards.
+
+    Args:
+        streaks (iterable): The streaks as "(streak, habit_id)" tuples.
+        number_of_streaks (int): The number of streaks to return.
+
+    Returns:
+        list: The largest streaks in descending order of the streaks, ties in ascending order of the habit_ids.
+    """
+
+    return heapq.nlargest(number_of_streaks, streaks, 
+                          key=lambda streak: (streak[0], -streak[1]))
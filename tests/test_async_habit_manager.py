@@ -0,0 +1,100 @@
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+import shutil
+from context import src
+from src.async_habit_manager import AsyncHabitManager
+from src.habit_manager import HabitManager, DatabaseManager, Periodicity, StreakType, DatabaseTable
+
+
+class TestAsyncHabitManager:
+
+    __EXAMPLE_DATABASE_NAME = "example_habit.db"
+    __TEST_DATABASE_NAME = "test_habit.db"
+
+    def setup_method(self):
+
+        # Copy example data to test database
+        shutil.copy(self.__EXAMPLE_DATABASE_NAME, self.__TEST_DATABASE_NAME)
+
+        self.__database_manager = DatabaseManager(self.__TEST_DATABASE_NAME)
+
+    def test_operations(self):
+
+        async def run():
+            async with AsyncHabitManager(self.__TEST_DATABASE_NAME) as habit_manager:
+                assert await habit_manager.get_all_habits() == HabitManager(
+                    self.__TEST_DATABASE_NAME).get_all_habits()
+
+                await habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+                assert len(await habit_manager.get_all_habits(Periodicity.DAILY)) == 3
+
+                await habit_manager.check_off(5)
+                assert await habit_manager.get_streak(StreakType.CURRENT, 5) == 1
+                assert await habit_manager.get_streak(StreakType.LONGEST) == 23
+
+                await habit_manager.delete_habit(5)
+                assert len(await habit_manager.get_all_habits()) == 5
+
+        asyncio.run(run())
+
+    def test_concurrent_check_offs(self):
+
+        async def run():
+            async with AsyncHabitManager(self.__TEST_DATABASE_NAME) as habit_manager:
+                await asyncio.gather(*[
+                    habit_manager.check_off(i % 5, [datetime(year=2024, month=9, day=1) + timedelta(days=i // 5)])
+                    for i in range(100)])
+
+                statistics = habit_manager.get_statistics()
+                assert statistics["check_off_requests"] == 100
+                assert statistics["check_off_transactions"] < 100
+
+                return [await habit_manager.get_streak(StreakType.LONGEST, habit_id) 
+                        for habit_id in range(5)]
+
+        streaks = asyncio.run(run())
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME)
+        assert streaks == [
+            habit_manager.get_streak(StreakType.LONGEST, habit_id) 
+            for habit_id in range(5)]
+        assert habit_manager.get_streak(StreakType.LONGEST, 1) >= 20
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79 + 100
+
+    def test_operations_in_request_order(self):
+
+        async def run():
+            async with AsyncHabitManager(self.__TEST_DATABASE_NAME) as habit_manager:
+                # The check off gets applied to the deleted habit, not to the new habit with its habit_id
+                await asyncio.gather(
+                    habit_manager.check_off(2, [datetime(year=2024, month=9, day=1)]), 
+                    habit_manager.delete_habit(2), 
+                    habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY))
+
+                return await habit_manager.get_streak(StreakType.LONGEST, 2)
+
+        assert asyncio.run(run()) == 0
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), {"habit_id": 2}) == []
+
+    def test_creation_error(self):
+
+        async def run():
+            habit_manager = AsyncHabitManager(self.__TEST_DATABASE_NAME, unknown_argument=True)
+
+            with pytest.raises(TypeError, match="unknown_argument"):
+                await habit_manager.get_all_habits()
+            with pytest.raises(TypeError, match="unknown_argument"):
+                await habit_manager.check_off(0)
+
+            await habit_manager.close()
+
+        asyncio.run(run())
+
+    def teardown_method(self):
+
+        del self.__database_manager
@@ -0,0 +1,155 @@
+import pytest
+import random
+from datetime import datetime, timedelta
+from context import src
+from src.check_off_history import CheckOffHistory
+
+
+class TestCheckOffHistory:
+
+    def setup_method(self):
+
+        self.__datetimes = [
+            datetime(year=2024, month=8, day=10, hour=8), 
+            datetime(year=2024, month=8, day=2, hour=9), 
+            datetime(year=2024, month=8, day=10, hour=20)]
+        self.__check_off_history = CheckOffHistory(self.__datetimes)
+
+    def test_init(self):
+
+        assert len(self.__check_off_history) == 3
+        assert set(self.__check_off_history) == set(self.__datetimes)
+        assert self.__check_off_history.get_ordinals() == sorted(
+            checked_off_datetime.toordinal() 
+            for checked_off_datetime in self.__datetimes)
+
+    def test_add(self):
+
+        new_datetimes = [
+            datetime(year=2024, month=8, day=5), 
+            datetime(year=2024, month=7, day=1), 
+            datetime(year=2024, month=8, day=5)]
+        assert self.__check_off_history.add(
+            new_datetimes + self.__datetimes) == new_datetimes[:2]
+
+        assert len(self.__check_off_history) == 5
+        assert new_datetimes[0] in self.__check_off_history
+        assert datetime(year=2024, month=8, day=6) not in self.__check_off_history
+        assert self.__check_off_history.get_ordinals() == sorted(
+            checked_off_datetime.toordinal() 
+            for checked_off_datetime in self.__datetimes + new_datetimes[:2])
+
+    def test_streaks(self):
+
+        assert self.__check_off_history.get_longest_streak() == 1
+        assert self.__check_off_history.get_current_streak(
+            datetime(year=2024, month=8, day=11).toordinal()) == 1
+
+        self.__check_off_history.add([datetime(year=2024, month=8, day=11)])
+        self.__check_off_history.add([datetime(year=2024, month=8, day=12)])
+        assert self.__check_off_history.get_longest_streak() == 3
+        assert self.__check_off_history.get_current_streak(
+            datetime(year=2024, month=8, day=13).toordinal()) == 3
+        assert self.__check_off_history.get_current_streak(
+            datetime(year=2024, month=8, day=14).toordinal()) == 0
+
+    @pytest.mark.parametrize("compact", [False, True])
+    @pytest.mark.parametrize("period", [1, 7])
+    def test_streaks_random(self, period, compact):
+
+        random_generator = random.Random(period)
+        check_off_history = CheckOffHistory(period=period, compact=compact)
+        datetimes = []
+
+        for i in range(500):
+            checked_off_datetime = (datetime(year=2024, month=1, day=1) 
+                                    + timedelta(days=random_generator.randrange(200), 
+                                                hours=random_generator.randrange(3)))
+            check_off_history.add([checked_off_datetime])
+            if checked_off_datetime not in datetimes:
+                datetimes.append(checked_off_datetime)
+
+            today_ordinal = max(datetimes).toordinal() + random_generator.randrange(2 * period)
+            assert check_off_history.get_longest_streak() == self.get_longest_streak(
+                datetimes, period)
+            assert check_off_history.get_current_streak(today_ordinal) == self.get_current_streak(
+                datetimes, period, today_ordinal)
+
+        assert CheckOffHistory(datetimes, period, compact).get_longest_streak() == self.get_longest_streak(
+            datetimes, period)
+        assert sorted(check_off_history) == sorted(datetimes)
+
+    def test_compact(self):
+
+        check_off_history = CheckOffHistory(
+            [checked_off_datetime.isoformat() 
+             for checked_off_datetime in self.__datetimes + self.__datetimes[:1]], 
+            compact=True)
+
+        assert len(check_off_history) == 3
+        assert list(check_off_history) == sorted(self.__datetimes)
+        assert self.__datetimes[0] in check_off_history
+        assert datetime(year=2024, month=8, day=10) not in check_off_history
+        assert check_off_history.get_ordinals().tolist() == self.__check_off_history.get_ordinals()
+
+        new_datetimes = [
+            datetime(year=2024, month=8, day=11, microsecond=1), 
+            datetime(year=1960, month=1, day=1), 
+            self.__datetimes[1]]
+        assert check_off_history.add(new_datetimes) == new_datetimes[:2]
+        assert sorted(check_off_history) == sorted(self.__datetimes + new_datetimes[:2])
+        assert check_off_history.get_longest_streak() == 2
+        assert check_off_history.get_current_streak(
+            datetime(year=2024, month=8, day=12).toordinal()) == 2
+
+    def test_get_memory_usage(self):
+
+        assert CheckOffHistory().get_memory_usage()["bytes_per_check_off"] == 0.0
+
+        check_off_history = CheckOffHistory(
+            [datetime(year=2024, month=1, day=1) + timedelta(hours=i) 
+             for i in range(10000)])
+        memory_usage = check_off_history.get_memory_usage()
+        assert memory_usage["total_bytes"] == pytest.approx(
+            memory_usage["bytes_per_check_off"] * 10000)
+        assert memory_usage["bytes_per_check_off"] < 200
+
+        check_off_history = CheckOffHistory(
+            [datetime(year=2024, month=1, day=1) + timedelta(hours=i) 
+             for i in range(10000)], 
+            compact=True)
+        assert check_off_history.get_memory_usage()["bytes_per_check_off"] < 16
+
+    def get_longest_streak(self, datetimes, period):
+
+        sorted_ordinals = sorted(
+            checked_off_datetime.toordinal() 
+            for checked_off_datetime in datetimes)
+        streak = 0
+        temp_streak = 0
+
+        for i in range(len(sorted_ordinals)):
+            if i > 0 and sorted_ordinals[i] - sorted_ordinals[i-1] == period:
+                temp_streak += 1
+            else:
+                temp_streak = 1
+            streak = max(streak, temp_streak)
+
+        return streak
+
+    def get_current_streak(self, datetimes, period, today_ordinal):
+
+        sorted_ordinals = sorted(
+            checked_off_datetime.toordinal() 
+            for checked_off_datetime in datetimes)
+
+        if sorted_ordinals == [] or sorted_ordinals[-1] < today_ordinal - period:
+            return 0
+
+        streak = 1
+        for i in range(len(sorted_ordinals) - 1, 0, -1):
+            if sorted_ordinals[i] - sorted_ordinals[i-1] != period:
+                break
+            streak += 1
+
+        return streak
@@ -0,0 +1,104 @@
+import pytest
+import shutil
+import threading
+from context import src
+from src.connection_pool import ConnectionPool
+
+
+class TestConnectionPool:
+
+    __EXAMPLE_DATABASE_NAME = "example_habit.db"
+    __TEST_DATABASE_NAME = "test_habit.db"
+
+    def setup_method(self):
+
+        # Copy example data to test database
+        shutil.copy(self.__EXAMPLE_DATABASE_NAME, self.__TEST_DATABASE_NAME)
+
+        self.__connection_pool = ConnectionPool(self.__TEST_DATABASE_NAME,
+                                                max_connections=2)
+
+    def test_reuse(self):
+
+        for i in range(10):
+            with self.__connection_pool.connection() as connection:
+                connection.execute("SELECT * FROM habit").fetchall()
+
+        statistics = self.__connection_pool.get_statistics()
+        assert statistics["connections_opened"] == 1
+        assert statistics["checkouts"] == 10
+        assert statistics["reuses"] == 9
+        assert statistics["reuse_rate"] == 0.9
+
+    def test_nested_checkout(self):
+
+        with self.__connection_pool.connection() as outer_connection:
+            with self.__connection_pool.connection() as inner_connection:
+                assert inner_connection is outer_connection
+
+        assert self.__connection_pool.get_statistics()["checkouts"] == 1
+
+    def test_threads(self):
+
+        barrier = threading.Barrier(2)
+        connections = []
+
+        def check_out():
+            with self.__connection_pool.connection() as connection:
+                connections.append(connection)
+                barrier.wait()
+
+        threads = [threading.Thread(target=check_out) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert connections[0] is not connections[1]
+        assert self.__connection_pool.get_statistics()["connections_opened"] == 2
+
+    def test_wait(self):
+
+        connection_pool = ConnectionPool(self.__TEST_DATABASE_NAME,
+                                         max_connections=1)
+        connection = connection_pool.acquire()
+        connections = []
+
+        thread = threading.Thread(
+            target=lambda: connections.append(connection_pool.acquire()))
+        thread.start()
+        thread.join(0.1)
+        assert connections == []
+
+        connection_pool.release(connection)
+        thread.join()
+        assert connections == [connection]
+        assert connection_pool.get_statistics()["wait_time"] > 0
+
+        connection_pool.close()
+
+    def test_close(self):
+
+        with self.__connection_pool:
+            with self.__connection_pool.connection() as connection:
+                connection.execute("SELECT * FROM habit").fetchall()
+
+        statistics = self.__connection_pool.get_statistics()
+        assert statistics["connections_closed"] == 1
+        assert statistics["open_connections"] == 0
+
+    def test_pragmas(self):
+
+        connection_pool = ConnectionPool(self.__TEST_DATABASE_NAME,
+                                         pragmas=(("cache_size", -1000), ("temp_store", "MEMORY")))
+
+        with connection_pool.connection() as connection:
+            assert connection.execute("PRAGMA cache_size").fetchone()[0] == -1000
+            assert connection.execute("PRAGMA temp_store").fetchone()[0] == 2
+
+        connection_pool.close()
+
+    def teardown_method(self):
+
+        self.__connection_pool.close()
+        del self.__connection_pool
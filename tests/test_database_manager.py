@@ -1,10 +1,14 @@
 import pytest
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import random
 import shutil
 import sqlite3
+import threading
 from context import src
 from src.database_manager import DatabaseManager
 from src.habit import DatabaseTable
+from src.check_off_history import CheckOffHistory, to_microseconds
+from src import DurabilityProfile
 
 
 class TestDatabaseManager:
@@ -84,6 +88,41 @@ class TestDatabaseManager:
             DatabaseTable.CHECK_OFF_DATETIME.name.lower())
         assert loaded_table == self.loaded_check_off_table
 
+    def test_initialize_indexes(self):
+
+        self.__database_manager.initialize_database(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            self.__check_off_data_structure, 
+            foreign_keys={"habit_id": "habit(habit_id)"}, 
+            indexes={"check_off_datetime_index": ["check_off_datetime"]}, 
+            unique_indexes={"check_off_datetime_habit_id_index": ["habit_id", "check_off_datetime"]})
+
+        with sqlite3.connect(self.__TEST_DATABASE_NAME) as connection:
+            index_list = connection.execute(
+                "PRAGMA index_list(check_off_datetime)").fetchall()
+            query_plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM check_off_datetime WHERE habit_id = ?", 
+                (0,)).fetchall()
+        assert sorted((index[1], index[2]) for index in index_list) == [
+            ("check_off_datetime_habit_id_index", 1), 
+            ("check_off_datetime_index", 0)]
+        assert "check_off_datetime_habit_id_index" in query_plan[0][3]
+
+        data_records = [
+            {"habit_id": "0", "check_off_datetime": self.loaded_check_off_table[0][2]}, 
+            {"habit_id": "0", "check_off_datetime": "2024-09-01T00:00:00"}, 
+            {"habit_id": "0", "check_off_datetime": "2024-09-01T00:00:00"}]
+        self.__database_manager.save_many(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            data_records, 
+            "id", 
+            only_insert_if_unique=True)
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert loaded_table == (self.loaded_check_off_table 
+                                + [(79, 0, "2024-09-01T00:00:00")])
+
     def test_load(self):
 
         loaded_table = self.__database_manager.load(
@@ -94,6 +133,71 @@ class TestDatabaseManager:
             DatabaseTable.CHECK_OFF_DATETIME.name.lower())
         assert loaded_table == self.loaded_check_off_table
 
+    def test_load_range(self):
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            where_expressions={"habit_id IN": [1, 3], "id >=": 10, "id <": 60}, 
+            order_key_name="id", 
+            descending=True, 
+            limit=5)
+        assert loaded_table == sorted(
+            (row 
+             for row in self.loaded_check_off_table 
+             if row[1] in [1, 3] and 10 <= row[0] < 60), 
+            reverse=True)[:5]
+
+        # Lists of any length share one command string
+        for habit_ids in [[], [0], [0, 2, 4]]:
+            assert self.__database_manager.load(
+                DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                where_expressions={"habit_id in": habit_ids}) == [
+                    row 
+                    for row in self.loaded_check_off_table 
+                    if row[1] in habit_ids]
+
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            where_expressions={"id LIKE": 1}) is None
+
+    @pytest.mark.parametrize("key_name", [None, "id"])
+    def test_iter_load(self, key_name):
+
+        table_name = DatabaseTable.CHECK_OFF_DATETIME.name.lower()
+
+        for chunk_size in [1, 10, 79, 100]:
+            loaded_rows = self.__database_manager.iter_load(
+                table_name, chunk_size=chunk_size, key_name=key_name)
+            assert list(loaded_rows) == self.loaded_check_off_table
+
+        loaded_batches = list(self.__database_manager.iter_load(
+            table_name, 
+            where_expressions={"habit_id": 1}, 
+            chunk_size=10, 
+            batches=True, 
+            key_name=key_name))
+        assert [len(batch) for batch in loaded_batches] == [10, 10, 9]
+        assert [row for batch in loaded_batches for row in batch] == [
+            row 
+            for row in self.loaded_check_off_table 
+            if row[1] == 1]
+
+        assert list(self.__database_manager.iter_load(
+            "missing_table", key_name=key_name)) == []
+
+    def test_iter_load_closed_early(self):
+
+        loaded_rows = self.__database_manager.iter_load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), chunk_size=10)
+        assert next(loaded_rows) == self.loaded_check_off_table[0]
+        loaded_rows.close()
+
+        # The connection is back in the pool, so loading checks it out again
+        checkouts = self.__database_manager.get_statistics()["checkouts"]
+        assert self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower()) == self.loaded_habit_table
+        assert self.__database_manager.get_statistics()["checkouts"] == checkouts + 1
+
     def test_save_habit(self):
 
         for data_record in self.__habit_data_records:
@@ -142,6 +246,31 @@ class TestDatabaseManager:
                                          else value 
                                          for value in data_record_5.values())])
 
+    def test_save_quoted_values(self):
+
+        data_record = {"habit_id": "5",
+        "name": "Don't \"skip\" breakfast",
+        "description": "'; DROP TABLE habit; --",
+        "periodicity": "1",
+        "creation_datetime": "creation_datetime_5"}
+        self.__database_manager.save(
+            DatabaseTable.HABIT.name.lower(), 
+            data_record, 
+            "habit_id")
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower(), 
+            {"name": data_record["name"]})
+        assert loaded_table == [
+            (5, data_record["name"], data_record["description"], 1, "creation_datetime_5")]
+
+        self.__database_manager.delete(
+            DatabaseTable.HABIT.name.lower(), 
+            {"description": data_record["description"]})
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower())
+        assert loaded_table == self.loaded_habit_table
+
     def test_check_off_date_save(self):
 
         data_record = {
@@ -194,6 +323,122 @@ class TestDatabaseManager:
                                    data_record_2_tuple, 
                                    data_record_3_tuple])
 
+    def test_save_many(self):
+
+        data_records = [
+            {"habit_id": "0", 
+             "check_off_datetime": (datetime.now() - timedelta(days=i)).isoformat()} 
+            for i in range(3)]
+        self.__database_manager.save_many(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            data_records + data_records[:1], 
+            "id", 
+            only_insert_if_unique=True)
+        self.__database_manager.save_many(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            data_records, 
+            "id", 
+            only_insert_if_unique=True)
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert loaded_table == (self.loaded_check_off_table 
+                                + [(79 + i, 0, data_record["check_off_datetime"]) 
+                                   for i, data_record in enumerate(data_records)])
+
+        data_records = [
+            {"habit_id": "1", 
+             "name": "name_1", 
+             "description": "description_1", 
+             "periodicity": "7", 
+             "creation_datetime": "creation_datetime_1"}, 
+            {"habit_id": "5", 
+             "name": "name_5", 
+             "description": "description_5", 
+             "periodicity": "1", 
+             "creation_datetime": "creation_datetime_5"}]
+        self.__database_manager.save_many(
+            DatabaseTable.HABIT.name.lower(), 
+            data_records, 
+            "habit_id")
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower())
+        assert loaded_table == (self.loaded_habit_table[:1] 
+                                + [(1, "name_1", "description_1", 7, "creation_datetime_1")] 
+                                + self.loaded_habit_table[2:] 
+                                + [(5, "name_5", "description_5", 1, "creation_datetime_5")])
+
+    def test_concurrent_primary_keys(self):
+
+        def save_check_offs(habit_id):
+            database_manager = DatabaseManager(self.__TEST_DATABASE_NAME)
+            for i in range(20):
+                database_manager.save(
+                    DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                    {"habit_id": str(habit_id), 
+                     "check_off_datetime": (datetime(2024, 9, 1) + timedelta(days=i)).isoformat()}, 
+                    "id")
+            database_manager.close()
+
+        threads = [threading.Thread(target=save_check_offs, args=(habit_id,)) 
+                   for habit_id in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79 + 4 * 20
+        assert sorted(row[0] for row in loaded_table) == list(range(79 + 4 * 20))
+
+    def test_transaction(self):
+
+        with pytest.raises(ZeroDivisionError):
+            with self.__database_manager.transaction():
+                self.__database_manager.delete(
+                    DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+                1 / 0
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert loaded_table == self.loaded_check_off_table
+
+        with self.__database_manager.transaction():
+            self.__database_manager.delete(
+                DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                {"habit_id": 0})
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert loaded_table == [
+            row 
+            for row in self.loaded_check_off_table 
+            if row[1] != 0]
+
+    def test_transaction_with_failing_save(self, capsys):
+
+        # A failing save rolls back the whole transaction instead of being printed
+        with pytest.raises(sqlite3.OperationalError):
+            with self.__database_manager.transaction():
+                self.__database_manager.delete(
+                    DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+                    {"habit_id": 0})
+                self.__database_manager.save_many(
+                    "missing_table", 
+                    [{"habit_id": 0}], 
+                    primary_key_name="habit_id")
+
+        assert capsys.readouterr().out == ""
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()) == self.loaded_check_off_table
+
+        # Without a transaction the error gets printed
+        self.__database_manager.save_many(
+            "missing_table", [{"habit_id": 0}], primary_key_name="habit_id")
+        assert "no such table" in capsys.readouterr().out
+
     def test_delete(self):
 
         for database_table in DatabaseTable:
@@ -222,10 +467,151 @@ class TestDatabaseManager:
             for row in self.loaded_check_off_table 
             if row[1] in [1, 3, 4]]
 
+    @pytest.mark.parametrize("durability_profile, synchronous", [
+        (DurabilityProfile.SAFE, 2), 
+        (DurabilityProfile.BALANCED, 1), 
+        (DurabilityProfile.FAST, 0)])
+    def test_durability_profile(self, durability_profile, synchronous):
+
+        database_manager = DatabaseManager(self.__TEST_DATABASE_NAME, 
+                                           durability_profile=durability_profile)
+
+        with database_manager.transaction() as cursor:
+            assert cursor.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert cursor.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+
+        # Readers are not blocked by an open write transaction
+        with database_manager.transaction() as cursor:
+            cursor.execute("DELETE FROM check_off_datetime")
+            connection = sqlite3.connect(self.__TEST_DATABASE_NAME, timeout=0)
+            assert len(connection.execute("SELECT * FROM check_off_datetime").fetchall()) == 79
+            connection.close()
+
+        assert database_manager.load(DatabaseTable.CHECK_OFF_DATETIME.name.lower()) == []
+
+        # Leave write-ahead logging, which is persistent, for the following tests
+        database_manager.close()
+        self.__database_manager.close()
+        connection = sqlite3.connect(self.__TEST_DATABASE_NAME)
+        connection.execute("PRAGMA journal_mode = DELETE")
+        connection.close()
+
+    def test_connection_reuse(self):
+
+        with DatabaseManager(self.__TEST_DATABASE_NAME) as database_manager:
+            for database_table in [DatabaseTable.HABIT, DatabaseTable.CHECK_OFF_DATETIME]:
+                database_manager.load(database_table.name.lower())
+                database_manager.delete(
+                    database_table.name.lower(),
+                    {"habit_id": 2})
+
+            statistics = database_manager.get_statistics()
+            assert statistics["connections_opened"] == 1
+            assert statistics["open_connections"] == 1
+            assert statistics["reuse_rate"] == 0.8
+
+        assert database_manager.get_statistics()["open_connections"] == 0
+
+    def test_load_streaks(self):
+
+        today_ordinal = date(year=2024, month=12, day=31).toordinal()
+        periods, datetimes = self.create_streak_tables()
+
+        streaks = self.__database_manager.load_streaks(
+            "streak_check_off", "habit_id", "check_off_datetime", 
+            "streak_habit(periodicity)", today_ordinal)
+
+        assert [row[0] for row in streaks] == [
+            habit_id 
+            for habit_id, habit_datetimes in datetimes.items() 
+            if habit_datetimes != []]
+        for (habit_id, current_streak, longest_streak, 
+             last_streak, last_ordinal, number_of_check_offs) in streaks:
+            check_off_history = CheckOffHistory(datetimes[habit_id], periods[habit_id])
+            assert current_streak == check_off_history.get_current_streak(today_ordinal)
+            assert longest_streak == check_off_history.get_longest_streak()
+            assert last_streak == check_off_history.get_last_streak()
+            assert last_ordinal == check_off_history.get_ordinals()[-1]
+            assert number_of_check_offs == len(check_off_history)
+
+        assert self.__database_manager.load_streaks(
+            "streak_check_off", "habit_id", "check_off_datetime", 
+            "streak_habit(periodicity)", today_ordinal, 
+            where_expressions={"habit_id": 3}) == [streaks[3]]
+        assert self.__database_manager.load_streaks(
+            "no_table", "habit_id", "check_off_datetime", 
+            "streak_habit(periodicity)", today_ordinal) == []
+
+    def test_load_period_counts(self):
+
+        start_datetime = datetime(year=2024, month=3, day=1)
+        end_datetime = datetime(year=2024, month=9, day=1)
+        periods, datetimes = self.create_streak_tables()
+
+        period_counts = self.__database_manager.load_period_counts(
+            "streak_check_off", "habit_id", "check_off_datetime", 
+            "streak_habit(periodicity)", start_datetime.toordinal(), 
+            where_expressions={"check_off_datetime >=": to_microseconds(start_datetime), 
+                               "check_off_datetime <": to_microseconds(end_datetime)})
+
+        expected_period_counts = []
+        for habit_id, habit_datetimes in datetimes.items():
+            window_datetimes = [checked_off_datetime 
+                                for checked_off_datetime in habit_datetimes 
+                                if start_datetime <= checked_off_datetime < end_datetime]
+            if window_datetimes != []:
+                expected_period_counts.append(
+                    (habit_id, 
+                     len({(checked_off_datetime - start_datetime).days // periods[habit_id] 
+                          for checked_off_datetime in window_datetimes}), 
+                     len(window_datetimes)))
+        assert period_counts == expected_period_counts
+
+        assert self.__database_manager.load_period_counts(
+            "streak_check_off", "habit_id", "check_off_datetime", 
+            "streak_habit(periodicity)", start_datetime.toordinal(), 
+            where_expressions={"check_off_datetime >=": to_microseconds(start_datetime), 
+                               "check_off_datetime <": to_microseconds(end_datetime), 
+                               "habit_id IN": [3, 5]}) == [
+                row for row in period_counts if row[0] in [3, 5]]
+
     def teardown_method(self):
 
         del self.__database_manager
 
+    def create_streak_tables(self):
+
+        # Random check offs, several per day and some before 1970, as corpus for SQL and Python
+        random_generator = random.Random(0)
+        periods = {habit_id: random_generator.choice([1, 7]) 
+                   for habit_id in range(50)}
+        datetimes = {
+            habit_id: list({datetime(year=random_generator.choice([1969, 2024]), month=1, day=1) 
+                            + timedelta(days=random_generator.randrange(366), 
+                                        hours=random_generator.randrange(2)) 
+                            for i in range(random_generator.randrange(300))}) 
+            for habit_id in periods}
+
+        self.__database_manager.initialize_database(
+            "streak_habit", {"habit_id": "INTEGER", "periodicity": "INTEGER"})
+        self.__database_manager.initialize_database(
+            "streak_check_off", 
+            {"id": "INTEGER", "habit_id": "INTEGER", "check_off_datetime": "INTEGER"}, 
+            unique_indexes={"streak_check_off_habit_id_index": ["habit_id", "check_off_datetime"]})
+        self.__database_manager.save_many(
+            "streak_habit", 
+            [{"habit_id": habit_id, "periodicity": period} 
+             for habit_id, period in periods.items()], 
+            primary_key_name="habit_id")
+        self.__database_manager.save_many(
+            "streak_check_off", 
+            [{"habit_id": habit_id, "check_off_datetime": to_microseconds(checked_off_datetime)} 
+             for habit_id, habit_datetimes in datetimes.items() 
+             for checked_off_datetime in habit_datetimes], 
+            primary_key_name="id")
+
+        return periods, datetimes
+
     def select_from_database_table(self, table_name):
 
         try:
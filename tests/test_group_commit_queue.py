@@ -0,0 +1,154 @@
+import pytest
+import gc
+import threading
+import time
+import weakref
+from context import src
+from src.group_commit_queue import GroupCommitQueue
+
+
+class TestGroupCommitQueue:
+
+    def setup_method(self):
+
+        self.flushed_records = []
+        self.pending_records = []
+        self.lock = threading.Lock()
+
+    def flush(self):
+
+        with self.lock:
+            self.flushed_records.extend(self.pending_records)
+            self.pending_records = []
+
+    def add(self, group_commit_queue, records):
+
+        with self.lock:
+            self.pending_records.extend(records)
+        group_commit_queue.add(len(records))
+
+    def test_flush_interval(self):
+
+        group_commit_queue = GroupCommitQueue(self.flush, flush_interval=0.01)
+        self.add(group_commit_queue, [1, 2, 3])
+
+        deadline = time.monotonic() + 5
+        while self.flushed_records == [] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.flushed_records == [1, 2, 3]
+
+        group_commit_queue.close()
+        statistics = group_commit_queue.get_statistics()
+        assert statistics["flushed_records"] == 3
+        assert statistics["pending_records"] == 0
+
+    def test_max_batch_size(self):
+
+        group_commit_queue = GroupCommitQueue(self.flush, flush_interval=60, max_batch_size=2)
+        self.add(group_commit_queue, [1])
+        time.sleep(0.05)
+        assert self.flushed_records == []
+
+        self.add(group_commit_queue, [2])
+        deadline = time.monotonic() + 5
+        while self.flushed_records == [] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.flushed_records == [1, 2]
+
+        group_commit_queue.close()
+
+    def test_backpressure(self):
+
+        flush_started = threading.Event()
+        release_flush = threading.Event()
+
+        def slow_flush():
+            flush_started.set()
+            release_flush.wait()
+            self.flush()
+
+        group_commit_queue = GroupCommitQueue(slow_flush, flush_interval=60, max_batch_size=2, max_pending=2)
+        self.add(group_commit_queue, [1, 2])
+        assert flush_started.wait(5)
+
+        # The queue is full until the running flush completes
+        producer = threading.Thread(target=self.add, args=(group_commit_queue, [3]))
+        producer.start()
+        producer.join(0.05)
+        assert producer.is_alive()
+
+        release_flush.set()
+        producer.join(5)
+        assert not producer.is_alive()
+
+        group_commit_queue.close()
+        assert self.flushed_records == [1, 2, 3]
+        assert group_commit_queue.get_statistics()["backpressure_waits"] == 1
+
+    def test_close(self):
+
+        group_commit_queue = GroupCommitQueue(self.flush, flush_interval=60)
+        self.add(group_commit_queue, [1, 2])
+        group_commit_queue.close()
+        assert self.flushed_records == [1, 2]
+
+        # Records added after closing are saved right away
+        self.add(group_commit_queue, [3])
+        assert self.flushed_records == [1, 2, 3]
+        group_commit_queue.close()
+
+    def test_failed_flush(self):
+
+        failures = [RuntimeError("database is locked")]
+
+        def failing_flush():
+            if failures != []:
+                raise failures.pop()
+            self.flush()
+
+        group_commit_queue = GroupCommitQueue(failing_flush, flush_interval=0.01, max_batch_size=1)
+        self.add(group_commit_queue, [1, 2])
+
+        # The records stay pending and get saved by the retry
+        deadline = time.monotonic() + 5
+        while self.flushed_records == [] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.flushed_records == [1, 2]
+
+        group_commit_queue.close()
+        statistics = group_commit_queue.get_statistics()
+        assert statistics["failed_flushes"] == 1
+        assert statistics["flushed_records"] == 2
+        assert statistics["pending_records"] == 0
+
+    def test_failed_flush_on_close(self):
+
+        def failing_flush():
+            raise RuntimeError("database is locked")
+
+        group_commit_queue = GroupCommitQueue(failing_flush, flush_interval=60)
+        self.add(group_commit_queue, [1, 2])
+
+        with pytest.raises(RuntimeError):
+            group_commit_queue.close()
+        assert group_commit_queue.get_statistics()["pending_records"] == 2
+
+    def test_garbage_collection(self):
+
+        def count_threads():
+            return sum(thread.name == "group_commit" for thread in threading.enumerate())
+
+        number_of_threads = count_threads()
+        group_commit_queue = GroupCommitQueue(self.flush, flush_interval=0.01)
+        queue_reference = weakref.ref(group_commit_queue)
+        assert count_threads() == number_of_threads + 1
+
+        # Neither the background thread nor the exit hook keep an unclosed queue alive
+        del group_commit_queue
+        deadline = time.monotonic() + 5
+        while ((queue_reference() is not None or count_threads() > number_of_threads) 
+               and time.monotonic() < deadline):
+            gc.collect()
+            time.sleep(0.01)
+        assert queue_reference() is None
+        assert count_threads() == number_of_threads
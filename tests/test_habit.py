@@ -4,6 +4,7 @@ import shutil
 from context import src
 from src.habit import Habit, Periodicity, StreakType, DatabaseTable
 from src.database_manager import DatabaseManager
+from src.check_off_history import to_microseconds, from_microseconds
 
 pytest.main()
 
@@ -20,6 +21,9 @@ class TestHabit:
 
         self.__database_manager = DatabaseManager(self.__TEST_DATABASE_NAME)
 
+        # Upgrade the example data to the latest schema before loading it
+        Habit.initialize_database(self.__database_manager)
+
         self.__habits = []
         
         # Create loaded habits
@@ -30,7 +34,7 @@ class TestHabit:
                           row[1], 
                           row[2], 
                           Periodicity(row[3]), 
-                          datetime.fromisoformat(row[4]), 
+                          from_microseconds(row[4]), 
                           database_name=self.__TEST_DATABASE_NAME)
             self.__habits.append(habit)
 
@@ -38,7 +42,7 @@ class TestHabit:
             DatabaseTable.CHECK_OFF_DATETIME.name.lower())
         for row in self.loaded_check_off_table:
             habit_id = row[1]
-            check_off_datetime = datetime.fromisoformat(row[2])
+            check_off_datetime = from_microseconds(row[2])
 
             for habit in self.__habits:
                 if habit.habit_id == habit_id:
@@ -102,6 +106,16 @@ class TestHabit:
         self.__habits[2].check_off([datetime(year=2024, month=7, day=20)])
         assert self.__habits[2].get_streak(StreakType.LONGEST) == 4
 
+    def test_get_streak_verify(self):
+
+        for habit in self.__habits:
+            habit.check_off([datetime(year=2024, month=7, day=30), 
+                             datetime(year=2024, month=7, day=6)])
+            habit.check_off()
+
+            for streak_type in StreakType:
+                assert habit.get_streak(streak_type, verify=True) == habit.get_streak(streak_type)
+
     def test_save(self):
 
         habit = Habit(5, 
@@ -122,14 +136,57 @@ class TestHabit:
              "Running", 
              "Go running once a week.", 
              7, 
-             datetime(year=2024, month=7, day=2).isoformat())]
+             to_microseconds(datetime(year=2024, month=7, day=2)))]
         
         loaded_table = self.__database_manager.load(
             DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
             {"habit_id": 5})
         assert loaded_table == [
-            (79, 5, datetime(year=2024, month=7, day=2).isoformat()), 
-            (80, 5, datetime(year=2024, month=7, day=9).isoformat())]
+            (79, 5, to_microseconds(datetime(year=2024, month=7, day=2))), 
+            (80, 5, to_microseconds(datetime(year=2024, month=7, day=9)))]
+
+    def test_flush(self):
+
+        dates_to_check_off = [
+            datetime(year=2024, month=9, day=i) 
+            for i in range(1, 4)]
+        new_datetimes = self.__habits[0].check_off(dates_to_check_off, flush=False)
+        assert new_datetimes == dates_to_check_off
+        assert self.__habits[0].check_off(dates_to_check_off, flush=False) == []
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert loaded_table == self.loaded_check_off_table
+
+        self.__habits[0].flush()
+        self.__habits[0].flush()
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert loaded_table == (self.loaded_check_off_table 
+                                + [(79 + i, 0, to_microseconds(dates_to_check_off[i])) 
+                                   for i in range(3)])
+
+    def test_slots(self):
+
+        habit = Habit(5, 
+                      "Running", 
+                      "Go running once a week.", 
+                      Periodicity.WEEKLY, 
+                      database_manager=self.__database_manager)
+        assert habit.database_name == self.__TEST_DATABASE_NAME
+        assert not hasattr(habit, "__dict__")
+
+        with pytest.raises(AttributeError):
+            habit.name = "Swimming"
+
+        assert habit.get_view() is habit.get_view()
+        assert habit.get_view() == {
+            "habit_id": 5, 
+            "name": "Running", 
+            "description": "Go running once a week.", 
+            "periodicity": "Weekly", 
+            "creation_datetime": habit.creation_datetime.isoformat()}
 
     def test_delete(self):
 
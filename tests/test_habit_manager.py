@@ -1,9 +1,17 @@
 import pytest
+import gc
 from datetime import datetime, timedelta
 from freezegun import freeze_time
 import shutil
+import sqlite3
+import threading
+import time
+import weakref
 from context import src
-from src.habit_manager import HabitManager, DatabaseManager, Periodicity, StreakType, DatabaseTable
+from src.habit_manager import HabitManager, DatabaseManager, Periodicity, StreakType, StreakEngine, DatabaseTable
+from src.check_off_history import from_microseconds
+from src.schema_migrator import SchemaMigrator
+from src.habit import Habit
 
 
 class TestHabitManager:
@@ -41,6 +49,35 @@ class TestHabitManager:
                 "creation_datetime": datetime.now().isoformat()}]
             )
         
+    def test_create_habit_without_initializing(self, monkeypatch):
+
+        # The habit manager has initialized the database already
+        migrations = []
+        monkeypatch.setattr(SchemaMigrator, "migrate", lambda schema_migrator: migrations.append(1))
+
+        self.__habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+        assert migrations == []
+        assert self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower(), {"habit_id": 5})[0][1] == "Swimming"
+
+    def test_create_habit_id(self):
+
+        self.__habit_manager.delete_habit(3)
+        self.__habit_manager.delete_habit(1)
+        self.__habit_manager.delete_habit(1)
+
+        for i in range(3):
+            self.__habit_manager.create_habit(f"habit {i}", 
+                                              f"description {i}", 
+                                              Periodicity.WEEKLY)
+
+        assert [habit["habit_id"] 
+                for habit in self.__habit_manager.get_all_habits()] == [0, 2, 4, 1, 3, 5]
+        assert [habit["habit_id"] 
+                for habit in self.__habit_manager.get_all_habits(Periodicity.WEEKLY)] == [2, 4, 1, 3, 5]
+        assert [habit["habit_id"] 
+                for habit in self.__habit_manager.get_all_habits(Periodicity.DAILY)] == [0]
+
     def test_delete_habit(self):
         
         self.__habit_manager.delete_habit(0)
@@ -75,6 +112,227 @@ class TestHabitManager:
         assert self.__habit_manager.get_streak(StreakType.CURRENT, 1) == 4
 
 
+    def test_check_off_many(self):
+
+        self.__habit_manager.check_off_many(
+            {0: [datetime.now() - timedelta(days=i) for i in range(3)], 
+             2: [datetime.now(), datetime.now() - timedelta(days=7)], 
+             7: [datetime.now()]})
+        assert self.__habit_manager.get_streak(StreakType.CURRENT, 0) == 3
+        assert self.__habit_manager.get_streak(StreakType.CURRENT, 2) == 2
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79 + 5
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME)
+        assert habit_manager.get_streak(StreakType.CURRENT, 0) == 3
+        assert habit_manager.get_streak(StreakType.CURRENT, 2) == 2
+
+    def test_write_behind(self):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, write_behind=True)
+        habit_manager.check_off(0, [datetime.now()])
+        habit_manager.check_off_many({1: [datetime.now()]})
+        assert habit_manager.get_streak(StreakType.CURRENT, 0) == 1
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79
+
+        habit_manager.flush()
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79 + 2
+
+    def test_group_commit(self):
+
+        with HabitManager(self.__TEST_DATABASE_NAME, group_commit_interval=60, group_commit_size=3) as habit_manager:
+            habit_manager.check_off(0, [datetime.now()])
+            habit_manager.check_off_many({1: [datetime.now()]})
+            assert habit_manager.get_streak(StreakType.CURRENT, 0) == 1
+            assert habit_manager.get_group_commit_statistics()["pending_records"] == 2
+
+            loaded_table = self.__database_manager.load(
+                DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+            assert len(loaded_table) == 79
+
+            # The third pending check off reaches the group commit size
+            habit_manager.check_off(2, [datetime.now()])
+            for _ in range(500):
+                if habit_manager.get_group_commit_statistics()["flushes"] == 1:
+                    break
+                time.sleep(0.01)
+            assert habit_manager.get_group_commit_statistics()["flushed_records"] == 3
+
+            habit_manager.check_off(3, [datetime.now()])
+
+        # Closing saves the remaining check off
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79 + 4
+        assert HabitManager(self.__TEST_DATABASE_NAME).get_group_commit_statistics() == {}
+
+    @pytest.mark.parametrize("group_commit_interval", [None, 0.01])
+    def test_delete_habit_during_flush(self, monkeypatch, group_commit_interval):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, 
+                                     write_behind=True, 
+                                     thread_safe=True, 
+                                     group_commit_interval=group_commit_interval)
+
+        # The flush saving the check offs of habit 2 gets blocked
+        save_data_records = Habit.save_data_records
+        flush_started = threading.Event()
+        flush_released = threading.Event()
+
+        def save_blocked_data_records(database_manager, data_records):
+            if data_records != []:
+                flush_started.set()
+                flush_released.wait(5)
+            save_data_records(database_manager, data_records)
+
+        monkeypatch.setattr(Habit, "save_data_records", staticmethod(save_blocked_data_records))
+
+        habit_manager.check_off(2, [datetime.now() - timedelta(days=7 * i) for i in range(10)])
+        if group_commit_interval is None:
+            flush_thread = threading.Thread(target=habit_manager.flush)
+            flush_thread.start()
+        assert flush_started.wait(5)
+
+        # The delete waits for the flush
+        delete_thread = threading.Thread(target=habit_manager.delete_habit, args=(2,))
+        delete_thread.start()
+        delete_thread.join(0.2)
+        assert delete_thread.is_alive()
+
+        flush_released.set()
+        delete_thread.join()
+        if group_commit_interval is None:
+            flush_thread.join()
+
+        # Check offs of the deleted habit are ignored
+        habit_manager.check_off_many({2: [datetime.now()]})
+
+        # The new habit with the reused habit_id starts without check offs
+        habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+        habit_manager.close()
+        assert habit_manager.get_streak(StreakType.LONGEST, 2) == 0
+        for database_table in [DatabaseTable.CHECK_OFF_DATETIME, DatabaseTable.HABIT_STATS]:
+            assert self.__database_manager.load(
+                database_table.name.lower(), {"habit_id": 2}) == []
+        assert HabitManager(self.__TEST_DATABASE_NAME).get_streak(StreakType.LONGEST, 2) == 0
+
+    @pytest.mark.parametrize("group_commit_interval", [None, 0.01, 60])
+    def test_group_commit_garbage_collection(self, group_commit_interval):
+
+        number_of_check_offs = len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()))
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, write_behind=True, 
+                                     group_commit_interval=group_commit_interval)
+        habit_manager.check_off(2, [datetime.now()])
+        habit_manager_reference = weakref.ref(habit_manager)
+
+        # An unclosed habit manager does not stay alive until the interpreter exits
+        del habit_manager
+        deadline = time.monotonic() + 5
+        while habit_manager_reference() is not None and time.monotonic() < deadline:
+            gc.collect()
+            time.sleep(0.01)
+        assert habit_manager_reference() is None
+
+        # Its pending check offs get saved on teardown
+        assert len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())) == number_of_check_offs + 1
+
+    def test_compact(self):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, compact=True)
+        assert habit_manager.get_all_habits() == self.__habit_manager.get_all_habits()
+
+        for habit_id in range(5):
+            for streak_type in StreakType:
+                assert habit_manager.get_streak(streak_type, habit_id, verify=True) == self.__habit_manager.get_streak(streak_type, habit_id)
+
+        habit_manager.check_off(2, [datetime.now()])
+        assert habit_manager.get_streak(StreakType.CURRENT, 2, verify=True) == 1
+        assert HabitManager(self.__TEST_DATABASE_NAME, compact=True).get_streak(StreakType.CURRENT, 2) == 1
+
+    def test_lazy(self):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, lazy=True, history_cache_bytes=1)
+        assert habit_manager.get_all_habits() == self.__habit_manager.get_all_habits()
+        assert habit_manager.get_cache_statistics()["entries"] == 0
+
+        for habit_id in range(5):
+            for streak_type in StreakType:
+                assert habit_manager.get_streak(streak_type, habit_id, verify=True) == self.__habit_manager.get_streak(streak_type, habit_id)
+
+        # Each history exceeds the budget, so only the latest one stays cached
+        statistics = habit_manager.get_cache_statistics()
+        assert statistics["entries"] == 1
+        assert statistics["misses"] == 5
+        assert statistics["evictions"] == 4
+
+        # Unsaved check offs survive the eviction of their history
+        habit_manager.write_behind = True
+        habit_manager.check_off(2, [datetime.now()])
+        habit_manager.get_streak(StreakType.LONGEST, 1)
+        assert habit_manager.get_streak(StreakType.CURRENT, 2) == 1
+        habit_manager.flush()
+        assert HabitManager(self.__TEST_DATABASE_NAME, lazy=True).get_streak(StreakType.CURRENT, 2) == 1
+
+        habit_manager.delete_habit(2)
+        habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+        assert habit_manager.get_streak(StreakType.LONGEST, 2) == 0
+
+    @pytest.mark.parametrize("write_behind", [False, True])
+    def test_thread_safe(self, write_behind):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, write_behind=write_behind, thread_safe=True)
+        start_datetime = datetime(year=2024, month=9, day=1)
+
+        for habit_id in range(5, 13):
+            habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+
+        def check_off(habit_id):
+            habit_manager.create_habit("Running", "Run every week.", Periodicity.WEEKLY)
+            for i in range(50):
+                habit_manager.check_off(habit_id, [start_datetime + timedelta(days=i)])
+                habit_manager.check_off(0, [start_datetime + timedelta(days=i)])
+                if write_behind and i % 10 == 0:
+                    habit_manager.flush()
+
+        threads = [threading.Thread(target=check_off, args=(habit_id,)) for habit_id in range(5, 13)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        habit_manager.flush()
+
+        assert [habit["habit_id"] for habit in habit_manager.get_all_habits()] == list(range(21))
+        for habit_id in range(5, 13):
+            assert habit_manager.get_streak(StreakType.LONGEST, habit_id, verify=True) == 50
+        assert habit_manager.get_streak(StreakType.LONGEST, 0, verify=True) == 50
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        assert len(loaded_table) == 79 + 9 * 50
+        assert len(set(row[1:] for row in loaded_table)) == len(loaded_table)
+
+    def test_load_data_without_writes(self):
+
+        with open(self.__TEST_DATABASE_NAME, "rb") as database_file:
+            database_bytes = database_file.read()
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME)
+        assert habit_manager.get_all_habits() == self.__habit_manager.get_all_habits()
+        assert habit_manager.get_streak(StreakType.LONGEST, 1) == 14
+
+        with open(self.__TEST_DATABASE_NAME, "rb") as database_file:
+            assert database_file.read() == database_bytes
+
     def test_get_all_habits(self):
 
         assert self.__habit_manager.get_all_habits() == [
@@ -112,6 +370,280 @@ class TestHabitManager:
         assert self.__habit_manager.get_streak(StreakType.CURRENT, 2) == 4
         assert self.__habit_manager.get_streak(StreakType.LONGEST, 2) == 5
 
+    def test_get_streak_vectorized(self):
+
+        pytest.importorskip("numpy")
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, 
+                                     streak_engine=StreakEngine.VECTORIZED)
+        habit_manager.check_off(2, [datetime.now() - timedelta(days=7 * i) 
+                                    for i in range(3)])
+
+        for streak_type in StreakType:
+            assert habit_manager.get_streak(streak_type) == HabitManager(
+                self.__TEST_DATABASE_NAME).get_streak(streak_type)
+        assert habit_manager.get_streak(StreakType.CURRENT) == 3
+        assert habit_manager.get_streak(StreakType.LONGEST) == 23
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_get_streak_parallel(self, compact):
+
+        with HabitManager(self.__TEST_DATABASE_NAME, 
+                          streak_engine=StreakEngine.PARALLEL, 
+                          compact=compact, 
+                          streak_workers=2) as habit_manager:
+            habit_manager.check_off(2, [datetime.now() - timedelta(days=7 * i) 
+                                        for i in range(3)])
+
+            for streak_type in StreakType:
+                assert habit_manager.get_streak(streak_type) == HabitManager(
+                    self.__TEST_DATABASE_NAME).get_streak(streak_type)
+                assert habit_manager.get_top_streaks(streak_type) == HabitManager(
+                    self.__TEST_DATABASE_NAME).get_top_streaks(streak_type)
+            assert habit_manager.get_streak(StreakType.CURRENT) == 3
+            assert habit_manager.get_top_streaks(StreakType.LONGEST, 3) == [(0, 23), (1, 14), (2, 5)]
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_get_streak_sql(self, lazy):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, 
+                                     streak_engine=StreakEngine.SQL, 
+                                     lazy=lazy, 
+                                     write_behind=True)
+        habit_manager.check_off(2, [datetime.now() - timedelta(days=7 * i) 
+                                    for i in range(3)])
+        habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+
+        for streak_type in StreakType:
+            assert habit_manager.get_streak(streak_type) == HabitManager(
+                self.__TEST_DATABASE_NAME).get_streak(streak_type)
+            assert habit_manager.get_top_streaks(streak_type) == HabitManager(
+                self.__TEST_DATABASE_NAME).get_top_streaks(streak_type)
+        assert habit_manager.get_streak(StreakType.CURRENT) == 3
+        assert habit_manager.get_top_streaks(StreakType.LONGEST, 3) == [(0, 23), (1, 14), (2, 5)]
+
+        if lazy:
+            assert habit_manager.get_cache_statistics()["entries"] == 1
+
+    def test_stats(self):
+
+        # Migrating the example database fills the habit_stats table
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.HABIT_STATS.name.lower())
+        assert [row[0] for row in loaded_table] == list(range(5))
+        assert [row[3] for row in loaded_table] == [
+            self.__habit_manager.get_streak(StreakType.LONGEST, habit_id) 
+            for habit_id in range(5)]
+        assert sum(row[4] for row in loaded_table) == 79
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, 
+                                     streak_engine=StreakEngine.STATS, 
+                                     write_behind=True)
+        habit_manager.check_off(2, [datetime.now() - timedelta(days=7 * i) 
+                                    for i in range(3)])
+        habit_manager.check_off_many({1: [datetime(year=2024, month=9, day=1)]})
+        habit_manager.delete_habit(0)
+
+        for streak_type in StreakType:
+            assert habit_manager.get_streak(streak_type) == HabitManager(
+                self.__TEST_DATABASE_NAME).get_streak(streak_type)
+            assert habit_manager.get_top_streaks(streak_type) == HabitManager(
+                self.__TEST_DATABASE_NAME).get_top_streaks(streak_type)
+        assert habit_manager.get_streak(StreakType.CURRENT) == 3
+        assert habit_manager.get_streak(StreakType.LONGEST) == 14
+
+        # The maintained summaries equal the rebuilt ones
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.HABIT_STATS.name.lower())
+        assert [row[0] for row in loaded_table] == [1, 2, 3, 4]
+        habit_manager.rebuild_stats()
+        assert self.__database_manager.load(
+            DatabaseTable.HABIT_STATS.name.lower()) == loaded_table
+
+        # Cold start without loading any check offs
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, 
+                                     streak_engine=StreakEngine.STATS, 
+                                     lazy=True)
+        assert habit_manager.get_streak(StreakType.LONGEST) == 14
+        assert habit_manager.get_streak(StreakType.CURRENT) == 3
+        assert habit_manager.get_cache_statistics()["entries"] == 0
+
+    def test_stats_concurrent_habit_managers(self):
+
+        habit_manager_a = HabitManager(self.__TEST_DATABASE_NAME)
+        habit_manager_b = HabitManager(self.__TEST_DATABASE_NAME)
+
+        # The streak summary saved by B includes the check off saved by A, which B has not loaded
+        habit_manager_a.check_off(2, [datetime.now() - timedelta(days=7)])
+        habit_manager_b.check_off(2, [datetime.now()])
+
+        loaded_row = self.__database_manager.load(
+            DatabaseTable.HABIT_STATS.name.lower(), {"habit_id": 2})[0]
+        assert loaded_row[2] == 2
+        assert loaded_row[2] == HabitManager(
+            self.__TEST_DATABASE_NAME).get_streak(StreakType.CURRENT, 2)
+        assert loaded_row[4] == len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), {"habit_id": 2}))
+
+    def test_stats_save_failure(self):
+
+        number_of_check_offs = len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()))
+        with self.__database_manager.transaction() as cursor:
+            cursor.execute("DROP TABLE habit_stats")
+
+        # The check off gets rolled back together with the failing streak summary
+        with pytest.raises(sqlite3.OperationalError):
+            self.__habit_manager.check_off(2, [datetime.now()])
+        assert len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())) == number_of_check_offs
+
+    @pytest.mark.parametrize("write_behind", [False, True])
+    def test_save_failure_retry(self, monkeypatch, write_behind):
+
+        number_of_check_offs = len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()))
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, write_behind=write_behind)
+
+        # The first save fails as if the database was locked
+        save_data_records = Habit.save_data_records
+        failures = [sqlite3.OperationalError("database is locked")]
+
+        def save_failing_data_records(database_manager, data_records):
+            if failures != []:
+                raise failures.pop()
+            save_data_records(database_manager, data_records)
+
+        monkeypatch.setattr(Habit, "save_data_records", staticmethod(save_failing_data_records))
+
+        with pytest.raises(sqlite3.OperationalError):
+            habit_manager.check_off(2, [datetime.now()])
+            habit_manager.flush()
+        assert len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())) == number_of_check_offs
+
+        # The check off stays pending and gets saved by the next flush
+        habit_manager.flush()
+        assert len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())) == number_of_check_offs + 1
+        habit_manager.close()
+
+    def test_group_commit_save_failure_retry(self, monkeypatch):
+
+        number_of_check_offs = len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()))
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, write_behind=True, 
+                                     group_commit_interval=0.01)
+
+        # The first flush of the background thread fails as if the database was locked
+        save_data_records = Habit.save_data_records
+        failures = [sqlite3.OperationalError("database is locked")]
+
+        def save_failing_data_records(database_manager, data_records):
+            if failures != []:
+                raise failures.pop()
+            save_data_records(database_manager, data_records)
+
+        monkeypatch.setattr(Habit, "save_data_records", staticmethod(save_failing_data_records))
+
+        habit_manager.check_off(2, [datetime.now()])
+        deadline = time.monotonic() + 5
+        while (len(self.__database_manager.load(DatabaseTable.CHECK_OFF_DATETIME.name.lower())) 
+               == number_of_check_offs and time.monotonic() < deadline):
+            time.sleep(0.01)
+        assert failures == []
+        assert len(self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())) == number_of_check_offs + 1
+        habit_manager.close()
+
+    def test_get_check_offs(self):
+
+        loaded_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), {"habit_id": 1})
+        check_offs = sorted(from_microseconds(row[2]) for row in loaded_table)
+
+        assert self.__habit_manager.get_check_offs(1) == check_offs
+        assert self.__habit_manager.get_check_offs(
+            1, check_offs[3], check_offs[10]) == check_offs[3:10]
+        assert self.__habit_manager.get_check_offs(
+            1, start=check_offs[3], descending=True, limit=2) == check_offs[:-3:-1]
+        assert self.__habit_manager.get_check_offs(99) == []
+
+        # Pending write-behind check offs are included
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, write_behind=True)
+        habit_manager.check_off(1, [datetime.now()])
+        assert habit_manager.get_check_offs(1, start=check_offs[-1] + timedelta(seconds=1)) == [
+            self.__habit_manager.get_check_offs(1, descending=True, limit=1)[0]]
+
+    def test_get_completion_rates(self):
+
+        with freeze_time(datetime(year=2024, month=8, day=5, hour=23)):
+            completion_rates = self.__habit_manager.get_completion_rates(28)
+            assert list(completion_rates) == list(range(5))
+
+            for habit_id, completion_rate in completion_rates.items():
+                periodicity = self.__habit_manager.get_all_habits()[habit_id]["periodicity"]
+                period = Periodicity[periodicity.upper()].value
+                check_offs = self.__habit_manager.get_check_offs(
+                    habit_id, start=datetime(year=2024, month=7, day=9))
+                assert completion_rate == len(
+                    {(check_off.date() - datetime(year=2024, month=7, day=9).date()).days // period 
+                     for check_off in check_offs}) / (28 // period)
+
+            assert self.__habit_manager.get_completion_rates(28, [2, 0, 99]) == {
+                2: completion_rates[2], 0: completion_rates[0]}
+
+            self.__habit_manager.create_habit("Swimming", "Swim every day.", Periodicity.DAILY)
+            self.__habit_manager.check_off(5, [datetime.now() - timedelta(days=i) 
+                                               for i in range(0, 10, 2)])
+            assert self.__habit_manager.get_completion_rates(10, [5]) == {5: 0.5}
+            assert self.__habit_manager.get_completion_rates(1, [5]) == {5: 1.0}
+
+    def test_streak_cache(self):
+
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, streak_cache_size=3)
+
+        with freeze_time(self.__DATETIME_NOW) as frozen_datetime:
+            for _ in range(2):
+                assert habit_manager.get_streak(StreakType.LONGEST) == 23
+                assert habit_manager.get_streak(StreakType.CURRENT, 2) == 0
+            statistics = habit_manager.get_streak_cache_statistics()
+            assert (statistics["hits"], statistics["misses"]) == (2, 2)
+
+            # A check off invalidates the streaks of its habit and of all habits
+            habit_manager.check_off(2, [datetime.now()])
+            habit_manager.check_off(2, [datetime.now() - timedelta(days=7)])
+            assert habit_manager.get_streak(StreakType.CURRENT, 2) == 2
+            assert habit_manager.get_streak(StreakType.CURRENT) == 2
+            assert habit_manager.get_streak_cache_statistics()["misses"] == 4
+
+            # Check offs of other habits keep the streaks of a habit
+            habit_manager.check_off_many({1: [datetime.now()]})
+            assert habit_manager.get_streak(StreakType.CURRENT, 2) == 2
+            assert habit_manager.get_streak(StreakType.CURRENT) == 2
+            statistics = habit_manager.get_streak_cache_statistics()
+            assert (statistics["hits"], statistics["misses"]) == (3, 5)
+
+            # The current streak breaks once the day rolls over
+            frozen_datetime.tick(timedelta(days=8))
+            assert habit_manager.get_streak(StreakType.CURRENT, 2) == 0
+            assert habit_manager.get_streak(StreakType.CURRENT) == 0
+            statistics = habit_manager.get_streak_cache_statistics()
+            assert (statistics["entries"], statistics["misses"]) == (2, 7)
+
+            # A deleted habit does not keep its streaks
+            habit_manager.get_streak(StreakType.LONGEST, 0)
+            habit_manager.delete_habit(0)
+            assert habit_manager.get_streak(StreakType.LONGEST, 0) == 0
+            assert habit_manager.get_streak(StreakType.LONGEST) == 14
+
+            # Verifying bypasses the cache
+            misses = habit_manager.get_streak_cache_statistics()["misses"]
+            assert habit_manager.get_streak(StreakType.LONGEST, verify=True) == 14
+            assert habit_manager.get_streak_cache_statistics()["misses"] == misses
+
+        assert self.__habit_manager.get_streak_cache_statistics() == {}
+
     def teardown_method(self):
 
         del self.__habit_manager
@@ -123,6 +655,6 @@ class TestHabitManager:
             "name": habit_tuple[1], 
             "description": habit_tuple[2], 
             "periodicity": Periodicity(habit_tuple[3]).name.capitalize(), 
-            "creation_datetime": habit_tuple[4]}
+            "creation_datetime": from_microseconds(habit_tuple[4]).isoformat()}
 
 pytest.main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import pytest
+from datetime import datetime
+from context import src
+from src.habit import Habit, Periodicity
+from src.habit_view import HabitView
+from src.database_manager import DatabaseManager
+
+
+class TestHabitView:
+
+    __TEST_DATABASE_NAME = "test_habit.db"
+
+    def setup_method(self):
+
+        self.__database_manager = DatabaseManager(self.__TEST_DATABASE_NAME)
+        self.__habit = Habit(0, 
+                             "Reading", 
+                             "Read a chapter every day.", 
+                             Periodicity.DAILY, 
+                             datetime(year=2024, month=7, day=2, hour=8), 
+                             is_saved=True, 
+                             database_manager=self.__database_manager)
+        self.__habit_view = HabitView(self.__habit)
+
+    def test_mapping(self):
+
+        assert len(self.__habit_view) == 5
+        assert list(self.__habit_view) == list(HabitView.KEYS)
+        assert self.__habit_view["periodicity"] == "Daily"
+        assert self.__habit_view["creation_datetime"] == "2024-07-02T08:00:00"
+        assert self.__habit_view.get("unknown") is None
+
+        with pytest.raises(KeyError):
+            self.__habit_view["unknown"]
+
+    def test_equality(self):
+
+        habit_dict = {
+            "habit_id": 0, 
+            "name": "Reading", 
+            "description": "Read a chapter every day.", 
+            "periodicity": "Daily", 
+            "creation_datetime": "2024-07-02T08:00:00"}
+        assert self.__habit_view == habit_dict
+        assert dict(self.__habit_view) == habit_dict
+        assert self.__habit_view != dict(habit_dict, name="Writing")
+
+    def test_read_only(self):
+
+        with pytest.raises(TypeError):
+            self.__habit_view["name"] = "Writing"
+
+        with pytest.raises(AttributeError):
+            self.__habit_view.habit = None
+
+    def teardown_method(self):
+
+        del self.__database_manager
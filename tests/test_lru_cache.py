@@ -0,0 +1,61 @@
+import pytest
+from context import src
+from src.lru_cache import LRUCache
+
+
+class TestLRUCache:
+
+    def test_max_size(self):
+
+        lru_cache = LRUCache(max_size=2)
+        lru_cache.put("a", 1)
+        lru_cache.put("b", 2)
+        assert lru_cache.get("a") == 1
+
+        lru_cache.put("c", 3)
+        assert "b" not in lru_cache
+        assert len(lru_cache) == 2
+        assert lru_cache.get("b", 0) == 0
+        assert lru_cache.get("a") == 1
+        assert lru_cache.get("c") == 3
+
+        statistics = lru_cache.get_statistics()
+        assert statistics["hits"] == 3
+        assert statistics["misses"] == 1
+        assert statistics["evictions"] == 1
+        assert statistics["entries"] == 2
+        assert statistics["hit_rate"] == pytest.approx(0.75)
+
+    def test_max_bytes(self):
+
+        lru_cache = LRUCache(max_bytes=10, size_of=len)
+        lru_cache.put("a", "12345")
+        lru_cache.put("b", "1234")
+        assert lru_cache.get_statistics()["total_bytes"] == 9
+
+        # Putting an entry again measures it again
+        lru_cache.put("a", "1234567")
+        assert "b" not in lru_cache
+        assert lru_cache.get_statistics()["total_bytes"] == 7
+
+        # The most recently put entry is kept even if it exceeds the budget
+        lru_cache.put("c", "12345678901")
+        statistics = lru_cache.get_statistics()
+        assert statistics["entries"] == 1
+        assert statistics["total_bytes"] == 11
+        assert statistics["evictions"] == 2
+        assert lru_cache.get("c") == "12345678901"
+
+    def test_pop_and_clear(self):
+
+        lru_cache = LRUCache(max_bytes=10, size_of=len)
+        lru_cache.put("a", "12345")
+        lru_cache.put("b", "1234")
+
+        assert lru_cache.pop("a") == "12345"
+        assert lru_cache.pop("a") is None
+        assert lru_cache.get_statistics()["total_bytes"] == 4
+
+        lru_cache.clear()
+        assert len(lru_cache) == 0
+        assert lru_cache.get_statistics()["total_bytes"] == 0
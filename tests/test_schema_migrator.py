@@ -0,0 +1,184 @@
+import pytest
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from context import src
+from src.check_off_history import to_microseconds
+from src.database_manager import DatabaseManager
+from src.schema_migrator import SchemaMigrator
+from src.habit import DatabaseTable
+from src.habit_manager import HabitManager, StreakEngine, StreakType
+
+
+class TestSchemaMigrator:
+
+    __EXAMPLE_DATABASE_NAME = "example_habit.db"
+    __TEST_DATABASE_NAME = "test_habit.db"
+
+    def setup_method(self):
+
+        # Copy example data to test database
+        shutil.copy(self.__EXAMPLE_DATABASE_NAME, self.__TEST_DATABASE_NAME)
+
+        self.__database_manager = DatabaseManager(self.__TEST_DATABASE_NAME)
+
+        self.loaded_habit_table = self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower())
+        self.loaded_check_off_table = self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+
+        # The tables as expected after migrating the timestamps to integers
+        self.migrated_habit_table = [
+            row[:4] + (to_microseconds(datetime.fromisoformat(row[4])),) 
+            for row in self.loaded_habit_table]
+        self.migrated_check_off_table = [
+            row[:2] + (to_microseconds(datetime.fromisoformat(row[2])),) 
+            for row in self.loaded_check_off_table]
+
+    def test_migrate_example_database(self):
+
+        assert self.get_schema_version() == 0
+
+        version = SchemaMigrator(self.__database_manager).migrate()
+        assert version == SchemaMigrator.LATEST_VERSION
+        assert self.get_schema_version() == SchemaMigrator.LATEST_VERSION
+
+        assert self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower()) == self.migrated_habit_table
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()) == self.migrated_check_off_table
+
+    def test_migrate_to_version_1(self):
+
+        with self.__database_manager.transaction() as cursor:
+            cursor.execute("DROP TABLE check_off_datetime")
+            cursor.execute("""
+                CREATE TABLE check_off_datetime (
+                id INT PRIMARY KEY,
+                habit_id INTEGER NOT NULL,
+                check_off_datetime TEXT NOT NULL,
+                FOREIGN KEY(habit_id) REFERENCES habit(habit_id)
+                )
+                """)
+            cursor.executemany(
+                "INSERT INTO check_off_datetime VALUES (?, ?, ?)", 
+                self.loaded_check_off_table)
+
+        SchemaMigrator(self.__database_manager).migrate()
+
+        with self.__database_manager.transaction() as cursor:
+            columns = cursor.execute(
+                "PRAGMA table_info(check_off_datetime)").fetchall()
+            foreign_keys = cursor.execute(
+                "PRAGMA foreign_key_list(check_off_datetime)").fetchall()
+        assert [column[1:4] for column in columns] == [
+            ("id", "INTEGER", 0), 
+            ("habit_id", "INTEGER", 1), 
+            ("check_off_datetime", "INTEGER", 1)]
+        assert [foreign_key[2:5] for foreign_key in foreign_keys] == [
+            ("habit", "habit_id", "habit_id")]
+
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()) == self.migrated_check_off_table
+
+        check_off_microseconds = to_microseconds(datetime(2024, 9, 1))
+        self.__database_manager.save(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            {"habit_id": "0", "check_off_datetime": check_off_microseconds}, 
+            "id")
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), 
+            {"check_off_datetime": check_off_microseconds}) == [
+                (79, 0, check_off_microseconds)]
+
+    def test_migrate_to_version_2(self):
+
+        with self.__database_manager.transaction() as cursor:
+            cursor.executemany(
+                "INSERT INTO check_off_datetime (habit_id, check_off_datetime) VALUES (?, ?)", 
+                [row[1:] for row in self.loaded_check_off_table[:3]])
+            cursor.execute("PRAGMA user_version = 1")
+
+        SchemaMigrator(self.__database_manager).migrate()
+
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()) == self.migrated_check_off_table
+
+    def test_migrate_to_version_3(self):
+
+        # A timestamp that cannot be parsed interrupts the migration after the first batches
+        with self.__database_manager.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO check_off_datetime (id, habit_id, check_off_datetime) VALUES (?, ?, ?)", 
+                (1000, 0, "not a timestamp"))
+
+        assert SchemaMigrator(self.__database_manager, batch_size=10).migrate() == 2
+        with self.__database_manager.transaction() as cursor:
+            number_of_copied_rows = cursor.execute(
+                "SELECT COUNT(*) FROM check_off_datetime_migration").fetchone()[0]
+        assert number_of_copied_rows == 70
+
+        # The resumed migration copies the remaining rows
+        self.__database_manager.delete(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower(), {"id": 1000})
+        assert SchemaMigrator(self.__database_manager, batch_size=10).migrate() == SchemaMigrator.LATEST_VERSION
+
+        with self.__database_manager.transaction() as cursor:
+            columns = cursor.execute(
+                "PRAGMA table_info(check_off_datetime)").fetchall()
+            tables = cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        assert columns[2][1:3] == ("check_off_datetime", "INTEGER")
+        assert sorted(table[0] for table in tables) == ["check_off_datetime", "habit", "habit_stats"]
+
+        assert self.__database_manager.load(
+            DatabaseTable.HABIT.name.lower()) == self.migrated_habit_table
+        assert self.__database_manager.load(
+            DatabaseTable.CHECK_OFF_DATETIME.name.lower()) == self.migrated_check_off_table
+
+    def test_migrate_to_version_4(self):
+
+        SchemaMigrator(self.__database_manager).migrate()
+
+        # The streak summaries are complete without initializing the database through a habit
+        assert len(self.__database_manager.load(DatabaseTable.HABIT_STATS.name.lower())) == 5
+        habit_manager = HabitManager(self.__TEST_DATABASE_NAME, streak_engine=StreakEngine.STATS)
+        assert habit_manager.get_streak(StreakType.LONGEST) == 23
+        assert habit_manager.get_streak(StreakType.LONGEST, 2) == HabitManager(
+            self.__TEST_DATABASE_NAME).get_streak(StreakType.LONGEST, 2)
+        habit_manager.close()
+
+    def test_migrate_new_database(self):
+
+        self.__database_manager.delete(DatabaseTable.CHECK_OFF_DATETIME.name.lower())
+        with self.__database_manager.transaction() as cursor:
+            for database_table in DatabaseTable:
+                cursor.execute(f"DROP TABLE IF EXISTS {database_table.name.lower()}")
+
+        assert SchemaMigrator(self.__database_manager).migrate() == SchemaMigrator.LATEST_VERSION
+        assert SchemaMigrator(self.__database_manager).migrate() == SchemaMigrator.LATEST_VERSION
+
+    def test_migrate_latest_version_without_write_lock(self):
+
+        SchemaMigrator(self.__database_manager).migrate()
+
+        # Another connection holds the write lock
+        connection = sqlite3.connect(self.__TEST_DATABASE_NAME, isolation_level=None)
+        connection.execute("BEGIN IMMEDIATE")
+
+        start_time = time.perf_counter()
+        assert SchemaMigrator(self.__database_manager).migrate() == SchemaMigrator.LATEST_VERSION
+        assert time.perf_counter() - start_time < 1
+
+        connection.rollback()
+        connection.close()
+
+    def teardown_method(self):
+
+        del self.__database_manager
+
+    def get_schema_version(self):
+
+        with sqlite3.connect(self.__TEST_DATABASE_NAME) as connection:
+            return connection.execute("PRAGMA user_version").fetchone()[0]
@@ -0,0 +1,115 @@
+import pytest
+import random
+from datetime import date, datetime, timedelta
+from context import src
+from src.check_off_history import CheckOffHistory
+from src import streak_engine
+
+np = pytest.importorskip("numpy")
+
+
+class TestStreakEngine:
+
+    def setup_method(self):
+
+        random_generator = random.Random(0)
+        self.__today_ordinal = date(year=2024, month=12, day=31).toordinal()
+        self.__periods = {habit_id: random_generator.choice([1, 7]) 
+                          for habit_id in range(50)}
+        self.__datetimes = {
+            habit_id: list({datetime(year=2024, month=1, day=1) 
+                            + timedelta(days=random_generator.randrange(366), 
+                                        hours=random_generator.randrange(2)) 
+                            for i in range(random_generator.randrange(300))}) 
+            for habit_id in self.__periods}
+
+    def test_compute_all_streaks(self):
+
+        habit_ids, dates, periods = self.get_arrays()
+        order = np.random.default_rng(0).permutation(len(habit_ids))
+
+        result_habit_ids, current_streaks, longest_streaks = streak_engine.compute_all_streaks(
+            habit_ids[order], 
+            dates[order], 
+            periods[order], 
+            self.__today_ordinal)
+
+        expected_habit_ids = sorted(
+            habit_id 
+            for habit_id, datetimes in self.__datetimes.items() 
+            if datetimes != [])
+        assert list(result_habit_ids) == expected_habit_ids
+
+        for habit_id, current_streak, longest_streak in zip(
+                result_habit_ids, current_streaks, longest_streaks):
+            check_off_history = CheckOffHistory(self.__datetimes[habit_id], 
+                                                self.__periods[habit_id])
+            assert current_streak == check_off_history.get_current_streak(self.__today_ordinal)
+            assert longest_streak == check_off_history.get_longest_streak()
+
+    def test_compute_all_streaks_datetime64(self):
+
+        habit_ids, dates, periods = self.get_arrays()
+        dates_datetime64 = np.array(
+            [date.fromordinal(int(ordinal)) for ordinal in dates], 
+            dtype="datetime64[D]")
+
+        results = streak_engine.compute_all_streaks(
+            habit_ids, dates, periods, self.__today_ordinal)
+        results_datetime64 = streak_engine.compute_all_streaks(
+            habit_ids, dates_datetime64, periods, self.__today_ordinal)
+
+        for result, result_datetime64 in zip(results, results_datetime64):
+            assert list(result) == list(result_datetime64)
+
+    def test_compute_all_streaks_empty(self):
+
+        results = streak_engine.compute_all_streaks([], [], [], self.__today_ordinal)
+        assert [len(result) for result in results] == [0, 0, 0]
+
+    def test_compute_streaks(self):
+
+        for habit_id, datetimes in self.__datetimes.items():
+            check_off_history = CheckOffHistory(datetimes, self.__periods[habit_id])
+            assert streak_engine.compute_streaks(
+                check_off_history.get_ordinals(), 
+                self.__periods[habit_id], 
+                self.__today_ordinal) == (
+                    check_off_history.get_current_streak(self.__today_ordinal), 
+                    check_off_history.get_longest_streak())
+
+    def test_compute_top_streaks(self):
+
+        shard = [(habit_id, 
+                  self.__periods[habit_id], 
+                  CheckOffHistory(datetimes, self.__periods[habit_id]).get_ordinals()) 
+                 for habit_id, datetimes in self.__datetimes.items()]
+        top_current_streaks, top_longest_streaks = streak_engine.compute_top_streaks(
+            shard, self.__today_ordinal, 5)
+
+        longest_streaks = sorted(
+            ((CheckOffHistory(datetimes, self.__periods[habit_id]).get_longest_streak(), habit_id) 
+             for habit_id, datetimes in self.__datetimes.items()), 
+            key=lambda streak: (-streak[0], streak[1]))
+        assert top_longest_streaks == longest_streaks[:5]
+        assert len(top_current_streaks) == 5
+
+        # Reducing the results of two shards gives the results of one shard
+        results = [streak_engine.compute_top_streaks(shard[:20], self.__today_ordinal, 5), 
+                   streak_engine.compute_top_streaks(shard[20:], self.__today_ordinal, 5)]
+        assert streak_engine.get_top_streaks(
+            [streak for result in results for streak in result[1]], 5) == top_longest_streaks
+
+    def get_arrays(self):
+
+        habit_ids = []
+        dates = []
+        periods = []
+
+        for habit_id, datetimes in self.__datetimes.items():
+            for checked_off_datetime in datetimes:
+                habit_ids.append(habit_id)
+                dates.append(checked_off_datetime.toordinal())
+                periods.append(self.__periods[habit_id])
+
+        return np.array(habit_ids), np.array(dates, dtype=np.int32), np.array(periods)